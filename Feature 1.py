@@ -1,3 +1,7 @@
+from familytree.names import NameIndex
+from familytree.traversal import generation, within
+
+
 class Person:
     def __init__(self, name, birth_year=None, death_year=None):
         self.name = name
@@ -7,31 +11,60 @@ class Person:
         self.children = []  # List of child objects
         self.siblings = []  # List of sibling objects
         self.spouse = None  # Reference to the spouse object
+        # Sets mirroring the lists above so duplicate checks don't scan the lists
+        self._parent_set = set()
+        self._child_set = set()
+        self._sibling_set = set()
 
     def add_parent(self, parent):
         """Add a parent to the person's record."""
-        if parent not in self.parents:
-            self.parents.append(parent)
-            parent.add_child(self)
+        _link_parent_child(parent, self)
 
     def add_child(self, child):
         """Add a child to the person's record."""
-        if child not in self.children:
-            self.children.append(child)
-            child.add_parent(self)
+        _link_parent_child(self, child)
 
     def add_sibling(self, sibling):
         """Add a sibling to the person's record."""
-        if sibling not in self.siblings:
+        if sibling not in self._sibling_set:
             self.siblings.append(sibling)
+            self._sibling_set.add(sibling)
+        if self not in sibling._sibling_set:
             sibling.siblings.append(self)
+            sibling._sibling_set.add(self)
 
     def set_spouse(self, spouse):
-        """Set the spouse for the person."""
+        """Set the spouse for the person, unlinking any previous spouse of either."""
+        for partner, other in ((self.spouse, self), (spouse.spouse, spouse)):
+            if partner is not None and partner.spouse is other:
+                partner.spouse = None
         self.spouse = spouse
         spouse.spouse = self
 
 
+def _link_parent_child(parent, child):
+    """Record a parent/child edge on both people in one step."""
+    if child not in parent._child_set:
+        parent.children.append(child)
+        parent._child_set.add(child)
+    if parent not in child._parent_set:
+        child.parents.append(parent)
+        child._parent_set.add(parent)
+
+
+# Neighbour functions for the traversal engine
+def parents_of(person):
+    return person.parents
+
+
+def children_of(person):
+    return person.children
+
+
+def immediate_relatives(person):
+    return person.parents + person.children + person.siblings
+
+
 # Display functions
 def display_parents(person):
     if person.parents:
@@ -39,8 +72,8 @@ def display_parents(person):
     return f"{person.name} has no recorded parents."
 
 
-def  (person):
-    grandchildren = [grandchild.name for child in person.children for grandchild in child.children]
+def display_grandchildren(person):
+    grandchildren = [grandchild.name for grandchild in generation([person], children_of, 2)]
     if grandchildren:
         return f"Grandchildren of {person.name}: " + ", ".join(grandchildren)
     return f"{person.name} has no recorded grandchildren."
@@ -60,92 +93,117 @@ def display_immediate_family(person):
 
 
 def display_extended_family(person):
-    extended_family = set()
-    if person.parents:
-        extended_family.update(person.parents)
-    if person.children:
-        extended_family.update(person.children)
-    if person.siblings:
-        extended_family.update(person.siblings)
-    for parent in person.parents:
-        for sibling in parent.children:
-            if sibling != person:
-                extended_family.add(sibling)
-        for grandparent in parent.parents:
-            for uncle_aunt in grandparent.children:
-                if uncle_aunt != parent:
-                    extended_family.add(uncle_aunt)
+    # Parents, children and siblings, then the children of parents (siblings
+    # by descent) and of grandparents (aunts and uncles)
+    extended_family = set(within(person, immediate_relatives, 1))
+    extended_family.update(generation(generation([person], parents_of, 1), children_of, 1))
+    extended_family.update(generation(generation([person], parents_of, 2), children_of, 1))
+    extended_family.discard(person)
     alive_family = [member.name for member in extended_family if member.death_year is None]
     return f"Extended family of {person.name} (alive):\n" + ", ".join(alive_family) if alive_family else f"{person.name} has no recorded extended family."
 
 
-# Example setup for the family tree
-otto = Person("Otto Emmersohn", birth_year=1980)
-cornelia = Person("Cornelia Emmersohn", birth_year=1985)
-karanbir = Person("Karanbir Thakuri" , birth_year=1935 ,death_year=2005)
-laxmi = Person("Laxmi Thakuri", birth_year=1938 ,death_year=2010)
-angad = Person("Angad Thakuri", birth_year=1960)
-yashvi = Person("Yashvi Thakuri", birth_year=1965)
-
-mahesh = Person("Mahesh Shah", birth_year=1990)
-aanya = Person("Aanya Shah", birth_year=1991)
-
-aadesh = Person("Aadesh Thakuri", birth_year=1990)
-megha = Person("Megha Thakuri",birth_year=1994)
-simran = Person("Simran Thakuri",birth_year=2008)
-ashish = Person("Ashish Thakuri",birth_year=2010)
-roshni = Person("Roshni Thakuri",birth_year=2012)
-
-alision = Person("Alision Emmersohn",birth_year=1999)
-william = Person("William Emmersohn",birth_year=2000)
-presley = Person("Presley Emmersohn",birth_year=2000)
-rowan = Person("Rowan Emmersohn",birth_year=2019)
-harper = Person("Harper Emmersohn",birth_year=2024)
-
-
-# Define relationships
-otto.set_spouse(cornelia)
-karanbir.set_spouse(laxmi)
-angad.set_spouse(yashvi)
-mahesh.set_spouse(aanya)
-aadesh.set_spouse(megha)
-william.set_spouse(presley)
-
-
-karanbir.add_child(angad)
-laxmi.add_child(angad)
-angad.add_child(cornelia)
-yashvi.add_child(cornelia)
-angad.add_child(aanya)
-yashvi.add_child(aanya)
-angad.add_child(aadesh)
-yashvi.add_child(aadesh)
-
-aadesh.add_child(ashish)
-megha.add_child(ashish)
-aadesh.add_child(roshni)
-megha.add_child(roshni)
-aadesh.add_child(simran)
-megha.add_child(simran)
-
-cornelia.add_child(william)
-otto.add_child(william)
-cornelia.add_child(alision)
-otto.add_child(alision)
-william.add_child(rowan)
-presley.add_child(rowan)
-william.add_child(harper)
-presley.add_child(harper)
-
-# Dictionary to map names to Person objects
-family_members = {
-    person.name: person
-    for person in [
+# Example setup for the family tree, built the first time it is needed
+_sample = None  # (family_members, member_index)
+
+
+def sample():
+    """The example family as ``(family_members, member_index)``, built on first use."""
+    global _sample
+    if _sample is not None:
+        return _sample
+    otto = Person("Otto Emmersohn", birth_year=1980)
+    cornelia = Person("Cornelia Emmersohn", birth_year=1985)
+    karanbir = Person("Karanbir Thakuri" , birth_year=1935 ,death_year=2005)
+    laxmi = Person("Laxmi Thakuri", birth_year=1938 ,death_year=2010)
+    angad = Person("Angad Thakuri", birth_year=1960)
+    yashvi = Person("Yashvi Thakuri", birth_year=1965)
+
+    mahesh = Person("Mahesh Shah", birth_year=1990)
+    aanya = Person("Aanya Shah", birth_year=1991)
+
+    aadesh = Person("Aadesh Thakuri", birth_year=1990)
+    megha = Person("Megha Thakuri",birth_year=1994)
+    simran = Person("Simran Thakuri",birth_year=2008)
+    ashish = Person("Ashish Thakuri",birth_year=2010)
+    roshni = Person("Roshni Thakuri",birth_year=2012)
+
+    alision = Person("Alision Emmersohn",birth_year=1999)
+    william = Person("William Emmersohn",birth_year=2000)
+    presley = Person("Presley Emmersohn",birth_year=2000)
+    rowan = Person("Rowan Emmersohn",birth_year=2019)
+    harper = Person("Harper Emmersohn",birth_year=2024)
+
+
+    # Define relationships
+    otto.set_spouse(cornelia)
+    karanbir.set_spouse(laxmi)
+    angad.set_spouse(yashvi)
+    mahesh.set_spouse(aanya)
+    aadesh.set_spouse(megha)
+    william.set_spouse(presley)
+
+
+    karanbir.add_child(angad)
+    laxmi.add_child(angad)
+    angad.add_child(cornelia)
+    yashvi.add_child(cornelia)
+    angad.add_child(aanya)
+    yashvi.add_child(aanya)
+    angad.add_child(aadesh)
+    yashvi.add_child(aadesh)
+
+    aadesh.add_child(ashish)
+    megha.add_child(ashish)
+    aadesh.add_child(roshni)
+    megha.add_child(roshni)
+    aadesh.add_child(simran)
+    megha.add_child(simran)
+
+    cornelia.add_child(william)
+    otto.add_child(william)
+    cornelia.add_child(alision)
+    otto.add_child(alision)
+    william.add_child(rowan)
+    presley.add_child(rowan)
+    william.add_child(harper)
+    presley.add_child(harper)
+
+    # Dictionary to map names to Person objects
+    members = [
         karanbir, laxmi, angad, yashvi, cornelia, otto, mahesh,
         aanya, aadesh, megha, simran, ashish, roshni, alision,
         william, presley, rowan, harper
     ]
-}
+    family_members = {person.name: person for person in members}
+
+    # Case- and accent-insensitive lookup; people sharing a name are all kept
+    member_index = NameIndex()
+    for member in members:
+        member_index.add(member.name, member)
+    _sample = family_members, member_index
+    return _sample
+
+
+def __getattr__(name):
+    # ``family_members`` and ``member_index`` used to be built at import time
+    if name == 'family_members':
+        return sample()[0]
+    if name == 'member_index':
+        return sample()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def find_members(name):
+    """Everyone called ``name`` (ignoring case, accents and extra spaces)."""
+    return sample()[1].exact(name)
+
+
+def not_found_message(name):
+    suggestions = [people[0].name for _, _, people in sample()[1].fuzzy(name, limit=5)]
+    if suggestions:
+        return f"Person not found. Did you mean: {', '.join(suggestions)}?"
+    return "Person not found."
 
 
 # Main interactive program
@@ -164,47 +222,41 @@ def main():
         choice = input("\nEnter your choice: ").strip()
 
         if choice == "1":
-            name = input("Enter the name of the person: ").strip().lower()  # Convert input to lowercase
-            person = None
-            # Search for the person, ignoring case
-            for p in family_members.values():
-                if p.name.lower() == name:  # Convert the stored name to lowercase
-                    person = p
-                    break
-
-            if person:
+            name = input("Enter the name of the person: ").strip()
+            people = find_members(name)
+            for person in people:
                 print(display_parents(person))
-            else:
-                print("Person not found.")
+            if not people:
+                print(not_found_message(name))
 
         elif choice == "2":
             name = input("Enter the name of the person: ").strip()
-            person = family_members.get(name)
-            if person:
+            people = find_members(name)
+            for person in people:
                 print(display_grandchildren(person))
-            else:
-                print("Person not found.")
+            if not people:
+                print(not_found_message(name))
 
         elif choice == "3":
             name = input("Enter the name of the person: ").strip()
-            person = family_members.get(name)
-            if person:
+            people = find_members(name)
+            for person in people:
                 print(display_immediate_family(person))
-            else:
-                print("Person not found.")
+            if not people:
+                print(not_found_message(name))
 
         elif choice == "4":
             name = input("Enter the name of the person: ").strip()
-            person = family_members.get(name)
-            if person:
+            people = find_members(name)
+            for person in people:
                 print(display_extended_family(person))
-            else:
-                print("Person not found.")
+            if not people:
+                print(not_found_message(name))
 
         elif choice == "7":
             # Display all available family members
             print("\nAvailable family members:")
-            for name in family_members.keys():
+            for name in sample()[0].keys():
                 print(name)
 
         elif choice == "8":
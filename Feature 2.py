@@ -1,6 +1,8 @@
 from datetime import datetime
 from collections import defaultdict
 
+from familytree.traversal import nth_cousins
+
 
 # Class representing an individual in the family tree
 class Person:
@@ -10,15 +12,21 @@ class Person:
         self.parents = []  # List of parent Person objects
         self.siblings = []  # List of sibling Person objects
         self.children = []  # List of child Person objects
+        # Sets mirroring the lists above so duplicate checks don't scan the lists
+        self._sibling_set = set()
+        self._child_set = set()
 
     def add_sibling(self, sibling):
-        if sibling not in self.siblings:
+        if sibling not in self._sibling_set:
             self.siblings.append(sibling)
+            self._sibling_set.add(sibling)
             sibling.siblings.append(self)  # Ensure the relationship is mutual
+            sibling._sibling_set.add(self)
 
     def add_child(self, child):
-        if child not in self.children:
+        if child not in self._child_set:
             self.children.append(child)
+            self._child_set.add(child)
             child.parents.append(self)  # Add self as a parent to the child
 
     def get_siblings(self):
@@ -26,11 +34,13 @@ class Person:
 
     def get_cousins(self):
         # Cousins are children of siblings of parents
-        cousins = []
-        for parent in self.parents:
-            for sibling in parent.get_siblings():
-                cousins.extend(sibling.children)
-        return cousins
+        return list(nth_cousins(self, 1, Person.get_parents, Person.get_children, Person.get_siblings))
+
+    def get_parents(self):
+        return self.parents
+
+    def get_children(self):
+        return self.children
 
 
 # Class representing the entire family tree
@@ -1,247 +1,189 @@
-from datetime import datetime, date
-from collections import defaultdict
-
-
-# Feature 1 - Person Class (Partner A)
-class Person:
-    def __init__(self, name, birth_date=None, death_date=None, spouse=None):
-        self.name = name
-        self.birth_date = birth_date  # Should be a datetime.date object
-        self.death_date = death_date
-        self.spouse = spouse  # Spouse of the individual
-        self.parents = []  # List of parent Person objects
-        self.siblings = []  # List of sibling Person objects
-        self.children = []  # List of child Person objects
-
-    def add_sibling(self, sibling):
-        if sibling not in self.siblings:
-            self.siblings.append(sibling)
-            sibling.siblings.append(self)
-
-    def add_child(self, child):
-        if child not in self.children:
-            self.children.append(child)
-            child.parents.append(self)
-
-    def get_siblings(self):
-        return self.siblings
-
-    def get_cousins(self):
-        cousins = []
-        for parent in self.parents:
-            for sibling in parent.get_siblings():
-                cousins.extend(sibling.children)
-        return cousins
-
-    def age_at_death(self):
-        if self.death_date:
-            return self.death_date.year - self.birth_date.year - (
-                        (self.death_date.month, self.death_date.day) < (self.birth_date.month, self.birth_date.day))
-        return None  # If no death date, return None
-
-    def get_grandchildren(self):
-        grandchildren = []
-        for child in self.children:
-            grandchildren.extend(child.children)
-        return grandchildren
-
-    def get_immediate_family(self):
-        immediate_family = {
-            'parents': [parent.name for parent in self.parents],
-            'siblings': [sibling.name for sibling in self.siblings],
-            'spouse': self.spouse.name if self.spouse else None,
-            'children': [child.name for child in self.children]
-        }
-        return immediate_family
-
-    def get_extended_family(self):
-        extended_family = set(self.get_immediate_family()['parents'])
-        for parent in self.parents:
-            extended_family.update(parent.get_siblings())
-        extended_family.update(self.get_cousins())
-        extended_family.discard(self.name)
-        return list(extended_family)
-
-
-# Feature 2 - FamilyTree Class (Partner B)
-class FamilyTree:
-    def __init__(self):
-        self.people = {}
-
-    def add_person(self, name, birth_date=None, death_date=None, spouse=None):
-        if name not in self.people:
-            person = Person(name, birth_date, death_date, spouse)
-            self.people[name] = person
-        return self.people[name]
-
-    def find_person(self, name):
-        return self.people.get(name, None)
-
-    def get_siblings(self, name):
-        person = self.find_person(name)
-        if person:
-            return [sibling.name for sibling in person.get_siblings()]
-        return []
-
-    def get_cousins(self, name):
-        person = self.find_person(name)
-        if person:
-            return [cousin.name for cousin in person.get_cousins()]
-        return []
-
-    def get_birthdays(self):
-        return {name: person.birth_date for name, person in self.people.items() if person.birth_date}
+import os
+import sys
+from functools import partial
 
-    def get_sorted_birthdays(self):
-        birthdays = self.get_birthdays()
-        birthday_dict = defaultdict(list)
-        for name, birth_date in birthdays.items():
-            key = (birth_date.month, birth_date.day)
-            birthday_dict[key].append(name)
-        sorted_birthdays = sorted(birthday_dict.items(), key=lambda x: (x[0][0], x[0][1]))
-        return [(datetime(1, month, day).strftime("%B %d"), names) for (month, day), names in sorted_birthdays]
+# Person and FamilyTree live in familytree.model; they are re-exported here
+# for code that loads this file directly
+from familytree.model import FamilyTree, PeopleView, Person  # noqa: F401
+from familytree.sample import sample_tree
 
-    def average_age_at_death(self):
-        total_age = 0
-        count = 0
-        for person in self.people.values():
-            age = person.age_at_death()
-            if age:
-                total_age += age
-                count += 1
-        return total_age / count if count else None
+PAGE_SIZE = 20  # rows of a listing shown before asking to continue
 
-    def number_of_children(self):
-        children_count = {}
-        for person in self.people.values():
-            children_count[person.name] = len(person.children)
-        return children_count
 
-    def average_number_of_children(self):
-        total_children = sum(len(person.children) for person in self.people.values())
-        total_people = len(self.people)
-        return total_children / total_people if total_people else None
-
-
-# Create the family tree (integrating both partners' branches)
+# Main interactive program for all features
+def main(family_tree=None, load=sample_tree):
+    """Run the menu on ``family_tree``; without one, ``load()`` builds it when the first command needs it.
+
+    Pending writes are committed when the menu exits.
+    """
+    try:
+        while True:
+            print("\n--- Family Tree Menu ---")
+            print("1. Parents and Grandparents")
+            print("2. Immediate Family")
+            print("3. Extended Family")
+            print("4. Average Age at Death")
+            print("5. Number of Children for Each Individual")
+            print("6. Average Number of Children per Person")
+            print("7. Siblings")
+            print("8. Cousins")
+            print("9. Family Birthdays")
+            print("10. Sorted Birthday Calendar")
+            print("11. Relationship Between Two People")
+            print("12. Instrumentation Summary")
+            print("13. Exit")
+            print("(Type 'profile <choice>' or 'memory <choice>' to profile one command.)")
+            choice = input("Enter your choice: ").strip()
+
+            if choice == "13":
+                print("Exiting the program. Goodbye!")
+                break
+            if family_tree is None:
+                family_tree = load()
+            mode, _, profiled = choice.partition(" ")
+            if mode in ('profile', 'memory') and profiled:  # instrument.PROFILE_MODES, imported only when used
+                from familytree import instrument
+                instrument.profile(lambda: run_choice(family_tree, profiled.strip()), mode)
+            else:
+                run_choice(family_tree, choice)
+    finally:
+        if family_tree is not None:
+            family_tree.commit()  # a SQLite tree batches its writes
 
-family_tree = FamilyTree()
 
-# Example family members from both branches
+def run_choice(family_tree, choice):
+    if choice == "1":
+        name = input("Enter the name of the person: ")
+        person = family_tree.find_person(name)
+        if person:
+            parents = person.parents
+            grandchildren = person.get_grandchildren()
+            print(f"Parents of {name}: {[p.name for p in parents]}")
+            print(f"Grandchildren of {name}: {[g.name for g in grandchildren]}")
+        else:
+            print(family_tree.not_found_message(name))
 
-# Partner A's branch
-otto = family_tree.add_person("Otto Emmersohn", birth_date=datetime(1980, 3, 15).date())
-emmerlia = family_tree.add_person("Cornelia Emmersohn", birth_date=datetime(1985, 6, 20).date())
+    elif choice == "2":
+        name = input("Enter the name of the person: ")
+        person = family_tree.find_person(name)
+        if person:
+            immediate_family = person.get_immediate_family()
+            print(f"Immediate family of {name}: {immediate_family}")
+        else:
+            print(family_tree.not_found_message(name))
 
-anna = family_tree.add_person("Anna Emmersohn", birth_date=datetime(2010, 5, 15).date())
-otto.add_child(anna)
-emmerlia.add_child(anna)
+    elif choice == "3":
+        name = input("Enter the name of the person: ")
+        person = family_tree.find_person(name)
+        if person:
+            extended_family = person.get_extended_family()
+            print(f"Extended family of {name}: {extended_family}")
+        else:
+            print(family_tree.not_found_message(name))
 
-# Partner B's branch
-karanbir = family_tree.add_person("Karanbir Thakuri", birth_date=datetime(1935, 10, 10).date(),
-                                  death_date=datetime(2005, 5, 25).date())
-laxmi = family_tree.add_person("Laxmi Thakuri", birth_date=datetime(1938, 2, 5).date(),
-                               death_date=datetime(2010, 9, 10).date())
+    elif choice == "4":
+        average_age = family_tree.average_age_at_death()
+        if average_age is not None:
+            print(f"The average age at death is {average_age:.2f} years.")
+        else:
+            print("No death dates found.")
 
-# Adding siblings and children
-karanbir.add_sibling(laxmi)
-laxmi.add_child(otto)  # Laxmi is Otto's grandparent
+    elif choice == "5":
+        show_report(family_tree, 'children')
 
+    elif choice == "6":
+        avg_children = family_tree.average_number_of_children()
+        if avg_children is not None:
+            print(f"The average number of children per person is {avg_children:.2f}.")
+        else:
+            print("No people found.")
+
+    elif choice == "7":
+        name = input("Enter the name of the person: ")
+        siblings = family_tree.get_siblings(name)
+        print(f"Siblings of {name}: {siblings}")
+
+    elif choice == "8":
+        name = input("Enter the name of the person: ")
+        cousins = family_tree.get_cousins(name)
+        print(f"Cousins of {name}: {cousins}")
+
+    elif choice == "9":
+        print("Family Birthdays:")
+        show_report(family_tree, 'birthdays')
+
+    elif choice == "10":
+        print("Birthday Calendar:")
+        show_report(family_tree, 'calendar')
+
+    elif choice == "11":
+        name = input("Enter the name of the first person: ")
+        relative_name = input("Enter the name of the second person: ")
+        relationship = family_tree.relationship(name, relative_name)
+        if relationship:
+            print(f"{relative_name} is {name}'s {relationship}.")
+        else:
+            print(f"No relationship found between {name} and {relative_name}.")
 
-# Main interactive program for all features
-def main():
-    while True:
-        print("\n--- Family Tree Menu ---")
-        print("1. Parents and Grandparents")
-        print("2. Immediate Family")
-        print("3. Extended Family")
-        print("4. Average Age at Death")
-        print("5. Number of Children for Each Individual")
-        print("6. Average Number of Children per Person")
-        print("7. Siblings")
-        print("8. Cousins")
-        print("9. Family Birthdays")
-        print("10. Sorted Birthday Calendar")
-        print("11. Exit")
-        choice = input("Enter your choice: ")
-
-        if choice == "1":
-            name = input("Enter the name of the person: ")
-            person = family_tree.find_person(name)
-            if person:
-                parents = person.parents
-                grandchildren = person.get_grandchildren()
-                print(f"Parents of {name}: {[p.name for p in parents]}")
-                print(f"Grandchildren of {name}: {[g.name for g in grandchildren]}")
-            else:
-                print(f"No person found with name {name}.")
-
-        elif choice == "2":
-            name = input("Enter the name of the person: ")
-            person = family_tree.find_person(name)
-            if person:
-                immediate_family = person.get_immediate_family()
-                print(f"Immediate family of {name}: {immediate_family}")
-            else:
-                print(f"No person found with name {name}.")
-
-        elif choice == "3":
-            name = input("Enter the name of the person: ")
-            person = family_tree.find_person(name)
-            if person:
-                extended_family = person.get_extended_family()
-                print(f"Extended family of {name}: {extended_family}")
-            else:
-                print(f"No person found with name {name}.")
+    elif choice == "12":
+        instrumentation = family_tree.instrumentation()
+        if instrumentation.enabled:
+            instrumentation.summary()
+        else:
+            instrumentation.enable()
+            print("Instrumentation is now on. Run some commands, then choose 12 again for the summary.")
 
-        elif choice == "4":
-            average_age = family_tree.average_age_at_death()
-            if average_age is not None:
-                print(f"The average age at death is {average_age:.2f} years.")
-            else:
-                print("No death dates found.")
+    else:
+        print("Invalid choice. Please try again.")
 
-        elif choice == "5":
-            children_count = family_tree.number_of_children()
-            for person, count in children_count.items():
-                print(f"{person} has {count} children.")
 
-        elif choice == "6":
-            avg_children = family_tree.average_number_of_children()
-            if avg_children is not None:
-                print(f"The average number of children per person is {avg_children:.2f}.")
-            else:
-                print("No people found.")
-
-        elif choice == "7":
-            name = input("Enter the name of the person: ")
-            siblings = family_tree.get_siblings(name)
-            print(f"Siblings of {name}: {siblings}")
-
-        elif choice == "8":
-            name = input("Enter the name of the person: ")
-            cousins = family_tree.get_cousins(name)
-            print(f"Cousins of {name}: {cousins}")
-
-        elif choice == "9":
-            birthdays = family_tree.get_birthdays()
-            print("Family Birthdays:")
-            for name, birth_date in birthdays.items():
-                print(f"{name}: {birth_date.strftime('%B %d')}")
-
-        elif choice == "10":
-            birthday_calendar = family_tree.get_sorted_birthdays()
-            print("Birthday Calendar:")
-            for date, names in birthday_calendar:
-                print(f"{date}: {', '.join(names)}")
-
-        elif choice == "11":
-            print("Exiting the program. Goodbye!")
+def show_report(family_tree, report, page_size=PAGE_SIZE):
+    """Print a listing a page at a time as it is produced, asking before each further page."""
+    from familytree import reports
+    for page, more in reports.pages(reports.REPORTS[report][0](family_tree), page_size):
+        reports.write_rows(report, page)
+        if more and input("-- Press Enter for more, or q to stop: ").strip().lower() == "q":
             break
 
-        else:
-            print("Invalid choice. Please try again.")
-
 
 if __name__ == "__main__":
-    main()
+    # "--serve [port]" runs the HTTP query service, "--check" prints an
+    # integrity report and "--report <name> [text|csv|jsonl]" streams a
+    # listing (children, birthdays, calendar, extended) to stdout, instead
+    # of the menu
+    arguments = sys.argv[1:]
+    serving = arguments[:1] == ['--serve']
+    checking = arguments[:1] == ['--check']
+    reporting = arguments[:1] == ['--report']
+    if serving or checking or reporting:
+        arguments.pop(0)
+    if serving:
+        port = int(arguments.pop(0)) if arguments and arguments[0].isdigit() else 8080
+    if reporting:
+        from familytree import reports
+        report_name = arguments.pop(0) if arguments else 'children'
+        if report_name not in reports.REPORTS:
+            sys.exit(f"Unknown report {report_name!r}; choose one of: {', '.join(reports.REPORTS)}")
+        report_format = arguments.pop(0) if arguments and arguments[0] in reports.FORMATS else 'text'
+    # An optional snapshot or SQLite database path replaces the built-in
+    # example tree; either is opened only once something needs it
+    load = sample_tree
+    if arguments and arguments[0].endswith(('.db', '.sqlite')):
+        load = partial(FamilyTree.open_database, arguments[0])
+    elif arguments:
+        load = partial(FamilyTree.open_snapshot, arguments[0])
+    if serving:
+        from familytree import service
+        service.serve(load(), port=port)
+    elif checking:
+        from familytree.validate import report
+        sys.exit(1 if report(load().validate(), sys.stdout) else 0)
+    elif reporting:
+        try:
+            reports.write(load(), report_name, sys.stdout, report_format)
+            sys.stdout.flush()
+        except BrokenPipeError:  # the reader stopped early, e.g. "| head"
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+    else:
+        main(load=load)
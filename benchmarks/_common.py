@@ -0,0 +1,18 @@
+"""Helpers shared by the benchmark scripts."""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_feature(number):
+    """Import "Feature <number>.py", whose name is not a valid module name."""
+    path = os.path.join(ROOT, f"Feature {number}.py")
+    spec = importlib.util.spec_from_file_location(f"feature_{number}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
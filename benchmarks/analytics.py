@@ -0,0 +1,107 @@
+"""Compare per-person Python loops with the NumPy analytics module.
+
+Usage: python benchmarks/analytics.py [people]
+"""
+
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.analytics import Demographics
+from familytree.stats import age_between
+from familytree.store import PersonStore
+
+
+def build_store(people, seed=0):
+    """Random birth dates from 1700 on; most people have died; children get a random older couple."""
+    rng = random.Random(seed)
+    first, last = date(1700, 1, 1).toordinal(), date(2020, 1, 1).toordinal()
+    rows = []
+    for index in range(people):
+        birth = rng.randrange(first, last) if rng.random() < 0.9 else None
+        death = birth + rng.randrange(0, 100 * 365) if birth and rng.random() < 0.7 else None
+        rows.append((f"Person {index}", birth and date.fromordinal(birth), death and date.fromordinal(death)))
+    store = PersonStore()
+    store.add_many(rows)
+
+    def edges():
+        for index in range(1000, people):
+            father = rng.randrange(0, index - 500, 2)
+            yield 'parent', index, father
+            yield 'parent', index, father + 1
+
+    store.add_relationships(edges())
+    return store
+
+
+def loop_analytics(store):
+    """What the analyses cost written as a Python loop over every person."""
+    ages = []
+    cohorts = defaultdict(lambda: [0, 0])
+    children = 0
+    for person_id in store.ids():
+        birth_date, death_date = store.birth_date(person_id), store.death_date(person_id)
+        count = len(store.children(person_id))
+        children += count
+        age = age_between(birth_date, death_date)
+        if age is not None:
+            ages.append(age)
+        if birth_date:
+            cohort = cohorts[birth_date.year // 10 * 10]
+            cohort[0] += 1
+            cohort[1] += count
+    return {
+        'average_age_at_death': sum(ages) / len(ages),
+        'median_age_at_death': statistics.median(ages),
+        'percentiles': statistics.quantiles(ages, n=4, method='inclusive'),
+        'average_number_of_children': children / len(store),
+        'cohorts': {start: cohorts[start][1] / cohorts[start][0] for start in sorted(cohorts)},
+    }
+
+
+def vector_analytics(store):
+    demographics = Demographics(store)
+    quartiles = demographics.lifespan_percentiles((25, 50, 75))
+    return {
+        'average_age_at_death': demographics.average_age_at_death(),
+        'median_age_at_death': demographics.median_age_at_death(),
+        'percentiles': [quartiles[25], quartiles[50], quartiles[75]],
+        'average_number_of_children': demographics.average_number_of_children(),
+        'cohorts': {start: summary['average_number_of_children']
+                    for start, summary in demographics.cohorts().items()},
+    }
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    store = build_store(people)
+    store.compact()
+
+    start = time.perf_counter()
+    expected = loop_analytics(store)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = vector_analytics(store)
+    vector_time = time.perf_counter() - start
+
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert value.keys() == found[key].keys() and all(
+                abs(value[start] - found[key][start]) < 1e-9 for start in value), key
+        elif isinstance(value, list):
+            assert all(abs(a - b) < 1e-9 for a, b in zip(value, found[key])), key
+        else:
+            assert abs(value - found[key]) < 1e-9, key
+
+    print(f"{people} people")
+    print(f"python loops:           {loop_time:.2f} s")
+    print(f"numpy (export+compute): {vector_time:.2f} s  ({loop_time / vector_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
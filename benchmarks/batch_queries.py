@@ -0,0 +1,50 @@
+"""Whole-generation reports: one query per person against the batched queries.
+
+Everyone born in one decade of a synthetic population is asked for their
+cousins and their extended family, first one name at a time (with the query
+cache off, so every call walks its own neighbourhood) and then through
+get_cousins_many / get_extended_family_many. Both must give the same
+answers.
+
+Usage: python benchmarks/batch_queries.py [people] [decade]
+"""
+
+import sys
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.store import PersonStore
+from familytree.synthetic import populate
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    store = PersonStore()
+    populate(store, people)
+    tree = FamilyTree(store, cache_size=0)
+    births = [birth for birth in map(store.birth_date, store.ids()) if birth]
+    decade = int(sys.argv[2]) if len(sys.argv) > 2 else sorted(births)[len(births) // 2].year // 10 * 10
+    names = [store.name(person_id) for person_id in store.ids()
+             if store.birth_date(person_id) and store.birth_date(person_id).year // 10 * 10 == decade]
+    units = len({tuple(store.parents(store.find(name))) for name in names})
+    print(f"{people} people; report on the {len(names)} born in the {decade}s ({units} family units)")
+
+    for label, single, many in (('cousins', tree.get_cousins, tree.get_cousins_many),
+                                ('extended family', lambda name: tree.find_person(name).get_extended_family(),
+                                 tree.get_extended_family_many)):
+        one_by_one, expected = timed(lambda: [(name, single(name)) for name in names])
+        batched, result = timed(lambda: list(many(names)))
+        assert result == expected, label
+        print(f"{label:16} one at a time {one_by_one:7.3f} s   batched {batched:7.3f} s   "
+              f"{one_by_one / batched:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
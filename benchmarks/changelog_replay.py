@@ -0,0 +1,117 @@
+"""Change log size, replay throughput, and catching up a replica against a full copy.
+
+A synthetic population is built with the change log recording, so every
+person and edge becomes one record. The report shows the log's size per
+record, then how fast a fresh replica replays all of it. A batch of
+random edits (new people, children, spouses, dates) is then made on the
+master: the replica applies just those through catch_up, timed against
+writing and reloading a whole snapshot, which is what shipping the tree
+would cost without the log. The replica must match the master exactly.
+
+Usage: python benchmarks/changelog_replay.py [people] [edits]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.snapshot import Snapshot, write_snapshot
+from familytree.store import PersonStore, copy_store
+from familytree.synthetic import populate
+
+
+NEWCOMERS_BORN = date(2000, 1, 1).toordinal()
+DEATHS_FROM = date(2020, 1, 1).toordinal()
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def random_edits(tree, count, seed=1):
+    rng = random.Random(seed)
+    store = tree.store
+    for index in range(count):
+        size = len(store)
+        choice = rng.random()
+        if choice < 0.3:
+            child = store.add(f"Newcomer {index}", date.fromordinal(NEWCOMERS_BORN + index))
+            store.add_child(rng.randrange(size), child)
+        elif choice < 0.6:
+            store.add_child(rng.randrange(size), rng.randrange(size))
+        elif choice < 0.8:
+            person_id, spouse_id = rng.sample(range(size), 2)
+            store.set_spouse(person_id, spouse_id)
+        else:
+            store.set_death_date(rng.randrange(size), date.fromordinal(DEATHS_FROM + index))
+
+
+def same_store(first, second, order=list):
+    # A snapshot keeps each person's parents in order but lists children by id, so copies compare sorted
+    return (len(first) == len(second)
+            and all(first.name(person_id) == second.name(person_id)
+                    and first.birth_date(person_id) == second.birth_date(person_id)
+                    and first.death_date(person_id) == second.death_date(person_id)
+                    and first.spouse(person_id) == second.spouse(person_id)
+                    and order(first.parents(person_id)) == order(second.parents(person_id))
+                    and order(first.children(person_id)) == order(second.children(person_id))
+                    and order(first.recorded_siblings(person_id)) == order(second.recorded_siblings(person_id))
+                    for person_id in first.ids()))
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    with tempfile.TemporaryDirectory() as directory:
+        log_directory = os.path.join(directory, 'log')
+        master = FamilyTree()
+        changelog = master.record_changes(log_directory)
+        elapsed, _ = timed(lambda: populate(master.store, people))
+        changelog.flush()
+        records = changelog.sequence
+        print(f"{people} people logged as {records} records in {elapsed:.2f} s "
+              f"({directory_size(log_directory) / records:.1f} bytes per record)")
+
+        elapsed, replica = timed(lambda: FamilyTree.open_replica(log_directory))
+        print(f"full replay:          {elapsed:7.3f} s   {records / elapsed:12,.0f} records/s")
+        assert same_store(master.store, replica.store)
+
+        random_edits(master, edits)
+        changelog.flush()
+        delta = changelog.sequence - records
+        elapsed, applied = timed(replica.catch_up)
+        assert applied == delta and same_store(master.store, replica.store)
+        print(f"catch up {delta:6} changes: {elapsed * 1e3:7.1f} ms   {delta / elapsed:12,.0f} records/s")
+
+        snapshot = os.path.join(directory, 'whole.snap')
+
+        def reship():
+            write_snapshot(master.store, snapshot)
+            copy = PersonStore()
+            with Snapshot.open(snapshot) as opened:
+                copy_store(opened, copy)
+            return copy
+        elapsed, copy = timed(reship)
+        assert same_store(master.store, copy, sorted)
+        print(f"whole snapshot copy:  {elapsed * 1e3:7.1f} ms")
+
+        elapsed, _ = timed(master.checkpoint)
+        print(f"checkpoint:           {elapsed * 1e3:7.1f} ms   log now {directory_size(log_directory) / 1e6:.1f} MB")
+        elapsed, applied = timed(replica.catch_up)
+        print(f"replica catch up after checkpoint: {elapsed * 1e3:7.1f} ms ({applied} records)")
+        changelog.close()
+
+
+if __name__ == "__main__":
+    main()
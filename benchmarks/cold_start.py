@@ -0,0 +1,62 @@
+"""Cold-start time of the Feature 3 menu and of importing the model.
+
+Each case runs in a fresh interpreter and is repeated; the median wall time
+is reported along with the optional subsystems that were loaded by the time
+the process exited. The menu case quits at the first prompt, so it measures
+startup alone; "first command" also builds the sample tree and answers one
+query. Every case runs twice: as installed, and with NumPy made unimportable,
+which should make no difference because nothing at startup needs it.
+
+Usage: python benchmarks/cold_start.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import ROOT
+
+OPTIONAL = ('numpy', 'asyncio', 'multiprocessing', 'concurrent.futures', 'sqlite3', 'cProfile', 'tracemalloc')
+FEATURE_3 = os.path.join(ROOT, 'Feature 3.py')
+
+# Each case is Python source run with -c; it prints the optional modules it loaded
+REPORT = f"import sys; print('\\nloaded:', ','.join(m for m in {OPTIONAL!r} if m in sys.modules))"
+CASES = {
+    'import familytree': "import familytree",
+    'import familytree.model': "import familytree.model",
+    'menu, quit at first prompt': f"import runpy; runpy.run_path({FEATURE_3!r}, run_name='__main__')",
+    'menu, first command': f"import runpy; runpy.run_path({FEATURE_3!r}, run_name='__main__')",
+}
+INPUT = {
+    'menu, quit at first prompt': "13\n",
+    'menu, first command': "8\nOtto Emmersohn\n13\n",
+}
+WITHOUT_NUMPY = "import sys; sys.modules['numpy'] = None; "
+
+
+def run(source, stdin, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', f"{source}\n{REPORT}"], input=stdin, cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), output.rsplit('loaded:', 1)[1].strip()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    baseline, _ = run("pass", "", runs)
+    print(f"{'bare interpreter':28} {baseline * 1e3:7.1f} ms")
+    for label, source in CASES.items():
+        stdin = INPUT.get(label, "")
+        installed, loaded = run(source, stdin, runs)
+        without, _ = run(WITHOUT_NUMPY + source, stdin, runs)
+        print(f"{label:28} {installed * 1e3:7.1f} ms  without NumPy {without * 1e3:7.1f} ms  "
+              f"optional modules loaded: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure GEDCOM import/export throughput on a synthetic file.
+
+Usage: python benchmarks/gedcom_throughput.py [people]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree import gedcom
+from familytree.store import PersonStore
+
+
+def synthetic_gedcom(people, seed=0):
+    """Yield GEDCOM lines for ``people`` individuals in couples with 0-5 children."""
+    rng = random.Random(seed)
+    yield '0 HEAD'
+    yield '1 CHAR UTF-8'
+    families = []
+    unmarried = []
+    for index in range(people):
+        birth = date(1700 + index * 300 // people, rng.randint(1, 12), rng.randint(1, 28))
+        yield f'0 @I{index}@ INDI'
+        yield f'1 NAME Given{index % 997} /Surname{index % 1009}/'
+        yield '1 BIRT'
+        yield f'2 DATE {gedcom.format_date(birth)}'
+        if birth.year < 1930:
+            yield '1 DEAT'
+            yield f'2 DATE {gedcom.format_date(date(birth.year + rng.randint(20, 90), 6, 1))}'
+        unmarried.append(index)
+        if len(unmarried) == 2 and rng.random() < 0.7:
+            families.append((unmarried[0], unmarried[1], []))
+            unmarried = []
+        elif len(unmarried) == 2:
+            unmarried.pop(0)
+        # Give the oldest open family a child every so often.
+        if families and len(families[0][2]) < rng.randint(0, 5):
+            families[0][2].append(index)
+        elif len(families) > 1000:
+            yield from _family(*families.pop(0))
+    for family in families:
+        yield from _family(*family)
+    yield '0 TRLR'
+
+
+def _family(husband, wife, children):
+    yield f'0 @F{husband}@ FAM'
+    yield f'1 HUSB @I{husband}@'
+    yield f'1 WIFE @I{wife}@'
+    yield '1 MARR'
+    for child in children:
+        yield f'1 CHIL @I{child}@'
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'synthetic.ged')
+        with open(source, 'w', encoding='utf-8') as handle:
+            records = 0
+            for line in synthetic_gedcom(people):
+                records += line.startswith('0 ')
+                handle.write(line + '\n')
+        size = os.path.getsize(source)
+
+        store = PersonStore()
+        start = time.perf_counter()
+        gedcom.read_gedcom(source, store)
+        read_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gedcom.write_gedcom(store, os.path.join(directory, 'export.ged'))
+        write_seconds = time.perf_counter() - start
+
+    print(f"file:    {people} people, {records} records, {size / 1e6:.1f} MB")
+    print(f"import:  {read_seconds:6.1f} s  {records / read_seconds:10.0f} records/s")
+    print(f"export:  {write_seconds:6.1f} s  {records / write_seconds:10.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time the one-pass lineage index against a descendant walk per person.
+
+Also checks every count against the walk, before and after a run of random
+changes (new children, new people, death dates) that the index follows
+incrementally.
+
+Usage: python benchmarks/lineage.py [people] [changes]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree import traversal
+from familytree.lineage import LineageIndex
+from familytree.store import PersonStore
+from familytree.synthetic import populate
+
+
+def walk(store, person_id):
+    descendants = list(traversal.descendants(person_id, store.children))
+    living = sum(1 for descendant_id in descendants if store.death_date(descendant_id) is None)
+    return len(descendants), living
+
+
+def check(store, lineage, sample):
+    for person_id in sample:
+        assert (lineage.descendant_count(person_id), lineage.living_descendant_count(person_id)) == \
+            walk(store, person_id), person_id
+        assert lineage.lineage_depth(person_id) == depth_of(store, person_id), person_id
+
+
+def depth_of(store, person_id):
+    # Generations below, level by level
+    depth, level = 0, [person_id]
+    while True:
+        level = list(dict.fromkeys(child_id for parent_id in level for child_id in store.children(parent_id)))
+        if not level:
+            return depth
+        depth += 1
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    store = PersonStore()
+    populate(store, people)
+
+    start = time.perf_counter()
+    for person_id in store.ids():
+        walk(store, person_id)
+    walked = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lineage = LineageIndex(store)
+    built = time.perf_counter() - start
+    tracemalloc.start()
+    LineageIndex(store).close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{people} people: walk per person {walked:.2f} s, one-pass index {built:.2f} s "
+          f"({walked / built:.1f}x, peak {peak / 1e6:.0f} MB while building)")
+
+    rng = random.Random(1)
+    check(store, lineage, [rng.randrange(people) for _ in range(500)])
+
+    start = time.perf_counter()
+    for step in range(changes):
+        roll = rng.random()
+        if roll < 0.5:
+            # Parents always have lower IDs than their children here, so no cycles
+            parent_id, child_id = sorted(rng.sample(range(len(store)), 2))
+            store.add_child(parent_id, child_id)
+        elif roll < 0.7:
+            child_id = store.add(f"Newborn {step}", date(2025, 1, 1))
+            store.add_child(rng.randrange(len(store) - 1), child_id)
+        else:
+            person_id = rng.randrange(len(store))
+            store.set_death_date(person_id, None if store.death_date(person_id) else date(2025, 6, 1))
+        lineage.descendant_count(rng.randrange(len(store)))
+    elapsed = time.perf_counter() - start
+    check(store, lineage, [rng.randrange(len(store)) for _ in range(500)])
+    print(f"{changes} changes, each followed by a lookup: {elapsed * 1e3 / changes:.2f} ms per change")
+    print("all sampled counts and depths match a fresh walk")
+
+
+if __name__ == "__main__":
+    main()
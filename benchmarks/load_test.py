@@ -0,0 +1,108 @@
+"""Load-test the HTTP query service.
+
+The service runs in a child process over a synthetic tree; this process
+opens keep-alive connections and keeps each one busy for a fixed time.
+Reports requests per second and p50/p99 latency for plain reads, reads
+mixed with writes, and batched multi-person lookups.
+
+Usage: python benchmarks/load_test.py [people] [connections] [seconds]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import random
+import sys
+import time
+from urllib.parse import quote
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.service import TreeService
+from familytree.store import PersonStore
+from familytree.synthetic import populate
+
+PORT = 8765
+READS = ('person', 'siblings', 'cousins', 'immediate-family', 'extended-family')
+
+
+def run_server(tree, ready):
+    async def run():
+        service = TreeService(tree)
+        server = await service.start(port=PORT)
+        ready.set()
+        await server.serve_forever()
+    asyncio.run(run())
+
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                 + data)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(names, seconds, write_share, batch, rng, latencies, counts):
+    reader, writer = await asyncio.open_connection('127.0.0.1', PORT)
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if batch:
+            lookups = [{'query': rng.choice(READS), 'name': rng.choice(names)} for _ in range(batch)]
+            status, _ = await request(reader, writer, 'POST', '/batch', {'requests': lookups})
+        elif rng.random() < write_share:
+            status, _ = await request(reader, writer, 'POST', '/people', {'name': f"Visitor {rng.random()}"})
+        else:
+            status, _ = await request(reader, writer, 'GET',
+                                      f"/{rng.choice(READS)}?name={quote(rng.choice(names))}")
+        latencies.append(time.perf_counter() - start)
+        counts[status] = counts.get(status, 0) + 1
+    writer.close()
+
+
+async def scenario(label, names, connections, seconds, write_share=0.0, batch=0):
+    latencies, counts = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(names, seconds, write_share, batch, random.Random(seed), latencies, counts)
+                           for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    rate = len(latencies) / elapsed
+    lookups = f"  ({rate * batch:,.0f} lookups/s)" if batch else ""
+    print(f"{label:28} {rate:8,.0f} requests/s  p50 {latencies[len(latencies) // 2] * 1e3:6.2f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:6.2f} ms  status {counts}{lookups}")
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    store = PersonStore()
+    populate(store, people)
+    rng = random.Random(1)
+    names = [store.name(rng.randrange(people)) for _ in range(2000)]
+
+    context = multiprocessing.get_context('fork')
+    ready = context.Event()
+    server = context.Process(target=run_server, args=(FamilyTree(store), ready), daemon=True)
+    server.start()
+    ready.wait()
+    try:
+        print(f"{people} people, {connections} connections, {seconds:g} s per scenario")
+        asyncio.run(scenario('reads', names, connections, seconds))
+        asyncio.run(scenario('reads + 1% writes', names, connections, seconds, write_share=0.01))
+        asyncio.run(scenario('batches of 20 lookups', names, connections, seconds, batch=20))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
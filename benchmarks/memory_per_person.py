@@ -0,0 +1,66 @@
+"""Compare memory per person: Feature 2.py's object graph vs PersonStore.
+
+Usage: python benchmarks/memory_per_person.py [people]
+"""
+
+import random
+import sys
+import tracemalloc
+from datetime import date
+
+from _common import load_feature
+from familytree.store import PersonStore
+
+
+def synthetic_people(count, seed=0):
+    """Yield (name, birth_date, parent indexes) rows for a random population."""
+    rng = random.Random(seed)
+    for index in range(count):
+        birth = date(1800 + index * 200 // count, rng.randint(1, 12), rng.randint(1, 28))
+        parents = rng.sample(range(index), 2) if index >= 100 else []
+        yield f"Person {index:08d}", birth, parents
+
+
+def measure(build, count):
+    tracemalloc.start()
+    keep = build(count)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return used
+
+
+def build_objects(count):
+    feature_2 = load_feature(2)
+    tree = feature_2.FamilyTree()
+    people = []
+    for name, birth, parents in synthetic_people(count):
+        person = tree.add_person(name, birth)
+        for parent in parents:
+            people[parent].add_child(person)
+        people.append(person)
+    return tree
+
+
+def build_store(count):
+    store = PersonStore()
+    for name, birth, parents in synthetic_people(count):
+        person_id = store.add(name, birth)
+        for parent in parents:
+            store.add_child(parent, person_id)
+    store.compact()
+    return store
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    objects = measure(build_objects, count)
+    store = measure(build_store, count)
+    print(f"people:           {count}")
+    print(f"object graph:     {objects / count:8.1f} bytes/person")
+    print(f"PersonStore:      {store / count:8.1f} bytes/person")
+    print(f"reduction:        {objects / store:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Time normalised, prefix and fuzzy name lookups on a large store.
+
+Usage: python benchmarks/name_lookup.py [people]
+"""
+
+import random
+import sys
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.names import NameIndex, edit_distance, normalize
+from familytree.store import PersonStore
+
+SYLLABLES = ['an', 'ber', 'ca', 'dor', 'el', 'fi', 'gar', 'ha', 'is', 'jo', 'ka', 'lin', 'ma', 'nes',
+             'o', 'pe', 'qui', 'ro', 'sa', 'to', 'ul', 'va', 'wil', 'xa', 'ya', 'zo', 'mü', 'sø', 'é', 'ñe']
+
+
+def vocabulary(rng, size, syllables):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(*syllables))).capitalize())
+    return sorted(words)
+
+
+def name_generator(rng):
+    """Full names drawn from 3,000 given names and 40,000 surnames built from syllables."""
+    given, surnames = vocabulary(rng, 3000, (2, 3)), vocabulary(rng, 40_000, (2, 4))
+    return lambda: f"{rng.choice(given)} {rng.choice(surnames)}"
+
+
+def misspell(rng, name):
+    position = rng.randrange(len(name))
+    return name[:position] + rng.choice('aeiourst') + name[position + 1:]
+
+
+def per_query(function, queries):
+    start = time.perf_counter()
+    results = [function(query) for query in queries]
+    return (time.perf_counter() - start) * 1e6 / len(queries), results
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    store = PersonStore()
+    random_name = name_generator(rng)
+    store.add_many((random_name(), None, None) for _ in range(people))
+
+    start = time.perf_counter()
+    index = NameIndex(store)
+    print(f"build index for {people} people: {time.perf_counter() - start:.1f} s, {len(index)} distinct names")
+
+    sample = [store.name(rng.randrange(people)) for _ in range(2000)]
+    messy = [name.upper().replace(' ', '  ') for name in sample]
+    elapsed, found = per_query(index.exact, messy)
+    assert all(found)
+    print(f"exact (normalised):  {elapsed:8.1f} us/query")
+
+    elapsed, found = per_query(lambda name: index.prefix(name[:8], limit=10), sample)
+    print(f"prefix, 10 results:  {elapsed:8.1f} us/query")
+
+    typos = [misspell(rng, name) for name in sample[:500]]
+    elapsed, found = per_query(lambda name: index.fuzzy(name, limit=5), typos)
+    hits = sum(normalize(name) in [key for key, _, _ in result] for name, result in zip(sample, found))
+    print(f"fuzzy, 2 edits:      {elapsed:8.1f} us/query  (original name ranked in {hits}/{len(typos)})")
+
+    # The trigram filter must not lose anything a full scan would find
+    for typo, result in zip(typos[:5], found[:5]):
+        key = normalize(typo)
+        expected = sorted(candidate for candidate in index.keys if edit_distance(key, candidate, 2) <= 2)
+        assert sorted(candidate for candidate, _, _ in index.fuzzy(typo, limit=len(expected) + 1)) == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Speedup of whole-tree batch queries with 1, 2, 4 and 8 worker processes.
+
+Every parallel result is checked against the serial one.
+
+Usage: python benchmarks/parallel_analytics.py [people]
+"""
+
+import os
+import sys
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.parallel import components
+from familytree.store import PersonStore
+from familytree.synthetic import populate
+
+WORKERS = (1, 2, 4, 8)
+QUERIES = ('extended_family', 'descendant_count')
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tree = FamilyTree(PersonStore())
+    populate(tree.store, people)
+    start = time.perf_counter()
+    families = len(set(components(tree.store)))
+    print(f"{people} people in {families} connected families (found in {time.perf_counter() - start:.2f} s), "
+          f"{os.cpu_count()} CPUs")
+
+    for query in QUERIES:
+        baseline = expected = None
+        for workers in WORKERS:
+            start = time.perf_counter()
+            results = tree.batch_query(query, workers=workers)
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                baseline, expected = elapsed, results
+            assert results == expected, (query, workers)
+            print(f"{query:18} {workers} workers  {elapsed:7.2f} s  speedup {baseline / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
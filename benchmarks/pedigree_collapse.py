@@ -0,0 +1,79 @@
+"""Ancestor counts and kinship coefficients in a deep, heavily collapsed pedigree.
+
+A closed population of ``width`` people per generation is bred for
+``generations`` generations, every child getting two random parents from
+the generation before. Everyone at the bottom then has 2**n ancestor slots
+at n generations but never more than ``width`` distinct ancestors.
+
+The memoised Pedigree is timed against the plain recursion over parents
+(which visits every path) on a shallow copy of the same population, where
+the recursion still finishes; both must agree.
+
+Usage: python benchmarks/pedigree_collapse.py [generations] [width]
+"""
+
+import random
+import sys
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.pedigree import Pedigree
+from familytree.store import PersonStore
+
+
+def closed_population(generations, width, seed=1):
+    """A PersonStore and the IDs of its last generation."""
+    rng = random.Random(seed)
+    store = PersonStore()
+    level = [store.add(f"Founder {index}") for index in range(width)]
+    for generation in range(1, generations + 1):
+        children = [store.add(f"Person {generation}.{index}") for index in range(width)]
+        store.add_relationships(('child', parent_id, child_id)
+                                for child_id in children for parent_id in rng.sample(level, 2))
+        level = children
+    return store, level
+
+
+def naive_kinship(store, first, second):
+    # The textbook recursion without memoising: one call per path pair
+    if first == second:
+        parents = store.parents(first)
+        return (1 + naive_kinship(store, *parents)) / 2 if len(parents) == 2 else 0.5
+    if first < second:  # IDs grow down the generations, so the higher ID is never the ancestor
+        first, second = second, first
+    return sum(naive_kinship(store, parent_id, second) for parent_id in store.parents(first)) / 2
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    generations = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    store, bottom = closed_population(generations, width)
+    pedigree = Pedigree(store)
+    print(f"{generations} generations of {width} people ({len(store)} in all)")
+
+    elapsed, counts = timed(lambda: pedigree.ancestor_counts(bottom[0]))
+    for generation, distinct, slots in counts[::max(1, len(counts) // 8)]:
+        print(f"  generation {generation:3}: {distinct:4} distinct ancestors in {slots:.3g} slots")
+    print(f"ancestor counts per generation:   {elapsed * 1e3:8.2f} ms")
+    elapsed, _ = timed(lambda: pedigree.kinship(bottom[0], bottom[1]))
+    print(f"one kinship coefficient (cold):   {elapsed * 1e3:8.2f} ms")
+    elapsed, values = timed(lambda: [pedigree.inbreeding(person_id) for person_id in bottom])
+    print(f"inbreeding of the last generation: {elapsed * 1e3:7.2f} ms   mean F = {sum(values) / len(values):.3f}")
+
+    print("memoised against plain recursion:")
+    for depth in range(6, 11, 2):  # 12 generations already take the recursion about 40 s
+        shallow, pair = closed_population(depth, width)
+        memoised, expected = timed(lambda: Pedigree(shallow).kinship(*pair[:2]))
+        plain, result = timed(lambda: naive_kinship(shallow, *pair[:2]))
+        assert abs(result - expected) < 1e-12, (depth, result, expected)
+        print(f"  {depth:3} generations: memoised {memoised * 1e3:8.2f} ms   recursion {plain * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Check and time the relative query cache under a mixed read/write workload.
+
+Two FamilyTree objects share one store, one with the cache and one
+without. Every answer from the cached tree is compared with a fresh
+computation while random mutations (single and bulk) hit the store.
+
+Usage: python benchmarks/query_cache.py [people] [operations]
+"""
+
+import random
+import sys
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.store import NO_PERSON, PersonStore
+from familytree.synthetic import populate
+
+QUERIES = ('get_cousins', 'get_extended_family', 'get_immediate_family')
+
+
+def answer(tree, query, person_id):
+    result = getattr(tree.person(person_id), query)()
+    return [person.id for person in result] if query == 'get_cousins' else result
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    store = PersonStore()
+    populate(store, people)
+    cached, fresh = FamilyTree(store, cache_size=4096), FamilyTree(store, cache_size=0)
+    rng = random.Random(1)
+    # Interactive sessions keep coming back to a small set of people
+    favourites = [rng.randrange(people) for _ in range(500)]
+
+    cached_time = fresh_time = 0.0
+    reads = writes = 0
+    for _ in range(operations):
+        roll = rng.random()
+        if roll < 0.99:
+            person_id = rng.choice(favourites) if rng.random() < 0.9 else rng.randrange(len(store))
+            query = rng.choice(QUERIES)
+            start = time.perf_counter()
+            result = answer(cached, query, person_id)
+            middle = time.perf_counter()
+            expected = answer(fresh, query, person_id)
+            fresh_time += time.perf_counter() - middle
+            cached_time += middle - start
+            assert result == expected, (query, person_id, result, expected)
+            reads += 1
+            continue
+        writes += 1
+        # Half the mutations touch a favourite, so they do hit cached entries
+        a, b = rng.choice(favourites), rng.randrange(len(store))
+        if rng.random() < 0.5:
+            a, b = b, a
+        if roll < 0.992:
+            store.add(f"Newcomer {writes}")
+        elif roll < 0.995:
+            store.add_child(a, b)
+        elif roll < 0.997:
+            store.add_sibling(a, b)
+        elif roll < 0.999:
+            store.set_spouse(a, b if rng.random() < 0.9 else NO_PERSON)
+        else:
+            store.add_relationships([(rng.choice(('child', 'parent', 'sibling')), rng.choice(favourites),
+                                      rng.randrange(len(store))) for _ in range(20)])
+
+    info = cached.cache_info()
+    print(f"{people} people, {reads} queries, {writes} mutations: every cached answer matched")
+    print(f"uncached {fresh_time * 1e6 / reads:.1f} us/query, cached {cached_time * 1e6 / reads:.1f} us/query")
+    print(f"hit rate {info['hit_rate']:.1%}, {info['evictions']} evictions, "
+          f"{info['invalidations']} invalidations, {info['size']} entries")
+
+
+if __name__ == "__main__":
+    main()
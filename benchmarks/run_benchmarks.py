@@ -0,0 +1,151 @@
+"""Time FamilyTree operations on a synthetic population and record the results.
+
+Usage: python benchmarks/run_benchmarks.py [--people N] [--seed S] [--calls C]
+                                           [--output results.json] [--compare old.json]
+
+Every operation runs twice on identical generated trees: once for wall time
+and once under tracemalloc for peak memory, so tracing never slows the
+timings. The results file records the git commit, so runs from different
+commits can be compared with --compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+
+from _common import ROOT
+from familytree.model import FamilyTree
+from familytree.synthetic import populate
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def operations(tree, calls, seed):
+    """Yield ``(label, number of calls, function)`` in the order they run."""
+    rng = random.Random(seed)
+    store = tree.store
+    people = len(store)
+    sample = [tree.person(rng.randrange(people)) for _ in range(calls)]
+    names = [person.name for person in sample]
+
+    def add_person():
+        first_birth = date(1990, 1, 1).toordinal()
+        for index in range(calls):
+            tree.add_person(f"Benchmark Person {index}", date.fromordinal(first_birth + index))
+
+    def add_child():
+        # Older person -> younger person, so no parent cycles are created
+        for _ in range(calls):
+            first, second = tree.person(rng.randrange(people)), tree.person(rng.randrange(people))
+            if (first.birth_date or date.max) > (second.birth_date or date.max):
+                first, second = second, first
+            first.add_child(second)
+
+    yield 'add_person', calls, add_person
+    yield 'add_child', calls, add_child
+    yield 'get_cousins', calls, lambda: [tree.get_cousins(name) for name in names]
+    yield 'get_extended_family', calls, lambda: [person.get_extended_family() for person in sample]
+    yield 'get_sorted_birthdays (first call)', 1, tree.get_sorted_birthdays
+    yield 'get_sorted_birthdays', 1, tree.get_sorted_birthdays
+    yield 'statistics (first call)', 1, tree.average_age_at_death
+    yield 'average_age_at_death', calls, lambda: [tree.average_age_at_death() for _ in range(calls)]
+    yield 'median_age_at_death', calls, lambda: [tree.median_age_at_death() for _ in range(calls)]
+    yield 'average_number_of_children', calls, lambda: [tree.average_number_of_children() for _ in range(calls)]
+    yield 'fertility_by_generation', calls, lambda: [tree.fertility_by_generation() for _ in range(calls)]
+
+
+def run(people, seed, calls, traced):
+    """Build a tree and run every operation; returns ``{label: measurement}``."""
+    results = {}
+
+    def measure(label, count, function):
+        if traced:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            function()
+            results[label] = {'calls': count, 'peak_bytes': tracemalloc.get_traced_memory()[1] - baseline}
+        else:
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            results[label] = {'calls': count, 'seconds': elapsed, 'us_per_call': elapsed * 1e6 / count}
+
+    if traced:
+        tracemalloc.start()
+    tree = FamilyTree()
+    measure('populate', people, lambda: populate(tree.store, people, seed=seed))
+    for label, count, function in operations(tree, calls, seed):
+        measure(label, count, function)
+    if traced:
+        tracemalloc.stop()
+    return results
+
+
+def compare(current, previous):
+    print(f"\ncompared with {previous.get('commit') or 'unknown commit'}:")
+    for label, result in current['results'].items():
+        old = previous['results'].get(label)
+        if not old:
+            continue
+        time_ratio = result['seconds'] / old['seconds'] if old.get('seconds') else float('nan')
+        memory_ratio = result['peak_bytes'] / old['peak_bytes'] if old.get('peak_bytes') else float('nan')
+        print(f"{label:36} time x{time_ratio:6.2f}   peak memory x{memory_ratio:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--people', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--calls', type=int, default=1000, help="calls per timed operation")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    arguments = parser.parse_args()
+
+    commit, dirty = git_commit()
+    timings = run(arguments.people, arguments.seed, arguments.calls, traced=False)
+    memory = run(arguments.people, arguments.seed, arguments.calls, traced=True)
+    for label, result in timings.items():
+        result['peak_bytes'] = memory[label]['peak_bytes']
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'people': arguments.people,
+        'seed': arguments.seed,
+        'results': timings,
+    }
+    output = arguments.output or os.path.join(ROOT, 'benchmarks', 'results', f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+
+    print(f"{arguments.people} people, seed {arguments.seed}")
+    for label, result in timings.items():
+        print(f"{label:36} {result['us_per_call']:12.1f} us/call   peak {result['peak_bytes'] / 1e6:9.2f} MB")
+    print(f"results written to {output}")
+    if arguments.compare:
+        with open(arguments.compare) as handle:
+            compare(report, json.load(handle))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Time opening a large snapshot and querying it without deserialising.
+
+Usage: python benchmarks/snapshot_open.py [people]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.snapshot import write_snapshot
+from familytree.store import PersonStore
+
+
+def build_store(people, seed=0):
+    """People in couples; everyone after the first 1000 gets a random couple as parents."""
+    rng = random.Random(seed)
+    store = PersonStore()
+    store.add_many((f"Person {index}", None, None) for index in range(people))
+
+    def edges():
+        for index in range(0, people, 2):
+            yield 'spouse', index, index + 1
+        for index in range(1000, people):
+            father = rng.randrange(0, index - 500, 2)
+            yield 'parent', index, father
+            yield 'parent', index, father + 1
+
+    store.add_relationships(edges())
+    return store
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    start = time.perf_counter()
+    store = build_store(people)
+    print(f"build {people} people: {time.perf_counter() - start:.1f} s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tree.snap')
+        start = time.perf_counter()
+        write_snapshot(store, path)
+        print(f"write snapshot:      {time.perf_counter() - start:.1f} s, "
+              f"{os.path.getsize(path) / 1e6:.0f} MB")
+        del store
+
+        start = time.perf_counter()
+        tree = FamilyTree.open_snapshot(path)
+        print(f"open snapshot:       {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        rng = random.Random(1)
+        names = [f"Person {rng.randrange(people)}" for _ in range(1000)]
+        for label, query in (('find_person', tree.find_person), ('get_siblings', tree.get_siblings),
+                             ('get_cousins', tree.get_cousins)):
+            start = time.perf_counter()
+            for name in names:
+                query(name)
+            print(f"{label + ':':20} {(time.perf_counter() - start) * 1000 / len(names):.3f} ms/query")
+        tree.store.close()
+
+
+if __name__ == "__main__":
+    main()
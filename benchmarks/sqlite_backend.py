@@ -0,0 +1,78 @@
+"""Compare the SQLite backend with the in-memory PersonStore.
+
+Builds the same synthetic population in both, checks that every relative
+query agrees, then reports bulk-insert throughput and per-query latency.
+
+Usage: python benchmarks/sqlite_backend.py [people]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.store import PersonStore
+from familytree.synthetic import populate
+
+
+def queries(tree):
+    return {
+        'get_siblings': lambda person: tree.get_siblings(person.name),
+        'get_cousins': lambda person: person.get_cousins(),
+        'get_grandchildren': lambda person: person.get_grandchildren(),
+        'ancestors': lambda person: list(tree.ancestor_ids(person.id)),
+        'descendants (3 generations)': lambda person: list(tree.descendant_ids(person.id, 3)),
+        'second cousins': lambda person: list(tree.cousin_ids(person.id, 2)),
+    }
+
+
+def comparable(result):
+    # Both backends return the same people; only the order may differ
+    return sorted(getattr(item, 'id', item) for item in result)
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        memory = FamilyTree(PersonStore())
+        start = time.perf_counter()
+        populate(memory.store, people)
+        elapsed = time.perf_counter() - start
+        print(f"populate in memory:  {people / elapsed:10,.0f} people/s")
+
+        database = FamilyTree.open_database(os.path.join(directory, 'tree.db'))
+        start = time.perf_counter()
+        populate(database.store, people)
+        database.store.commit()
+        elapsed = time.perf_counter() - start
+        print(f"populate in SQLite:  {people / elapsed:10,.0f} people/s  "
+              f"({os.path.getsize(os.path.join(directory, 'tree.db')) / 1e6:.0f} MB)")
+
+        # Raw bulk insert: copy the finished population into a fresh database
+        start = time.perf_counter()
+        memory.save_database(os.path.join(directory, 'copy.db'))
+        elapsed = time.perf_counter() - start
+        print(f"bulk copy to SQLite: {people / elapsed:10,.0f} people/s (with their relationships)")
+
+        rng = random.Random(1)
+        sample = [rng.randrange(people) for _ in range(500)]
+        memory_queries, database_queries = queries(memory), queries(database)
+        for label in memory_queries:
+            timings = []
+            results = []
+            for tree, query in ((memory, memory_queries[label]), (database, database_queries[label])):
+                people_sample = [tree.person(person_id) for person_id in sample]
+                start = time.perf_counter()
+                results.append([comparable(query(person)) for person in people_sample])
+                timings.append((time.perf_counter() - start) * 1e6 / len(sample))
+            assert results[0] == results[1], label
+            print(f"{label:28} memory {timings[0]:8.1f} us   SQLite {timings[1]:8.1f} us")
+        database.store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Memory and time to first row of the streamed reports against the old dict-building listings.
+
+For trees of growing size, each listing is written to a null sink twice:
+from the FamilyTree method the menu used to call (number_of_children,
+get_birthdays, get_sorted_birthdays), which builds the whole result
+first, and from familytree.reports. The peak memory traced while writing
+(tracemalloc, after the tree and its indexes are built) should grow with
+the tree for the first and stay flat for the second.
+
+Usage: python benchmarks/streaming_reports.py [largest tree]
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree import reports
+from familytree.model import FamilyTree
+from familytree.store import PersonStore
+from familytree.synthetic import populate
+
+
+class NullSink(io.TextIOBase):
+    """Discards text but notes when the first line arrived."""
+
+    def __init__(self):
+        self.first = None
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(text)
+
+
+def materialised(tree, report, out):
+    # What the menu did before: build the full listing, then print it
+    if report == 'children':
+        for name, count in tree.number_of_children().items():
+            out.write(f"{name} has {count} children.\n")
+    elif report == 'birthdays':
+        for name, birth_date in tree.get_birthdays().items():
+            out.write(f"{name}: {birth_date.strftime('%B %d')}\n")
+    else:
+        for day, names in tree.get_sorted_birthdays():
+            out.write(f"{day}: {', '.join(names)}\n")
+
+
+def measure(write):
+    out = NullSink()
+    tracemalloc.start()
+    start = time.perf_counter()
+    write(out)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (out.first or time.perf_counter()) - start, elapsed, peak
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for people in (largest // 16, largest // 4, largest):
+        store = PersonStore()
+        populate(store, people)
+        tree = FamilyTree(store)
+        tree.birthdays()  # the calendar index is shared by both, so build it outside the measurement
+        print(f"{people} people")
+        for report in ('children', 'birthdays', 'calendar'):
+            for label, write in (('dict', lambda out: materialised(tree, report, out)),
+                                 ('streamed', lambda out: reports.write(tree, report, out))):
+                first, elapsed, peak = measure(write)
+                print(f"  {report:10} {label:9} first row {first * 1e3:8.2f} ms   all {elapsed:6.2f} s   "
+                      f"peak {peak / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
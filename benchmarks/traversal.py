@@ -0,0 +1,90 @@
+"""Benchmark the BFS traversal engine against the nested loops it replaced.
+
+Usage: python benchmarks/traversal.py [people]
+"""
+
+import random
+import sys
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree import traversal
+from familytree.store import PersonStore
+
+
+def build_store(people, seed=0):
+    """Couples with 0-6 children each; a fifth of the children also record sibling links."""
+    rng = random.Random(seed)
+    store = PersonStore()
+    store.add_many((f"Person {index}", None, None) for index in range(people))
+    edges = []
+    next_child = 1000
+    for father in range(0, people, 2):
+        family = range(next_child, min(people, next_child + rng.randint(0, 6)))
+        next_child = family.stop
+        for child in family:
+            edges.append(('child', father, child))
+            edges.append(('child', father + 1, child))
+        if rng.random() < 0.2:
+            edges.extend(('sibling', a, b) for a in family for b in family if a < b)
+        # Parents' siblings are what cousin queries follow
+        edges.append(('sibling', father, father + 1 - 2 * (father % 4 == 2)))
+    store.add_relationships(edges)
+    return store
+
+
+# The loops Feature 3.py used before the traversal engine, over store IDs
+
+def old_grandchildren(store, person_id):
+    grandchildren = []
+    for child in store.children(person_id):
+        grandchildren.extend(store.children(child))
+    return grandchildren
+
+
+def old_cousins(store, person_id):
+    cousins = []
+    for parent in store.parents(person_id):
+        for sibling in store.siblings(parent):
+            cousins.extend(store.children(sibling))
+    return cousins
+
+
+def new_grandchildren(store, person_id):
+    return list(traversal.generation([person_id], store.children, 2))
+
+
+def new_cousins(store, person_id):
+    return list(traversal.nth_cousins(person_id, 1, store.parents, store.children, store.siblings))
+
+
+def timed(function, store, sample):
+    start = time.perf_counter()
+    results = [function(store, person_id) for person_id in sample]
+    return (time.perf_counter() - start) * 1e6 / len(sample), results
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    store = build_store(people)
+    store.compact()
+    rng = random.Random(1)
+    sample = [rng.randrange(people) for _ in range(20_000)]
+
+    for label, old, new in (('grandchildren', old_grandchildren, new_grandchildren),
+                            ('cousins', old_cousins, new_cousins)):
+        old_time, old_results = timed(old, store, sample)
+        new_time, new_results = timed(new, store, sample)
+        assert all(set(a) - {person_id} == set(b) for a, b, person_id in zip(old_results, new_results, sample))
+        print(f"{label:14} nested loops {old_time:6.1f} us   engine {new_time:6.1f} us")
+
+    for label, neighbours in (('ancestors within 4 generations', store.parents),
+                              ('descendants within 4 generations', store.children)):
+        start = time.perf_counter()
+        found = sum(sum(1 for _ in traversal.within(person_id, neighbours, 4)) for person_id in sample)
+        elapsed = (time.perf_counter() - start) * 1e6 / len(sample)
+        print(f"{label}: {elapsed:.1f} us/query, {found / len(sample):.1f} found on average")
+
+
+if __name__ == "__main__":
+    main()
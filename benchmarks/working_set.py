@@ -0,0 +1,93 @@
+"""Resident memory of full-load mode against a bounded working set.
+
+A synthetic tree is written once to a SQLite database and a snapshot. Each
+mode then runs in a fresh interpreter, so resident memory (VmRSS) is not
+shared between them: full-load copies the database into a PersonStore,
+the lazy modes open the file with FamilyTree.open_lazy. Every mode answers
+get_cousins for the same people; the report shows the memory each one
+added, the time per query and, for the lazy modes, how many records each
+query loaded.
+
+Usage: python benchmarks/working_set.py [people] [queries] [working set]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import _common  # noqa: F401  (puts the repository root on sys.path)
+from familytree.model import FamilyTree
+from familytree.snapshot import write_snapshot
+from familytree.sqlite_store import SQLiteStore
+from familytree.store import PersonStore, copy_store
+from familytree.synthetic import populate
+
+
+def resident_kb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(mode, path, queries, working_set):
+    """Run in the child interpreter; prints one JSON line of results."""
+    before = resident_kb()
+    start = time.perf_counter()
+    if mode == 'full':
+        store = PersonStore()
+        with SQLiteStore(path) as database:
+            copy_store(database, store)
+        tree = FamilyTree(store, cache_size=0)
+    else:
+        tree = FamilyTree.open_lazy(path, working_set)
+        tree.cache_size = 0
+    opened = time.perf_counter() - start
+
+    rng = random.Random(1)
+    names = [tree.store.name(rng.randrange(len(tree.store))) for _ in range(queries)]
+    start = time.perf_counter()
+    found = sum(len(tree.get_cousins(name)) for name in names)
+    elapsed = time.perf_counter() - start
+    info = tree.store.info() if hasattr(tree.store, 'info') else {}
+    print(json.dumps({'resident': resident_kb() - before, 'open': opened, 'query': elapsed / queries,
+                      'cousins': found, 'loads': info.get('loads', 0), 'size': info.get('size', len(tree.store))}))
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    working_set = int(sys.argv[3]) if len(sys.argv) > 3 else 4096
+    with tempfile.TemporaryDirectory() as directory:
+        database, snapshot = os.path.join(directory, 'tree.db'), os.path.join(directory, 'tree.snap')
+        store = PersonStore()
+        populate(store, people)
+        write_snapshot(store, snapshot)
+        with SQLiteStore(database) as target:
+            copy_store(store, target)
+        del store
+
+        print(f"{people} people, {queries} get_cousins queries, working set of {working_set} records")
+        results = {}
+        for label, mode, path in (('full load from SQLite', 'full', database),
+                                  ('working set over SQLite', 'lazy', database),
+                                  ('working set over snapshot', 'lazy', snapshot)):
+            output = subprocess.run([sys.executable, __file__, '--measure', mode, path, str(queries),
+                                     str(working_set)], capture_output=True, text=True, check=True).stdout
+            result = results[label] = json.loads(output)
+            loads = f"  {result['loads'] / queries:6.1f} records loaded/query" if mode == 'lazy' else ""
+            print(f"{label:26} {result['resident'] / 1024:8.1f} MB resident  open {result['open']:7.3f} s  "
+                  f"{result['query'] * 1e6:8.1f} us/query{loads}")
+        assert len({result['cousins'] for result in results.values()}) == 1, "modes disagree"
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+    else:
+        main()
@@ -0,0 +1,27 @@
+"""Storage and query engine for the family tree features.
+
+Names are imported on first access, so ``import familytree`` itself loads
+nothing but this file.
+"""
+
+EXPORTS = {
+    'NO_PERSON': 'familytree.store',
+    'PersonStore': 'familytree.store',
+    'Person': 'familytree.model',
+    'FamilyTree': 'familytree.model',
+    'sample_tree': 'familytree.sample',
+}
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'familytree' has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
@@ -0,0 +1,211 @@
+"""Vectorised demographic analytics with NumPy.
+
+``Demographics`` copies a store's birth and death ordinals and its child
+CSR adjacency into NumPy arrays once. Lifespan and family-size
+distributions, percentiles, generation intervals, birth-decade cohorts and
+life tables are then computed with array operations rather than a Python
+loop per person. The export is a one-off: build a new ``Demographics``
+after the tree changes.
+
+NumPy is optional for the rest of the package; only this module needs it.
+"""
+
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # analytics are unavailable, everything else still works
+    np = None
+
+MARCH_ORDINAL = date(1, 3, 1).toordinal() - 365  # ordinal of 1 March of year 0
+DAYS_PER_YEAR = 365.2425
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("familytree.analytics needs NumPy: pip install numpy")
+
+
+def calendar_fields(ordinals):
+    """Split an array of date ordinals (all known) into year, month and day arrays.
+
+    Integer civil-from-days arithmetic on years starting 1 March, so leap
+    days fall at the end; several times faster than datetime64 casts.
+    """
+    days = np.asarray(ordinals, dtype=np.int64) - MARCH_ORDINAL
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153  # 0 = March
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = shifted_month + 3 - 12 * (shifted_month >= 10)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def whole_years(birth_ordinals, death_ordinals):
+    """Vectorised ``stats.age_between``: completed years between two arrays of known dates."""
+    birth_year, birth_month, birth_day = calendar_fields(birth_ordinals)
+    death_year, death_month, death_day = calendar_fields(death_ordinals)
+    before_birthday = death_month * 100 + death_day < birth_month * 100 + birth_day
+    return death_year - birth_year - before_birthday
+
+
+def percentiles(values, q=PERCENTILES):
+    """Map each percentile in ``q`` to its value (linear interpolation), or None for no data."""
+    if not len(values):
+        return dict.fromkeys(q)
+    return dict(zip(q, np.percentile(values, q).tolist()))
+
+
+def _mean(values):
+    return float(values.mean()) if len(values) else None
+
+
+def _child_csr(store):
+    if hasattr(store, 'adjacency'):
+        return store.adjacency('child')
+    # Any other store: rebuild the CSR arrays from its rows
+    counts = np.fromiter((len(store.children(person_id)) for person_id in store.ids()), dtype=np.int64,
+                         count=len(store))
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    targets = np.fromiter((child for person_id in store.ids() for child in store.children(person_id)),
+                          dtype=np.int64, count=int(offsets[-1]))
+    return offsets, targets
+
+
+class Demographics:
+    def __init__(self, store, kinship=None):
+        require_numpy()
+        self.births = np.array(store.birth_ordinals, dtype=np.int64)  # 0 = unknown
+        self.deaths = np.array(store.death_ordinals, dtype=np.int64)
+        offsets, targets = _child_csr(store)
+        self.children = np.diff(np.asarray(offsets, dtype=np.int64))  # number of children per person
+        # One entry per parent -> child link
+        self.child_ids = np.array(targets, dtype=np.int64)
+        self.parent_ids = np.repeat(np.arange(len(self.children)), self.children)
+        self.generation = None if kinship is None else np.array(kinship.generation, dtype=np.int64)
+
+        # People with both dates known, and their age at death
+        self.dead_ids = np.flatnonzero((self.births != 0) & (self.deaths != 0))
+        self.ages = whole_years(self.births[self.dead_ids], self.deaths[self.dead_ids])
+
+    def __len__(self):
+        return len(self.births)
+
+    # Lifespans
+
+    def average_age_at_death(self):
+        return _mean(self.ages)
+
+    def median_age_at_death(self):
+        return float(np.median(self.ages)) if len(self.ages) else None
+
+    def age_at_death_stddev(self):
+        return float(self.ages.std()) if len(self.ages) else None
+
+    def lifespan_distribution(self):
+        """Array whose entry ``age`` is the number of people who died at that age."""
+        return np.bincount(self.ages)
+
+    def lifespan_percentiles(self, q=PERCENTILES):
+        return percentiles(self.ages, q)
+
+    # Family size
+
+    def average_number_of_children(self):
+        return _mean(self.children)
+
+    def family_size_distribution(self):
+        """Array whose entry ``n`` is the number of people with ``n`` children."""
+        return np.bincount(self.children)
+
+    def family_size_percentiles(self, q=PERCENTILES):
+        return percentiles(self.children, q)
+
+    def fertility_by_generation(self):
+        """Average number of children per person for each generation (needs a kinship index)."""
+        if self.generation is None:
+            raise ValueError("Demographics was built without a kinship index")
+        people = np.bincount(self.generation)
+        children = np.bincount(self.generation, weights=self.children)
+        present = np.flatnonzero(people)
+        return dict(zip(present.tolist(), (children[present] / people[present]).tolist()))
+
+    # Generation intervals
+
+    def generation_intervals(self):
+        """Parent's age in years at each child's birth, for links where both births are known."""
+        parent_births = self.births[self.parent_ids]
+        child_births = self.births[self.child_ids]
+        known = (parent_births != 0) & (child_births != 0)
+        return (child_births[known] - parent_births[known]) / DAYS_PER_YEAR
+
+    def generation_interval_percentiles(self, q=PERCENTILES):
+        return percentiles(self.generation_intervals(), q)
+
+    # Cohorts and life tables
+
+    def cohorts(self, width=10):
+        """Group people with a known birth date by birth decade (or ``width``-year period).
+
+        Returns ``{first_year: summary}`` in order, where each summary holds
+        the number of people, the number with a known age at death, the
+        average age at death and the average number of children.
+        """
+        born = np.flatnonzero(self.births)
+        if not len(born):
+            return {}
+        year, _, _ = calendar_fields(self.births[born])
+        starts, cohort = np.unique(year // width * width, return_inverse=True)
+        people = np.bincount(cohort, minlength=len(starts))
+        children = np.bincount(cohort, weights=self.children[born], minlength=len(starts))
+
+        # Deaths are counted against the same cohort numbers
+        position = np.full(len(self), -1)
+        position[born] = cohort
+        dead_cohort = position[self.dead_ids]
+        deaths = np.bincount(dead_cohort, minlength=len(starts))
+        age_sum = np.bincount(dead_cohort, weights=self.ages, minlength=len(starts))
+
+        summaries = {}
+        for index, start in enumerate(starts.tolist()):
+            summaries[start] = {
+                'people': int(people[index]),
+                'deaths': int(deaths[index]),
+                'average_age_at_death': float(age_sum[index] / deaths[index]) if deaths[index] else None,
+                'average_number_of_children': float(children[index] / people[index]),
+            }
+        return summaries
+
+    def life_table(self, width=5, cohort=None):
+        """Abridged life table from completed lifespans, in ``width``-year age bands.
+
+        Only people with both dates count (an extinct-cohort table);
+        ``cohort=(first_year, last_year)`` keeps those born in that range
+        of years. Returns a dict of equal-length
+        arrays: age, survivors (l_x), deaths (d_x), probability_of_death
+        (q_x), person_years (L_x) and life_expectancy (e_x).
+        """
+        ages = self.ages
+        if cohort is not None:
+            year, _, _ = calendar_fields(self.births[self.dead_ids])
+            ages = ages[(year >= cohort[0]) & (year <= cohort[1])]
+        deaths = np.bincount(ages // width)
+        survivors = np.cumsum(deaths[::-1])[::-1]
+        # Deaths are assumed to fall half way through their band
+        person_years = width * (survivors - deaths / 2)
+        total_years = np.cumsum(person_years[::-1])[::-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            probability_of_death = deaths / survivors
+            life_expectancy = total_years / survivors
+        return {
+            'age': np.arange(len(deaths)) * width,
+            'survivors': survivors,
+            'deaths': deaths,
+            'probability_of_death': probability_of_death,
+            'person_years': person_years,
+            'life_expectancy': life_expectancy,
+        }
@@ -0,0 +1,134 @@
+"""Day-of-year birthday index.
+
+``BirthdayCalendar`` keeps one bucket of person IDs for each of the 366
+days of a leap year and follows store notifications, so a new person or a
+changed birth date moves one ID instead of rebuilding anything. Range and
+"next N" queries walk calendar days, at most one year of them, and then
+only touch the people they return.
+
+People born on 29 February celebrate on 28 February in common years, or on
+1 March with ``leap_day='mar1'``.
+"""
+
+from bisect import insort
+from datetime import date, timedelta
+
+DAYS = 366
+LEAP_YEAR = 2000  # any leap year: slots are days of that year
+FEB_29 = date(LEAP_YEAR, 2, 29).timetuple().tm_yday - 1
+ONE_DAY = timedelta(days=1)
+
+
+def day_slot(month, day):
+    """Bucket number of a (month, day): 0 for 1 January ... 365 for 31 December."""
+    return date(LEAP_YEAR, month, day).timetuple().tm_yday - 1
+
+
+def slot_month_day(slot):
+    value = date(LEAP_YEAR, 1, 1) + timedelta(days=slot)
+    return value.month, value.day
+
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+class BirthdayCalendar:
+    def __init__(self, store, leap_day='feb28'):
+        if leap_day not in ('feb28', 'mar1'):
+            raise ValueError("leap_day must be 'feb28' or 'mar1'")
+        self.store = store
+        self.leap_day = leap_day
+        self.buckets = [[] for _ in range(DAYS)]  # slot -> person IDs, in ID order
+        self.count = 0
+        for person_id in store.ids():
+            self._insert(person_id, store.birth_date(person_id))
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+
+    def __len__(self):
+        """Number of people with a known birth date."""
+        return self.count
+
+    # Maintenance
+
+    def _insert(self, person_id, birth_date):
+        if birth_date:
+            insort(self.buckets[day_slot(birth_date.month, birth_date.day)], person_id)
+            self.count += 1
+
+    def _remove(self, person_id, birth_date):
+        if birth_date:
+            self.buckets[day_slot(birth_date.month, birth_date.day)].remove(person_id)
+            self.count -= 1
+
+    def _on_change(self, event, *args):
+        if event == 'add_person':
+            self._insert(args[0], self.store.birth_date(args[0]))
+        elif event == 'set_birth_date':
+            person_id, old = args
+            self._remove(person_id, old)
+            self._insert(person_id, self.store.birth_date(person_id))
+
+    # Queries
+
+    def on(self, month, day):
+        """IDs of the people born on this month and day (any year)."""
+        return list(self.buckets[day_slot(month, day)])
+
+    def by_day(self):
+        """Yield ``((month, day), ids)`` for every day with a birthday, from January to December."""
+        for slot, bucket in enumerate(self.buckets):
+            if bucket:
+                yield slot_month_day(slot), list(bucket)
+
+    def _slots(self, day):
+        # Buckets celebrated on a calendar date: its own, plus 29 February
+        # on the stand-in day of a common year.
+        slots = [day_slot(day.month, day.day)]
+        if not is_leap(day.year) and (day.month, day.day) == ((2, 28) if self.leap_day == 'feb28' else (3, 1)):
+            slots.append(FEB_29)
+        return slots
+
+    def celebrating(self, day):
+        """IDs celebrating on the calendar date ``day``, with 29 February moved in common years."""
+        return [person_id for slot in self._slots(day) for person_id in self.buckets[slot]]
+
+    def between(self, start, end):
+        """Yield ``(day, person_id)`` for birthdays from ``start`` to ``end`` inclusive, in date order.
+
+        Both are dates, so a range such as 20 December to 5 January simply
+        runs into the next year.
+        """
+        day = start
+        while day <= end:
+            for slot in self._slots(day):
+                for person_id in self.buckets[slot]:
+                    yield day, person_id
+            day += ONE_DAY
+
+    def upcoming(self, count, start=None):
+        """The next ``count`` birthdays on or after ``start`` (default today), as ``(day, person_id)``.
+
+        Each person appears at most once, at their next birthday.
+        """
+        day = start or date.today()
+        found = []
+        if count <= 0:
+            return found
+        done = set()  # slots already returned, so a year's wrap never repeats anyone
+        for _ in range(DAYS):
+            for slot in self._slots(day):
+                if slot in done:
+                    continue
+                done.add(slot)
+                for person_id in self.buckets[slot]:
+                    found.append((day, person_id))
+                    if len(found) == count:
+                        return found
+            day += ONE_DAY
+        return found
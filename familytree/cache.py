@@ -0,0 +1,138 @@
+"""LRU cache for relative queries with exact invalidation.
+
+A query is computed against a recording view of the store that notes every
+person whose parents, children, siblings, spouse or dates it reads. That
+read set is the entry's dependency list: when the store reports a change
+to any of those people the entry is dropped, and nothing else is. Because
+a result can only depend on what it read, a cached answer always equals a
+fresh computation, however far the change is from the person asked about.
+"""
+
+from collections import OrderedDict
+
+from familytree.store import NO_PERSON
+
+
+class RecordingStore:
+    """Read-only view of a store that records which people's rows were read."""
+
+    def __init__(self, store):
+        self.store = store
+        self.read = set()
+
+    def __len__(self):
+        return len(self.store)
+
+    def name(self, person_id):
+        return self.store.name(person_id)  # names never change, so no dependency
+
+    def birth_date(self, person_id):
+        self.read.add(person_id)
+        return self.store.birth_date(person_id)
+
+    def death_date(self, person_id):
+        self.read.add(person_id)
+        return self.store.death_date(person_id)
+
+    def parents(self, person_id):
+        self.read.add(person_id)
+        return self.store.parents(person_id)
+
+    def children(self, person_id):
+        self.read.add(person_id)
+        return self.store.children(person_id)
+
+    def siblings(self, person_id):
+        # Siblings are derived from the parents' children, so a new child of
+        # any parent changes them too
+        self.read.add(person_id)
+        self.read.update(self.store.parents(person_id))
+        return self.store.siblings(person_id)
+
+    def spouse(self, person_id):
+        self.read.add(person_id)
+        return self.store.spouse(person_id)
+
+
+class QueryCache:
+    def __init__(self, store, maxsize=1024):
+        self.store = store
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # (query, person_id) -> (result, people read), oldest first
+        self.dependents = {}  # person ID -> keys of the entries that read them
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, query, person_id, compute):
+        """Return ``compute(store, person_id)``, cached under ``(query, person_id)``.
+
+        ``compute`` must read relationships and dates only through the store
+        it is given. Results are shared between callers, so return tuples or
+        other values that nobody will modify.
+        """
+        key = (query, person_id)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        recorder = RecordingStore(self.store)
+        result = compute(recorder, person_id)
+        if self.maxsize <= 0:
+            return result
+        self.entries[key] = (result, recorder.read)
+        for dependency in recorder.read:
+            self.dependents.setdefault(dependency, set()).add(key)
+        if len(self.entries) > self.maxsize:
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+        return result
+
+    def _drop(self, key):
+        _, read = self.entries.pop(key)
+        for dependency in read:
+            keys = self.dependents[dependency]
+            keys.discard(key)
+            if not keys:
+                del self.dependents[dependency]
+
+    def invalidate(self, person_ids):
+        """Drop every entry that read any of ``person_ids``."""
+        for person_id in person_ids:
+            for key in list(self.dependents.get(person_id, ())):
+                self._drop(key)
+                self.invalidations += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.dependents.clear()
+
+    def _on_change(self, event, *args):
+        if event in ('add_child', 'add_sibling'):
+            self.invalidate(args)
+        elif event == 'set_spouse':
+            self.invalidate(person_id for person_id in args if person_id != NO_PERSON)
+        elif event in ('set_birth_date', 'set_death_date'):
+            self.invalidate(args[:1])
+
+    def info(self):
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
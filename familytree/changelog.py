@@ -0,0 +1,283 @@
+"""Append-only binary change log, compaction into snapshots, and log-shipping replicas.
+
+A ``ChangeLog`` listens to a store and appends one record per change to the
+current segment file in a directory. Sequence numbers count records from
+the very first change, so a replica only needs to remember one number.
+``compact`` writes a full snapshot of the store tagged with the current
+sequence number, starts a new segment there and deletes everything older.
+
+    log-<sequence>.bin        header, then records from <sequence> on
+    snapshot-<sequence>.snap  the store as it was before record <sequence>
+
+Records are little-endian: a 9-byte ``(op, first, second)`` head, and for
+a new person their birth and death ordinals and UTF-8 name after it.
+
+    add_person      id, name length    + birth, death, name
+    set_birth_date  id, ordinal        (0 = unknown)
+    set_death_date  id, ordinal
+    set_spouse      id, spouse + 1     (0 = none)
+    add_child       parent, child
+    add_sibling     person, sibling
+
+A ``Replica`` loads the newest snapshot into a PersonStore and replays the
+log from there; ``catch_up`` then applies only the records added since,
+resuming at the byte where it stopped. Long runs of new edges are
+replayed as one bulk insert. A replica that has fallen behind the last
+compaction reloads from the new snapshot.
+"""
+
+import os
+import struct
+
+from familytree.snapshot import Snapshot, write_snapshot
+from familytree.store import NO_PERSON, PersonStore, copy_store, date_to_ordinal, ordinal_to_date
+
+MAGIC = b'FTLOG\x00\x00\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sIQ')  # magic, version, first sequence number
+RECORD = struct.Struct('<BII')
+DATES = struct.Struct('<II')
+ADD_PERSON, SET_BIRTH_DATE, SET_DEATH_DATE, SET_SPOUSE, ADD_CHILD, ADD_SIBLING = range(1, 7)
+EDGE_KINDS = {ADD_CHILD: 'child', ADD_SIBLING: 'sibling'}
+BULK_EDGES = 256  # shorter runs of edges are inserted one by one; a bulk insert rewrites the CSR arrays
+
+
+class ChangeLogError(ValueError):
+    pass
+
+
+def _segment_path(directory, sequence):
+    return os.path.join(directory, f'log-{sequence:016d}.bin')
+
+
+def _snapshot_path(directory, sequence):
+    return os.path.join(directory, f'snapshot-{sequence:016d}.snap')
+
+
+def _listing(directory, prefix):
+    """Sequence numbers of the files called ``<prefix>-<sequence>.*``, oldest first."""
+    return sorted(int(name[len(prefix) + 1:].split('.')[0]) for name in os.listdir(directory)
+                  if name.startswith(prefix + '-'))
+
+
+def read_records(path, offset=None):
+    """Yield ``(op, first, second, person, end offset)`` from a segment, starting at byte ``offset``.
+
+    ``person`` is ``(name, birth ordinal, death ordinal)`` for add_person and
+    None otherwise. Only the bytes from ``offset`` on are read (after the
+    header when it is None), so resuming costs the new records alone. A
+    record cut short at the end (a crash mid-write) ends the segment.
+    """
+    with open(path, 'rb') as handle:
+        if offset is None:
+            magic, version, _ = HEADER.unpack(handle.read(HEADER.size).ljust(HEADER.size, b'\0'))
+            if magic != MAGIC or version != VERSION:
+                raise ChangeLogError(f"{path} is not a version {VERSION} change log")
+            offset = HEADER.size
+        handle.seek(offset)
+        data = handle.read()
+    start, position, end = offset, 0, len(data)  # positions are relative to ``start``
+    while position + RECORD.size <= end:
+        op, first, second = RECORD.unpack_from(data, position)
+        position += RECORD.size
+        person = None
+        if op == ADD_PERSON:
+            if position + DATES.size + second > end:
+                return
+            birth, death = DATES.unpack_from(data, position)
+            position += DATES.size
+            person = data[position:position + second].decode('utf-8'), birth, death
+            position += second
+        yield op, first, second, person, start + position
+
+
+class ChangeLog:
+    def __init__(self, directory, store, compact_every=None):
+        """Record every change to ``store`` under ``directory``.
+
+        A new directory starts with a snapshot of ``store`` as it is now. An
+        existing one is appended to, so ``store`` must be in the state the
+        log ends in (for example a replica that has caught up). With
+        ``compact_every``, a snapshot is taken after that many records.
+        """
+        self.directory = directory
+        self.store = store
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+        self._handle = None
+        segments = _listing(directory, 'log')
+        if segments:
+            self.base = segments[-1]
+            self.sequence, length = self.base, HEADER.size
+            for *_, length in read_records(_segment_path(directory, self.base)):
+                self.sequence += 1
+            self._handle = open(_segment_path(directory, self.base), 'r+b')
+            self._handle.truncate(length)  # drop a torn last record
+            self._handle.seek(length)
+        else:
+            self.sequence = 0
+            self.compact()
+        store.subscribe(self._on_change)
+
+    def close(self):
+        if self._handle is not None:
+            self.store.unsubscribe(self._on_change)
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def flush(self):
+        """Push buffered records to the file so replicas can read them."""
+        self._handle.flush()
+
+    def sync(self):
+        """Flush and fsync, for durability across power loss."""
+        self.flush()
+        os.fsync(self._handle.fileno())
+
+    def _on_change(self, event, *args):
+        write = self._handle.write
+        if event == 'add_person':
+            person_id = args[0]
+            store = self.store
+            name = store.name(person_id).encode('utf-8')
+            write(RECORD.pack(ADD_PERSON, person_id, len(name)))
+            write(DATES.pack(date_to_ordinal(store.birth_date(person_id)),
+                             date_to_ordinal(store.death_date(person_id))))
+            write(name)
+        elif event == 'add_child':
+            write(RECORD.pack(ADD_CHILD, *args))
+        elif event == 'add_sibling':
+            write(RECORD.pack(ADD_SIBLING, *args))
+        elif event == 'set_spouse':
+            write(RECORD.pack(SET_SPOUSE, args[0], args[1] + 1))
+        elif event in ('set_birth_date', 'set_death_date'):
+            person_id = args[0]
+            if event == 'set_birth_date':
+                write(RECORD.pack(SET_BIRTH_DATE, person_id, date_to_ordinal(self.store.birth_date(person_id))))
+            else:
+                write(RECORD.pack(SET_DEATH_DATE, person_id, date_to_ordinal(self.store.death_date(person_id))))
+        else:
+            return
+        self.sequence += 1
+        if self.compact_every and self.sequence - self.base >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Snapshot the store at the current sequence number, start a new segment and drop older files.
+
+        Edges a bulk insert has already stored but not yet reported are in
+        the snapshot and are logged again afterwards; replaying them is a
+        no-op.
+        """
+        store = self.store
+        if not hasattr(store, 'name_table'):  # snapshots are written from a PersonStore
+            copy = PersonStore()
+            copy_store(store, copy)
+            store = copy
+        write_snapshot(store, _snapshot_path(self.directory, self.sequence))
+        if self._handle is not None:
+            self._handle.close()
+        self.base = self.sequence
+        self._handle = open(_segment_path(self.directory, self.base), 'wb', buffering=1 << 16)
+        self._handle.write(HEADER.pack(MAGIC, VERSION, self.base))
+        self._handle.flush()
+        for prefix, path in (('log', _segment_path), ('snapshot', _snapshot_path)):
+            for sequence in _listing(self.directory, prefix):
+                if sequence < self.base:
+                    os.remove(path(self.directory, sequence))
+
+
+class Replica:
+    """A PersonStore kept in step with a change log directory; do not write to it directly."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.store = None
+        self.sequence = 0  # records applied so far
+        self.replayed = 0  # records applied by the last load or catch_up
+        self._segment = None  # segment being read, and the byte to resume at
+        self._offset = None
+        self.load()
+
+    def load(self):
+        """Rebuild from the newest snapshot, then replay the log after it."""
+        snapshots = _listing(self.directory, 'snapshot')
+        if not snapshots:
+            raise ChangeLogError(f"no snapshot in {self.directory}")
+        store = PersonStore()
+        with Snapshot.open(_snapshot_path(self.directory, snapshots[-1])) as snapshot:
+            copy_store(snapshot, store)
+        self.store, self.sequence = store, snapshots[-1]
+        self._segment = self._offset = None
+        self.catch_up()
+
+    def catch_up(self):
+        """Apply the records added since the last call; returns True if the store was rebuilt instead."""
+        segments = _listing(self.directory, 'log')
+        if not segments or self.sequence < segments[0]:
+            self.load()  # the records this replica needs were compacted away
+            return True
+        applied = 0
+        for base in segments:
+            following = segments[segments.index(base) + 1:]
+            if following and following[0] <= self.sequence:
+                continue  # this segment ends before the replica's position
+            offset = self._offset if base == self._segment else None
+            skip = 0 if offset is not None else self.sequence - base
+            applied += self._replay(_segment_path(self.directory, base), offset, skip, base)
+        self.replayed = applied
+        return False
+
+    def _replay(self, path, offset, skip, base):
+        store = self.store
+        edges = []
+        applied = 0
+        end = offset
+        for op, first, second, person, end in read_records(path, offset):
+            if skip:
+                skip -= 1
+                continue
+            kind = EDGE_KINDS.get(op)
+            if kind is not None:
+                edges.append((kind, first, second))
+            else:
+                if edges:
+                    _add_edges(store, edges)
+                    edges = []
+                if op == ADD_PERSON:
+                    name, birth, death = person
+                    if first != len(store):
+                        raise ChangeLogError(f"replica has {len(store)} people but the log adds #{first}")
+                    store.add(name, ordinal_to_date(birth), ordinal_to_date(death))
+                elif op == SET_BIRTH_DATE:
+                    store.set_birth_date(first, ordinal_to_date(second))
+                elif op == SET_DEATH_DATE:
+                    store.set_death_date(first, ordinal_to_date(second))
+                elif op == SET_SPOUSE:
+                    store.set_spouse(first, second - 1 if second else NO_PERSON)
+                else:
+                    raise ChangeLogError(f"unknown record type {op} in {path}")
+            applied += 1
+        if edges:
+            _add_edges(store, edges)
+        self.sequence += applied
+        if end is not None:
+            self._segment, self._offset = base, end
+        return applied
+
+
+def _add_edges(store, edges):
+    if len(edges) >= BULK_EDGES:
+        store.add_relationships(edges)
+        return
+    for kind, person_id, relative_id in edges:
+        if kind == 'child':
+            store.add_child(person_id, relative_id)
+        else:
+            store.add_sibling(person_id, relative_id)
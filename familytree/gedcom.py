@@ -0,0 +1,257 @@
+"""Streaming GEDCOM 5.5 import and export.
+
+The reader is a generator pipeline (lines -> level-0 records -> people and
+edges) that keeps one record in memory at a time and hands people and
+relationships to the store in batches. Families may refer to individuals
+that appear later in the file, so their edges are held by cross-reference
+until both ends are known.
+
+Only what the store models is read: names, birth and death dates, spouses
+(the partners of a family with a MARR event) and parent/child links.
+Siblings follow from shared parents, so children of a family are only
+linked as siblings when it names no parents; the writer puts each
+recorded sibling link in such a family of its own.
+"""
+
+from datetime import date
+
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+DATE_QUALIFIERS = ('ABT', 'CAL', 'EST', 'BEF', 'AFT')
+
+
+def _open(source, mode):
+    if isinstance(source, str):
+        encoding = 'utf-8-sig' if mode == 'r' else 'utf-8'
+        return open(source, mode, encoding=encoding, errors='replace', newline=''), True
+    return source, False
+
+
+def iter_lines(source):
+    """Yield (level, xref, tag, value) for each line of a GEDCOM file or file object."""
+    handle, owned = _open(source, 'r')
+    try:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            level, _, rest = line.partition(' ')
+            xref = None
+            if rest.startswith('@'):
+                xref, _, rest = rest.partition(' ')
+            tag, _, value = rest.partition(' ')
+            yield int(level), xref, tag, value
+    finally:
+        if owned:
+            handle.close()
+
+
+def iter_records(lines):
+    """Group lines into (xref, tag, value, sub-lines) level-0 records."""
+    record = None
+    for level, xref, tag, value in lines:
+        if level == 0:
+            if record is not None:
+                yield record
+            record = (xref, tag, value, [])
+        elif record is not None:
+            record[3].append((level, tag, value))
+    if record is not None:
+        yield record
+
+
+def parse_date(value):
+    """Parse '15 MAY 2010' (optionally 'ABT 15 MAY 2010'); partial dates give None."""
+    parts = value.upper().split()
+    if parts and parts[0] in DATE_QUALIFIERS:
+        parts = parts[1:]
+    if len(parts) != 3 or parts[1] not in MONTHS:
+        return None
+    try:
+        return date(int(parts[2]), MONTHS.index(parts[1]) + 1, int(parts[0]))
+    except ValueError:
+        return None
+
+
+def format_date(value):
+    return f"{value.day} {MONTHS[value.month - 1]} {value.year}"
+
+
+def parse_name(value):
+    """'John /Smith/' -> 'John Smith'."""
+    return ' '.join(value.replace('/', ' ').split())
+
+
+def _individual(lines):
+    name, birth, death = '', None, None
+    event = None
+    for level, tag, value in lines:
+        if level == 1:
+            event = tag
+            if tag == 'NAME' and not name:
+                name = parse_name(value)
+        elif level == 2 and tag == 'DATE':
+            if event == 'BIRT':
+                birth = parse_date(value)
+            elif event == 'DEAT':
+                death = parse_date(value)
+    return name, birth, death
+
+
+def _family_edges(lines):
+    partners, children = [], []
+    married = False
+    for level, tag, value in lines:
+        if level == 1 and tag in ('HUSB', 'WIFE'):
+            partners.append(value)
+        elif level == 1 and tag == 'CHIL':
+            children.append(value)
+        elif level == 1 and tag == 'MARR':
+            married = True
+    if married and len(partners) == 2:
+        yield 'spouse', partners[0], partners[1]
+    for child in children:
+        for partner in partners:
+            yield 'child', partner, child
+    if not partners:
+        for index, child in enumerate(children):
+            for sibling in children[index + 1:]:
+                yield 'sibling', child, sibling
+
+
+def read_gedcom(source, store, batch_size=10_000):
+    """Stream the INDI and FAM records of ``source`` into ``store``.
+
+    Returns a dict mapping GEDCOM cross-references to person IDs.
+    """
+    xrefs = {}
+    people = []  # (xref, name, birth, death) waiting to be added
+    edges = []  # (kind, xref, xref) waiting for both ends to be added
+
+    def flush_people():
+        new_ids = store.add_many((name, birth, death) for _, name, birth, death in people)
+        for person_id, (xref, _, _, _) in zip(new_ids, people):
+            xrefs[xref] = person_id
+        people.clear()
+
+    def flush_edges(final=False):
+        resolved, waiting = [], []
+        for edge in edges:
+            kind, a, b = edge
+            if a in xrefs and b in xrefs:
+                resolved.append((kind, xrefs[a], xrefs[b]))
+            elif not final:
+                waiting.append(edge)
+        store.add_relationships(resolved)
+        edges[:] = waiting
+
+    waiting = 0  # edges still unresolved after the last merge
+    for xref, tag, _, lines in iter_records(iter_lines(source)):
+        if tag == 'INDI':
+            people.append((xref,) + _individual(lines))
+            if len(people) >= batch_size:
+                flush_people()
+        elif tag == 'FAM':
+            edges.extend(_family_edges(lines))
+            # Merging edges costs a pass over the store, so let the buffer
+            # grow with the tree to keep the total work linear. Edges whose
+            # people come later in the file stay buffered, so it must also
+            # outgrow them or every family would rescan the same backlog.
+            if len(edges) >= max(batch_size, len(store), 2 * waiting):
+                flush_people()
+                flush_edges()
+                waiting = len(edges)
+    flush_people()
+    flush_edges(final=True)
+    return xrefs
+
+
+def iter_gedcom(store):
+    """Yield the lines of a GEDCOM file for ``store``, one record at a time.
+
+    Families are named after their parents in row order (@F8_3@ for the
+    children whose parents are 8 then 3) so no family table has to be built
+    before writing. A FAM holds at
+    most two partners, so a child with more recorded parents belongs to one
+    family per pair of them (read back family by family, in file order). Each recorded sibling link becomes a family
+    with no parents (@S2_5@), which the reader turns back into that link.
+    Only the family of a person and their spouse has a MARR event, so
+    co-parents who are not married are not read back as spouses.
+    """
+    yield '0 HEAD'
+    yield '1 GEDC'
+    yield '2 VERS 5.5.1'
+    yield '2 FORM LINEAGE-LINKED'
+    yield '1 CHAR UTF-8'
+
+    for person_id in store.ids():
+        yield f'0 @I{person_id}@ INDI'
+        given, _, surname = store.name(person_id).rpartition(' ')
+        yield f'1 NAME {given} /{surname}/' if given else f'1 NAME {surname}'
+        for tag, value in (('BIRT', store.birth_date(person_id)), ('DEAT', store.death_date(person_id))):
+            if value:
+                yield f'1 {tag}'
+                yield f'2 DATE {format_date(value)}'
+        for family in _family_keys(store.parents(person_id)):
+            yield f'1 FAMC @{_family_xref(family)}@'
+        for sibling_id in store.recorded_siblings(person_id):
+            yield f'1 FAMC @{_sibling_xref(person_id, sibling_id)}@'
+        for family in _own_families(store, person_id):
+            yield f'1 FAMS @{_family_xref(family)}@'
+
+    for person_id in store.ids():
+        for family in _own_families(store, person_id):
+            if family[0] != person_id:
+                continue
+            yield f'0 @{_family_xref(family)}@ FAM'
+            for tag, partner in zip(('HUSB', 'WIFE'), family):
+                yield f'1 {tag} @I{partner}@'
+            if len(family) == 2 and store.spouse(person_id) == family[1]:
+                yield '1 MARR'
+            for child in store.children(person_id):
+                if family in _family_keys(store.parents(child)):
+                    yield f'1 CHIL @I{child}@'
+
+    for person_id in store.ids():
+        for sibling_id in store.recorded_siblings(person_id):
+            if person_id < sibling_id:
+                yield f'0 @{_sibling_xref(person_id, sibling_id)}@ FAM'
+                yield f'1 CHIL @I{person_id}@'
+                yield f'1 CHIL @I{sibling_id}@'
+    yield '0 TRLR'
+
+
+def write_gedcom(store, target):
+    """Stream ``store`` to a GEDCOM file path or text file object."""
+    handle, owned = _open(target, 'w')
+    try:
+        for line in iter_gedcom(store):
+            handle.write(line)
+            handle.write('\n')
+    finally:
+        if owned:
+            handle.close()
+
+
+def _family_keys(parents):
+    # The families a child belongs to: their parents two at a time, in row
+    # order, so HUSB then WIFE reads back as the same parent order
+    return [tuple(parents[index:index + 2]) for index in range(0, len(parents), 2)]
+
+
+def _family_xref(family):
+    return 'F' + '_'.join(str(parent) for parent in family)
+
+
+def _sibling_xref(person_id, sibling_id):
+    return f'S{min(person_id, sibling_id)}_{max(person_id, sibling_id)}'
+
+
+def _own_families(store, person_id):
+    # Families where person_id is a partner: one per distinct co-parent set,
+    # plus a childless one for the spouse.
+    families = dict.fromkeys(family for child in store.children(person_id)
+                             for family in _family_keys(store.parents(child)))
+    spouse = store.spouse(person_id)
+    if spouse >= 0 and (spouse, person_id) not in families:
+        families.setdefault(tuple(sorted((person_id, spouse))))
+    return [family for family in families if person_id in family]
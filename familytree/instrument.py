@@ -0,0 +1,205 @@
+"""Opt-in call counts, latency histograms and traversal sizes for a FamilyTree.
+
+Nothing is wrapped until ``Instrumentation.enable``: a tree that is not
+being instrumented runs its own methods and its store's own methods, so
+the cost when disabled is nothing at all. Enabling puts timing wrappers
+on the tree's query methods (as instance attributes), on the Person query
+methods (on the class, passing straight through for other trees) and on
+the store's row reads, which count the people each call visits. Times are
+inclusive, so ``get_cousins`` on the tree also shows up as ``find_person``
+and ``Person.get_cousins``.
+
+``profile`` runs a single command under cProfile or tracemalloc instead.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from functools import wraps
+
+TREE_METHODS = (
+    'find_person', 'get_siblings', 'get_cousins', 'relationship', 'get_birthdays', 'get_sorted_birthdays',
+    'average_age_at_death', 'median_age_at_death', 'fertility_by_generation', 'number_of_children',
+    'average_number_of_children', 'descendant_counts', 'lineage_summary',
+)
+PERSON_METHODS = (
+    'get_siblings', 'get_full_siblings', 'get_half_siblings', 'get_cousins', 'get_grandchildren',
+    'get_immediate_family', 'get_extended_family',
+)
+STORE_READS = ('parents', 'children', 'siblings', 'spouse')
+PROFILE_MODES = ('profile', 'memory')
+
+_active = {}  # id(tree) -> enabled Instrumentation, for the shared Person wrappers
+_person_originals = {}  # Person class -> {method name: original function}
+
+
+def _bucket(seconds):
+    # Powers of two in microseconds: bucket b holds calls shorter than 2**b us
+    return int(seconds * 1e6).bit_length()
+
+
+class OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.visited = 0
+        self.histogram = {}  # bucket -> calls
+
+    def add(self, elapsed, visited):
+        self.calls += 1
+        self.total += elapsed
+        self.slowest = max(self.slowest, elapsed)
+        self.visited += visited
+        bucket = _bucket(elapsed)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def percentile(self, share):
+        """Upper bound in seconds of the bucket holding the ``share`` quantile."""
+        wanted = share * self.calls
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= wanted:
+                return min(2 ** bucket / 1e6, self.slowest)
+        return self.slowest
+
+
+class Instrumentation:
+    def __init__(self, tree, person_class):
+        self.tree = tree
+        self.person_class = person_class
+        self.operations = {}  # label -> OperationStats
+        self.visited = 0  # store rows read so far
+        self.enabled = False
+        self._store = None  # the store whose reads are wrapped
+
+    def record(self, label, elapsed, visited):
+        stats = self.operations.get(label)
+        if stats is None:
+            stats = self.operations[label] = OperationStats()
+        stats.add(elapsed, visited)
+
+    def reset(self):
+        self.operations.clear()
+
+    def _timed(self, label, function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            visited, start = self.visited, time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(label, time.perf_counter() - start, self.visited - visited)
+        return timed
+
+    def _counted(self, function):
+        @wraps(function)
+        def counted(person_id):
+            self.visited += 1
+            return function(person_id)
+        return counted
+
+    # Switching on and off
+
+    def enable(self):
+        if self.enabled:
+            return
+        tree, store = self.tree, self.tree.store
+        for name in TREE_METHODS:
+            setattr(tree, name, self._timed(name, getattr(tree, name)))
+        for name in STORE_READS:
+            setattr(store, name, self._counted(getattr(store, name)))
+        _active[id(tree)] = self
+        _wrap_person_class(self.person_class)
+        self._store = store
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for name in TREE_METHODS:
+            delattr(self.tree, name)
+        for name in STORE_READS:
+            delattr(self._store, name)
+        del _active[id(self.tree)]
+        if not any(other.person_class is self.person_class for other in _active.values()):
+            _unwrap_person_class(self.person_class)
+        self._store = None
+        self.enabled = False
+
+    # Reporting
+
+    def summary(self, out=sys.stdout):
+        """Write one line per operation, slowest total first."""
+        if not self.operations:
+            out.write("No instrumented calls recorded yet.\n")
+            return
+        out.write(f"{'operation':32} {'calls':>7} {'total ms':>10} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} "
+                  f"{'max us':>9} {'visited/call':>13}\n")
+        for label, stats in sorted(self.operations.items(), key=lambda item: -item[1].total):
+            out.write(f"{label:32} {stats.calls:7} {stats.total * 1e3:10.2f} {stats.total / stats.calls * 1e6:9.1f} "
+                      f"{stats.percentile(0.5) * 1e6:9.1f} {stats.percentile(0.99) * 1e6:9.1f} "
+                      f"{stats.slowest * 1e6:9.1f} {stats.visited / stats.calls:13.1f}\n")
+
+
+def _wrap_person_class(person_class):
+    if person_class in _person_originals:
+        return
+    originals = _person_originals[person_class] = {}
+    for name in PERSON_METHODS:
+        original = originals[name] = person_class.__dict__[name]
+        setattr(person_class, name, _person_wrapper('Person.' + name, original))
+
+
+def _unwrap_person_class(person_class):
+    for name, original in _person_originals.pop(person_class, {}).items():
+        setattr(person_class, name, original)
+
+
+def _person_wrapper(label, method):
+    @wraps(method)
+    def timed(person, *args, **kwargs):
+        instrumentation = _active.get(id(person._tree))
+        if instrumentation is None:
+            return method(person, *args, **kwargs)
+        visited, start = instrumentation.visited, time.perf_counter()
+        try:
+            return method(person, *args, **kwargs)
+        finally:
+            instrumentation.record(label, time.perf_counter() - start, instrumentation.visited - visited)
+    return timed
+
+
+def profile(command, mode='profile', out=sys.stdout, limit=15):
+    """Run ``command()`` once under cProfile ('profile') or tracemalloc ('memory') and report on it."""
+    if mode == 'profile':
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(command)
+        finally:
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(limit)
+            out.write(report.getvalue())
+    if mode != 'memory':
+        raise ValueError(f"unknown profile mode {mode!r}; use one of {', '.join(PROFILE_MODES)}")
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    try:
+        return command()
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        if not tracing:
+            tracemalloc.stop()
+        out.write(f"Peak memory above the start: {(peak - start) / 1024:.1f} KiB\n")
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        for difference in after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')[:limit]:
+            out.write(f"{difference}\n")
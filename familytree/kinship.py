@@ -0,0 +1,261 @@
+"""Kinship index: ancestor tests, nearest common ancestors and named relationships.
+
+A pedigree is a DAG (two parents per child), not a tree, so a single Euler
+tour cannot answer ancestor queries exactly. Instead every person gets
+``LABELINGS`` interval labels from depth-first post-order traversals: if
+``a`` is an ancestor of ``d`` then each of ``d``'s intervals lies inside
+``a``'s, so a failed containment test (or a generation number that is not
+smaller) answers "no" in O(1). Only when every label agrees is a search
+run, and it only climbs into ancestors whose labels still contain ``d``'s.
+
+Labels and generation numbers are kept up to date from store notifications:
+a new child widens the intervals of its new ancestors and may push its
+descendants down a generation, touching only people whose values change.
+"""
+
+from array import array
+from collections import deque
+
+LABELINGS = 2
+ORDINALS = ('first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth')
+
+
+class KinshipIndex:
+    def __init__(self, store):
+        self.store = store
+        count = len(store)
+        self.generation = array('i', bytes(4 * count))
+        self.low = [array('i', bytes(4 * count)) for _ in range(LABELINGS)]
+        self.high = [array('i', bytes(4 * count)) for _ in range(LABELINGS)]
+        self._next_rank = 0
+        self.generation_listeners = []  # called as listener(person_id, old, new)
+        self._build()
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+
+    # Construction
+
+    def _build(self):
+        store = self.store
+        count = len(store)
+        roots = [person_id for person_id in store.ids() if not len(store.parents(person_id))]
+
+        # Generation = longest chain of parents above a person (Kahn's order).
+        waiting = array('i', (len(store.parents(person_id)) for person_id in store.ids()))
+        queue = deque(roots)
+        generation = self.generation
+        while queue:
+            person_id = queue.popleft()
+            for child_id in store.children(person_id):
+                generation[child_id] = max(generation[child_id], generation[person_id] + 1)
+                waiting[child_id] -= 1
+                if not waiting[child_id]:
+                    queue.append(child_id)
+
+        for labeling in range(LABELINGS):
+            rank = self._label(labeling, roots if labeling % 2 == 0 else roots[::-1], reverse=labeling % 2 == 1)
+            self._next_rank = max(self._next_rank, rank)
+        # People caught in a parent cycle are never reached from a root; give
+        # them their own interval so lookups stay safe.
+        for labeling in range(LABELINGS):
+            low, high = self.low[labeling], self.high[labeling]
+            for person_id in range(count):
+                if not high[person_id]:
+                    self._next_rank += 1
+                    low[person_id] = high[person_id] = self._next_rank
+
+    def _label(self, labeling, roots, reverse):
+        # Iterative post-order DFS over children; ranks start at 1 so that 0
+        # can mean "not visited yet".
+        store = self.store
+        low, high = self.low[labeling], self.high[labeling]
+        rank = 0
+        for root in roots:
+            if high[root]:
+                continue
+            stack = [(root, iter(self._ordered(store.children(root), reverse)))]
+            high[root] = -1  # on the stack
+            while stack:
+                person_id, children = stack[-1]
+                for child_id in children:
+                    if not high[child_id]:
+                        high[child_id] = -1
+                        stack.append((child_id, iter(self._ordered(store.children(child_id), reverse))))
+                        break
+                else:
+                    stack.pop()
+                    rank += 1
+                    smallest = rank
+                    for child_id in store.children(person_id):
+                        if high[child_id] > 0 and low[child_id] < smallest:
+                            smallest = low[child_id]
+                    low[person_id] = smallest
+                    high[person_id] = rank
+        return rank
+
+    @staticmethod
+    def _ordered(children, reverse):
+        return reversed(children) if reverse else children
+
+    # Incremental maintenance
+
+    def _on_change(self, event, *args):
+        if event == 'add_person':
+            self._next_rank += 1
+            self.generation.append(0)
+            for labeling in range(LABELINGS):
+                self.low[labeling].append(self._next_rank)
+                self.high[labeling].append(self._next_rank)
+        elif event == 'add_child':
+            self._add_edge(*args)
+
+    def _add_edge(self, parent_id, child_id):
+        store = self.store
+        # Widen the intervals of the parent and every ancestor that changes.
+        queue = deque([parent_id])
+        while queue:
+            person_id = queue.popleft()
+            changed = False
+            for labeling in range(LABELINGS):
+                low, high = self.low[labeling], self.high[labeling]
+                if low[child_id] < low[person_id]:
+                    low[person_id] = low[child_id]
+                    changed = True
+                if high[child_id] > high[person_id]:
+                    high[person_id] = high[child_id]
+                    changed = True
+            if changed:
+                queue.extend(store.parents(person_id))
+
+        # Push the child and its descendants down if they are now deeper
+        # (a depth beyond the population size can only come from a cycle).
+        generation = self.generation
+        limit = len(store)
+        queue = deque([(child_id, generation[parent_id] + 1)])
+        while queue:
+            person_id, depth = queue.popleft()
+            if generation[person_id] < depth <= limit:
+                old = generation[person_id]
+                generation[person_id] = depth
+                for listener in self.generation_listeners:
+                    listener(person_id, old, depth)
+                queue.extend((grandchild, depth + 1) for grandchild in store.children(person_id))
+
+    # Queries
+
+    def may_be_ancestor(self, ancestor_id, person_id):
+        """O(1) filter: False means ``ancestor_id`` is certainly not an ancestor."""
+        if self.generation[ancestor_id] >= self.generation[person_id]:
+            return False
+        for labeling in range(LABELINGS):
+            low, high = self.low[labeling], self.high[labeling]
+            if low[person_id] < low[ancestor_id] or high[person_id] > high[ancestor_id]:
+                return False
+        return True
+
+    def is_ancestor(self, ancestor_id, person_id):
+        if not self.may_be_ancestor(ancestor_id, person_id):
+            return False
+        parents = self.store.parents
+        seen = {person_id}
+        stack = [person_id]
+        while stack:
+            for parent_id in parents(stack.pop()):
+                if parent_id == ancestor_id:
+                    return True
+                if parent_id not in seen and self.may_be_ancestor(ancestor_id, parent_id):
+                    seen.add(parent_id)
+                    stack.append(parent_id)
+        return False
+
+    def nearest_common_ancestors(self, first_id, second_id):
+        """Return ``(up, down, ancestors)`` for the closest common ancestors.
+
+        ``up`` and ``down`` are the generations from ``first_id`` and
+        ``second_id`` to the ancestors (0 when one person is the other's
+        ancestor). Returns None when no common ancestor is recorded.
+        """
+        parents = self.store.parents
+        distances = ({first_id: 0}, {second_id: 0})
+        frontiers = [[first_id], [second_id]]
+        depths = [0, 0]
+        best = 0 if first_id == second_id else None
+        # Climb both pedigrees a generation at a time, always extending the
+        # shallower side, until neither side can still produce a closer meet.
+        while frontiers[0] or frontiers[1]:
+            side = min((side for side in (0, 1) if frontiers[side]), key=depths.__getitem__)
+            depth = depths[side] + 1
+            if best is not None and depth > best:
+                break
+            mine, other = distances[side], distances[1 - side]
+            next_frontier = []
+            for person_id in frontiers[side]:
+                for parent_id in parents(person_id):
+                    if parent_id in mine:
+                        continue
+                    mine[parent_id] = depth
+                    next_frontier.append(parent_id)
+                    if parent_id in other and (best is None or depth + other[parent_id] < best):
+                        best = depth + other[parent_id]
+            frontiers[side] = next_frontier
+            depths[side] = depth
+        if best is None:
+            return None
+        shared = [person_id for person_id in distances[0]
+                  if person_id in distances[1] and distances[0][person_id] + distances[1][person_id] == best]
+        up = min(distances[0][person_id] for person_id in shared)
+        shared = [person_id for person_id in shared if distances[0][person_id] == up]
+        return up, best - up, shared
+
+    def relationship(self, person_id, relative_id):
+        """Describe what ``relative_id`` is to ``person_id``, e.g. 'second cousin once removed'."""
+        if person_id == relative_id:
+            return 'self'
+        found = self.nearest_common_ancestors(person_id, relative_id)
+        if found is None:
+            # Siblings recorded without parents have no common ancestor to find.
+            if relative_id in self.store.siblings(person_id):
+                return 'sibling'
+            return 'spouse' if self.store.spouse(person_id) == relative_id else None
+        up, down, _ = found
+        name = relationship_name(up, down)
+        if up == down == 1:
+            parents = self.store.parents
+            if sorted(parents(person_id)) != sorted(parents(relative_id)):
+                name = 'half-' + name
+        return name
+
+
+def relationship_name(up, down):
+    """Name a relative reached by going ``up`` generations to a common ancestor and ``down`` again."""
+    if up == 0 and down == 0:
+        return 'self'
+    if up == 0:
+        return _lineal(down, 'child', 'grandchild')
+    if down == 0:
+        return _lineal(up, 'parent', 'grandparent')
+    if up == 1 and down == 1:
+        return 'sibling'
+    if up == 1:
+        return _lineal(down - 1, 'niece/nephew', 'grandniece/grandnephew')
+    if down == 1:
+        return 'great-' * (up - 2) + 'aunt/uncle'
+    degree, removed = min(up, down) - 1, abs(up - down)
+    name = (ORDINALS[degree - 1] if degree <= len(ORDINALS) else f"{degree}th") + ' cousin'
+    if removed == 1:
+        name += ' once removed'
+    elif removed == 2:
+        name += ' twice removed'
+    elif removed:
+        name += f' {removed} times removed'
+    return name
+
+
+def _lineal(generations, first, second):
+    if generations == 1:
+        return first
+    return 'great-' * (generations - 2) + second
@@ -0,0 +1,215 @@
+"""Descendant counts, living descendants and lineage depth for every person.
+
+One pass over the pedigree in depth-first post-order (children before
+parents) builds each person's descendant set as the union of their
+children's sets, so a descendant reached along several lines (pedigree
+collapse) is counted once. A set is dropped as soon as every parent of its
+owner has used it; only the counts are kept.
+
+Afterwards the index follows store notifications. Depth only ever grows and
+is pushed up the ancestors straight away. New children and death dates are
+queued and counted on the next lookup: every ancestor above a new edge gains
+the child's line minus whatever they could already reach, and a death-date
+change moves the living count of every ancestor by one. A large batch of
+new edges is cheaper to recount in one pass, so it triggers a rebuild.
+"""
+
+import heapq
+from array import array
+
+from familytree import traversal
+
+REBUILD_SHARE = 8  # rebuild once there are more than 1/8 as many new edges as people
+
+
+class LineageIndex:
+    def __init__(self, store):
+        self.store = store
+        self.counts = array('i')  # descendants, each counted once
+        self.living = array('i')  # descendants without a death date
+        self.depth = array('i')  # generations of descendants below (0 for none)
+        self._new_edges = []  # (parent, child) edges not counted yet
+        self._deaths = []  # (person, change in living) not counted yet
+        self._build()
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+
+    # Construction
+
+    def _post_order(self):
+        # Iterative DFS over children from every root, then from anyone left
+        # (people caught in a parent cycle); a person comes after all of
+        # their descendants.
+        store = self.store
+        count = len(store)
+        offsets, targets = store.adjacency('child')
+        parent_offsets, _ = store.adjacency('parent')
+        visited = bytearray(count)
+        order = []
+        starts = [person_id for person_id in store.ids() if parent_offsets[person_id] == parent_offsets[person_id + 1]]
+        for start in starts + list(store.ids()):
+            if visited[start]:
+                continue
+            visited[start] = 1
+            stack = [(start, iter(targets[offsets[start]:offsets[start + 1]]))]
+            while stack:
+                person_id, children = stack[-1]
+                for child_id in children:
+                    if not visited[child_id]:
+                        visited[child_id] = 1
+                        stack.append((child_id, iter(targets[offsets[child_id]:offsets[child_id + 1]])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(person_id)
+        return order
+
+    def _build(self):
+        store = self.store
+        count = len(store)
+        offsets, targets = store.adjacency('child')
+        parent_offsets, _ = store.adjacency('parent')
+        alive = {person_id for person_id, death in enumerate(store.death_ordinals) if not death}
+        counts, living, depth = [0] * count, [0] * count, [0] * count
+        waiting = [parent_offsets[person_id + 1] - parent_offsets[person_id] for person_id in range(count)]
+        sets = [None] * count
+        empty = frozenset()
+        for person_id in self._post_order():
+            children = targets[offsets[person_id]:offsets[person_id + 1]]
+            if not children:
+                descendants = empty
+            else:
+                descendants = set(children)
+                deepest = 0
+                for child_id in children:
+                    if sets[child_id]:
+                        descendants.update(sets[child_id])
+                    if depth[child_id] >= deepest:
+                        deepest = depth[child_id] + 1
+                    waiting[child_id] -= 1
+                    if waiting[child_id] <= 0:
+                        sets[child_id] = None
+                counts[person_id] = len(descendants)
+                living[person_id] = len(alive.intersection(descendants))
+                depth[person_id] = deepest
+            if waiting[person_id] > 0:
+                sets[person_id] = descendants
+        self.counts = array('i', counts)
+        self.living = array('i', living)
+        self.depth = array('i', depth)
+        self._new_edges, self._deaths = [], []
+
+    # Incremental maintenance
+
+    def _ancestors(self, person_id, skip=()):
+        """``person_id`` and everyone above them, each once, not crossing the (parent, child) edges in ``skip``."""
+        parents = self.store.parents
+        seen = {person_id}
+        stack = [person_id]
+        while stack:
+            child_id = stack.pop()
+            for parent_id in parents(child_id):
+                if parent_id not in seen and (parent_id, child_id) not in skip:
+                    seen.add(parent_id)
+                    stack.append(parent_id)
+        return seen
+
+    def _on_change(self, event, *args):
+        if event == 'add_person':
+            self.counts.append(0)
+            self.living.append(0)
+            self.depth.append(0)
+        elif event == 'add_child':
+            self._push_depth(*args)
+            self._new_edges.append(args)
+        elif event == 'set_death_date':
+            person_id, old = args
+            now = self.store.death_date(person_id)
+            if (old is None) != (now is None):
+                self._deaths.append((person_id, 1 if now is None else -1))
+
+    def _push_depth(self, parent_id, child_id):
+        # Depth only grows: push the longer line up while it makes a difference
+        store = self.store
+        stack = [(parent_id, self.depth[child_id] + 1)]
+        limit = len(store)  # deeper than the population means a cycle
+        while stack:
+            person_id, depth = stack.pop()
+            if self.depth[person_id] < depth <= limit:
+                self.depth[person_id] = depth
+                stack.extend((grandparent_id, depth + 1) for grandparent_id in store.parents(person_id))
+
+    def _catch_up(self):
+        # Apply the changes seen since the last lookup. Edges that arrived in
+        # one bulk insert are all in the store already, so "before" means the
+        # store without any of the new edges, whatever order they came in.
+        edges, deaths = self._new_edges, self._deaths
+        self._new_edges, self._deaths = [], []
+        if len(edges) * REBUILD_SHARE > len(self.store):
+            self._build()
+            return
+        new = set(edges)
+        for person_id, change in deaths:
+            for ancestor_id in self._ancestors(person_id, new):
+                if ancestor_id != person_id:
+                    self.living[ancestor_id] += change
+        if not edges:
+            return
+
+        # Everyone above a new edge may have gained the child's line
+        reached = {}
+        work = 0
+        for parent_id, child_id in edges:
+            line = {child_id}
+            line.update(traversal.descendants(child_id, self.store.children))
+            ancestors = self._ancestors(parent_id)
+            work += len(line) * len(ancestors)
+            if work > len(self.store):  # already about as much as walking everyone once
+                self._build()
+                return
+            for ancestor_id in ancestors:
+                reached.setdefault(ancestor_id, set()).update(line)
+
+        # ...except the descendants they could already reach without the new edges
+        known = {}
+        for descendant_id in set().union(*reached.values()):
+            for ancestor_id in self._ancestors(descendant_id, new):
+                if ancestor_id in reached and descendant_id in reached[ancestor_id]:
+                    known.setdefault(ancestor_id, set()).add(descendant_id)
+        death_date = self.store.death_date
+        for ancestor_id, line in reached.items():
+            line.difference_update(known.get(ancestor_id, ()))
+            line.discard(ancestor_id)
+            self.counts[ancestor_id] += len(line)
+            self.living[ancestor_id] += sum(1 for descendant_id in line if death_date(descendant_id) is None)
+
+    # Queries
+
+    def descendant_count(self, person_id):
+        if self._new_edges or self._deaths:
+            self._catch_up()
+        return self.counts[person_id]
+
+    def living_descendant_count(self, person_id):
+        if self._new_edges or self._deaths:
+            self._catch_up()
+        return self.living[person_id]
+
+    def lineage_depth(self, person_id):
+        """Number of generations of descendants below ``person_id``."""
+        return self.depth[person_id]
+
+    def descendant_counts(self):
+        """Descendant count of every person, indexed by ID."""
+        if self._new_edges or self._deaths:
+            self._catch_up()
+        return self.counts
+
+    def largest_lineages(self, count=10):
+        """IDs of the ``count`` people with the most descendants, most first."""
+        counts = self.descendant_counts()
+        return heapq.nlargest(count, range(len(counts)), key=counts.__getitem__)
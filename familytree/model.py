@@ -0,0 +1,632 @@
+"""The FamilyTree and Person classes, importable without building any data.
+
+Importing this module does no work beyond loading the core store and
+traversal code. Optional subsystems (NumPy analytics, the process pool,
+SQLite, GEDCOM, snapshots, the change log, instrumentation) are imported by the methods
+that use them, so startup time does not depend on which are installed.
+"""
+
+import os
+from collections.abc import Mapping
+from datetime import datetime, date, timedelta
+
+from familytree import traversal
+from familytree.birthdays import BirthdayCalendar
+from familytree.cache import QueryCache
+from familytree.kinship import KinshipIndex
+from familytree.lineage import LineageIndex
+from familytree.names import NameIndex
+from familytree.pedigree import Pedigree
+from familytree.relatives import (extended_family_ids, extended_family_ids_many, first_cousin_ids,
+                                  first_cousin_ids_many, full_sibling_ids, half_sibling_ids, immediate_family_ids)
+from familytree.stats import RunningStats, age_between
+from familytree.store import NO_PERSON, PersonStore, copy_store
+
+
+# Feature 1 - Person Class (Partner A)
+class Person:
+    """Lightweight handle onto one person in a FamilyTree's PersonStore."""
+
+    __slots__ = ('_tree', '_id')
+
+    def __init__(self, tree, person_id):
+        self._tree = tree
+        self._id = person_id
+
+    def __eq__(self, other):
+        return isinstance(other, Person) and self._tree is other._tree and self._id == other._id
+
+    def __hash__(self):
+        return hash(self._id)
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._tree.store.name(self._id)
+
+    @property
+    def birth_date(self):
+        return self._tree.store.birth_date(self._id)
+
+    @birth_date.setter
+    def birth_date(self, value):
+        self._tree.store.set_birth_date(self._id, value)
+
+    @property
+    def death_date(self):
+        return self._tree.store.death_date(self._id)
+
+    @death_date.setter
+    def death_date(self, value):
+        self._tree.store.set_death_date(self._id, value)
+
+    @property
+    def spouse(self):
+        spouse_id = self._tree.store.spouse(self._id)
+        return self._tree.person(spouse_id) if spouse_id != NO_PERSON else None
+
+    @spouse.setter
+    def spouse(self, spouse):
+        self._tree.store.set_spouse(self._id, spouse._id if spouse else NO_PERSON)
+
+    @property
+    def parents(self):
+        return self._tree.people_from_ids(self._tree.store.parents(self._id))
+
+    @property
+    def siblings(self):
+        return self._tree.people_from_ids(self._tree.store.siblings(self._id))
+
+    @property
+    def children(self):
+        return self._tree.people_from_ids(self._tree.store.children(self._id))
+
+    def add_sibling(self, sibling):
+        self._tree.store.add_sibling(self._id, sibling._id)
+
+    def add_child(self, child):
+        self._tree.store.add_child(self._id, child._id)
+
+    def get_siblings(self):
+        return self.siblings
+
+    def get_full_siblings(self):
+        return self._tree.people_from_ids(self._tree.cached_query('full_siblings', self._id, full_sibling_ids))
+
+    def get_half_siblings(self):
+        return self._tree.people_from_ids(self._tree.cached_query('half_siblings', self._id, half_sibling_ids))
+
+    def get_cousins(self):
+        return self._tree.people_from_ids(self._tree.cached_query('cousins', self._id, first_cousin_ids))
+
+    def age_at_death(self):
+        return age_between(self.birth_date, self.death_date)  # None unless both dates are known
+
+    def get_grandchildren(self):
+        return self._tree.people_from_ids(self._tree.generation_ids(self._id, 'child', 2))
+
+    def get_immediate_family(self):
+        name = self._tree.store.name
+        parents, siblings, spouse, children = self._tree.cached_query(
+            'immediate_family', self._id, immediate_family_ids)
+        immediate_family = {
+            'parents': [name(parent) for parent in parents],
+            'siblings': [name(sibling) for sibling in siblings],
+            'spouse': name(spouse) if spouse != NO_PERSON else None,
+            'children': [name(child) for child in children]
+        }
+        return immediate_family
+
+    def get_extended_family(self):
+        name = self._tree.store.name
+        return [name(person_id) for person_id in
+                self._tree.cached_query('extended_family', self._id, extended_family_ids)]
+
+
+class PeopleView(Mapping):
+    """Read-only ``name -> Person`` mapping over the store (replaces the old people dict)."""
+
+    def __init__(self, tree):
+        self._tree = tree
+
+    def __getitem__(self, name):
+        person_id = self._tree.store.find(name)
+        if person_id == NO_PERSON:
+            raise KeyError(name)
+        return self._tree.person(person_id)
+
+    def __iter__(self):
+        store = self._tree.store
+        return (store.name(person_id) for person_id in store.ids())
+
+    def __len__(self):
+        return len(self._tree.store)
+
+    def __contains__(self, name):
+        return self._tree.store.find(name) != NO_PERSON
+
+
+# Feature 2 - FamilyTree Class (Partner B)
+class FamilyTree:
+    def __init__(self, store=None, cache_size=1024):
+        self.store = store if store is not None else PersonStore()
+        self.cache_size = cache_size  # cached relative queries; 0 turns the cache off
+        self._cache = None
+        self.people = PeopleView(self)
+        self._kinship = None
+        self._statistics = None
+        self._birthdays = None
+        self._names = None
+        self._lineage = None
+        self._pedigree = None
+        self._instrumentation = None
+        self._changelog = None
+        self._replica = None
+
+    def person(self, person_id):
+        return Person(self, person_id)
+
+    def people_from_ids(self, person_ids):
+        return [Person(self, person_id) for person_id in person_ids]
+
+    def add_person(self, name, birth_date=None, death_date=None, spouse=None):
+        person_id = self.store.find(name)
+        if person_id == NO_PERSON:
+            person_id = self.store.add(name, birth_date, death_date)
+            if spouse:
+                self.store.set_spouse(person_id, spouse.id)
+        return self.person(person_id)
+
+    def find_person(self, name):
+        """Exact match first, then ignoring case, accents and extra spaces."""
+        person_id = self.store.find(name)
+        if person_id == NO_PERSON:
+            matches = self.name_index().exact(name)
+            if not matches:
+                return None
+            person_id = matches[0]
+        return self.person(person_id)
+
+    def name_index(self):
+        """Normalised, prefix and fuzzy name index, built on first use and kept current afterwards."""
+        if self._names is None:
+            self._names = NameIndex(self.store)
+        return self._names
+
+    def find_people(self, name):
+        """Everyone whose name matches ``name`` ignoring case and accents (duplicates included)."""
+        return self.people_from_ids(self.name_index().exact(name))
+
+    def complete_names(self, prefix, limit=10):
+        """Names starting with ``prefix`` (normalised), alphabetically, for autocompletion."""
+        return [self.store.name(person_ids[0]) for _, person_ids in self.name_index().prefix(prefix, limit)]
+
+    def suggest_names(self, name, limit=5, max_distance=2):
+        """Names within a few typos of ``name``, closest first."""
+        return [self.store.name(person_ids[0])
+                for _, _, person_ids in self.name_index().fuzzy(name, limit, max_distance)]
+
+    def not_found_message(self, name):
+        suggestions = self.suggest_names(name)
+        if suggestions:
+            return f"No person found with name {name}. Did you mean: {', '.join(suggestions)}?"
+        return f"No person found with name {name}."
+
+    def add_relationships(self, edges):
+        """Bulk-add (kind, person, relative) edges, e.g. ('child', "Otto Emmersohn", "Anna Emmersohn").
+
+        ``kind`` is 'parent', 'child', 'sibling' or 'spouse'; people may be given
+        as names, Person objects or store IDs.
+        """
+        self.store.add_relationships(
+            (kind, self._person_id(person), self._person_id(relative)) for kind, person, relative in edges)
+
+    @classmethod
+    def open_snapshot(cls, path):
+        """Open a snapshot written by save_snapshot as a read-only tree (no deserialising)."""
+        from familytree.snapshot import Snapshot
+        return cls(Snapshot.open(path))
+
+    def save_snapshot(self, path):
+        from familytree.snapshot import write_snapshot
+        write_snapshot(self.store, path)
+
+    @classmethod
+    def open_database(cls, path):
+        """Open (or create) a SQLite database.
+
+        Changes are written in batches; call ``commit`` or ``close`` (or use
+        the tree as a context manager) to make the last ones durable.
+        """
+        from familytree.sqlite_store import SQLiteStore
+        return cls(SQLiteStore(path))
+
+    def commit(self):
+        """Make pending changes durable when the store batches its writes (SQLite); a no-op otherwise."""
+        if hasattr(self.store, 'commit'):
+            self.store.commit()
+
+    def close(self):
+        """Commit and release the store's file or connection, if it has one."""
+        if self._changelog is not None:
+            self._changelog.close()
+            self._changelog = None
+        if hasattr(self.store, 'close'):
+            self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @classmethod
+    def open_lazy(cls, path, working_set=4096):
+        """Open a snapshot or SQLite database (created if missing), keeping at most ``working_set``
+        person records in memory."""
+        from familytree.snapshot import MAGIC, Snapshot
+        from familytree.sqlite_store import SQLiteStore
+        from familytree.working_set import WorkingSetStore
+        is_snapshot = False
+        if os.path.exists(path):
+            with open(path, 'rb') as handle:
+                is_snapshot = handle.read(len(MAGIC)) == MAGIC
+        store = Snapshot.open(path) if is_snapshot else SQLiteStore(path)
+        return cls(WorkingSetStore(store, working_set))
+
+    def save_database(self, path):
+        """Copy the tree into a new SQLite database at ``path``."""
+        from familytree.sqlite_store import SQLiteStore
+        with SQLiteStore(path) as database:
+            copy_store(self.store, database)
+
+    def record_changes(self, directory, compact_every=None):
+        """Append every later change to a change log in ``directory``; replicas follow it with open_replica.
+
+        With ``compact_every``, the log is folded into a fresh snapshot after
+        that many changes.
+        """
+        from familytree.changelog import ChangeLog
+        if self._changelog is not None:
+            self._changelog.close()
+        self._changelog = ChangeLog(directory, self.store, compact_every)
+        return self._changelog
+
+    def checkpoint(self):
+        """Snapshot the tree into its change log directory and drop the log before it."""
+        self._changelog.compact()
+
+    @classmethod
+    def open_replica(cls, directory):
+        """A read-only copy of the tree recorded in ``directory``, brought up to date with catch_up."""
+        from familytree.changelog import Replica
+        replica = Replica(directory)
+        tree = cls(replica.store)
+        tree._replica = replica
+        return tree
+
+    def catch_up(self):
+        """Replay the changes logged since the last call and return how many there were.
+
+        A replica that fell behind the last checkpoint reloads that snapshot
+        instead, and its indexes are rebuilt on next use.
+        """
+        replica = self._replica
+        if replica is None:
+            raise ValueError("catch_up needs a tree opened with FamilyTree.open_replica")
+        if replica.catch_up():
+            self._replace_store(replica.store)
+        return replica.replayed
+
+    def _replace_store(self, store):
+        """Point the tree at ``store`` and drop the indexes built over the old one."""
+        instrumentation = self._instrumentation
+        enabled = instrumentation is not None and instrumentation.enabled
+        if enabled:
+            instrumentation.disable()  # it wraps the old store's reads
+        for index in (self._cache, self._kinship, self._statistics, self._birthdays, self._names,
+                      self._lineage, self._pedigree):
+            if index is not None:
+                index.close()
+        self.store = store
+        self._cache = self._kinship = self._statistics = self._birthdays = None
+        self._names = self._lineage = self._pedigree = None
+        if enabled:
+            instrumentation.enable()
+
+    def load_gedcom(self, source):
+        """Stream a GEDCOM file (path or text file object) into the tree."""
+        from familytree import gedcom
+        return gedcom.read_gedcom(source, self.store)
+
+    def save_gedcom(self, target):
+        from familytree import gedcom
+        gedcom.write_gedcom(self.store, target)
+
+    def _person_id(self, person):
+        if isinstance(person, Person):
+            return person.id
+        if isinstance(person, str):
+            person_id = self.store.find(person)
+            if person_id == NO_PERSON:
+                raise KeyError(person)
+            return person_id
+        return person
+
+    def get_siblings(self, name):
+        person = self.find_person(name)
+        if person:
+            return [sibling.name for sibling in person.get_siblings()]
+        return []
+
+    def get_cousins(self, name):
+        person = self.find_person(name)
+        if person:
+            return [cousin.name for cousin in person.get_cousins()]
+        return []
+
+    def get_cousins_many(self, names):
+        """Yield ``(name, cousin names)`` for each of ``names`` in order, working out each family unit once."""
+        return self._many(names, first_cousin_ids_many)
+
+    def get_extended_family_many(self, names):
+        """Yield ``(name, extended family names)`` for each of ``names`` in order; siblings share the work."""
+        return self._many(names, extended_family_ids_many)
+
+    def _many(self, names, query_many):
+        people = [(name, self.find_person(name)) for name in names]
+        results = query_many(self.store, [person.id for _, person in people if person])
+        by_name = {}  # siblings share relatives, so decode each name once
+        for requested, person in people:
+            if person is None:
+                yield requested, []  # like get_cousins for an unknown name
+                continue
+            _, relative_ids = next(results)
+            relatives = []
+            for relative_id in relative_ids:
+                name = by_name.get(relative_id)
+                if name is None:
+                    name = by_name[relative_id] = self.store.name(relative_id)
+                relatives.append(name)
+            yield requested, relatives
+
+    # Multi-hop queries go to the store when it can answer them itself (SQLite)
+
+    def cousin_ids(self, person_id, n=1, removed=0):
+        store = self.store
+        if hasattr(store, 'cousin_ids'):
+            return store.cousin_ids(person_id, n, removed)
+        return traversal.nth_cousins(person_id, n, store.parents, store.children, store.siblings, removed)
+
+    def generation_ids(self, person_id, kind, depth):
+        """IDs exactly ``depth`` steps away along 'child' or 'parent' links."""
+        store = self.store
+        if hasattr(store, 'generation_ids'):
+            return store.generation_ids(person_id, kind, depth)
+        return traversal.generation([person_id], store.children if kind == 'child' else store.parents, depth)
+
+    def descendant_ids(self, person_id, generations=None):
+        store = self.store
+        if hasattr(store, 'descendant_ids'):
+            return store.descendant_ids(person_id, generations)
+        return traversal.descendants(person_id, store.children, generations)
+
+    def ancestor_ids(self, person_id, generations=None):
+        store = self.store
+        if hasattr(store, 'ancestor_ids'):
+            return store.ancestor_ids(person_id, generations)
+        return traversal.ancestors(person_id, store.parents, generations)
+
+    # Generalised relative queries; each yields names lazily
+
+    def relatives_within(self, name, hops):
+        """Everyone within ``hops`` parent/child/sibling/spouse steps of ``name``."""
+        person = self.find_person(name)
+        if person:
+            for person_id in traversal.within(person.id, self._relative_ids, hops):
+                yield self.store.name(person_id)
+
+    def _relative_ids(self, person_id):
+        store = self.store
+        yield from store.parents(person_id)
+        yield from store.children(person_id)
+        yield from store.siblings(person_id)
+        spouse_id = store.spouse(person_id)
+        if spouse_id != NO_PERSON:
+            yield spouse_id
+
+    def descendants(self, name, generations=None):
+        person = self.find_person(name)
+        if person:
+            for person_id in self.descendant_ids(person.id, generations):
+                yield self.store.name(person_id)
+
+    def ancestors(self, name, generations=None):
+        person = self.find_person(name)
+        if person:
+            for person_id in self.ancestor_ids(person.id, generations):
+                yield self.store.name(person_id)
+
+    def nth_cousins(self, name, n, removed=0):
+        person = self.find_person(name)
+        if person:
+            for person_id in self.cousin_ids(person.id, n, removed):
+                yield self.store.name(person_id)
+
+    def query_cache(self):
+        """LRU cache of relative queries, invalidated exactly by store changes."""
+        if self._cache is None:
+            self._cache = QueryCache(self.store, self.cache_size)
+        return self._cache
+
+    def cached_query(self, query, person_id, compute):
+        """``compute(store, person_id)``, answered from the query cache when it is on."""
+        if self.cache_size <= 0:
+            return compute(self.store, person_id)
+        return self.query_cache().get(query, person_id, compute)
+
+    def cache_info(self):
+        """Hit, miss, eviction and invalidation counts of the query cache."""
+        return self.query_cache().info()
+
+    def kinship(self):
+        """Kinship index over the tree, built on first use and kept current afterwards."""
+        if self._kinship is None:
+            self._kinship = KinshipIndex(self.store)
+        return self._kinship
+
+    def is_ancestor(self, ancestor_name, name):
+        ancestor, person = self.find_person(ancestor_name), self.find_person(name)
+        if ancestor and person:
+            return self.kinship().is_ancestor(ancestor.id, person.id)
+        return False
+
+    def relationship(self, name, relative_name):
+        """What ``relative_name`` is to ``name``, e.g. 'first cousin once removed', or None."""
+        person, relative = self.find_person(name), self.find_person(relative_name)
+        if person and relative:
+            return self.kinship().relationship(person.id, relative.id)
+        return None
+
+    def pedigree(self):
+        """Memoised ancestor counts and kinship coefficients, cleared when parents are added."""
+        if self._pedigree is None:
+            self._pedigree = Pedigree(self.store)
+        return self._pedigree
+
+    def ancestors_by_generation(self, name, generations=None):
+        """Yield the names of the distinct ancestors in each generation, parents first."""
+        person = self.find_person(name)
+        if person:
+            for level in self.pedigree().ancestors_by_generation(person.id, generations):
+                yield [self.store.name(person_id) for person_id in level]
+
+    def ancestor_counts(self, name, generations=None):
+        """``(generation, distinct ancestors, 2**generation slots)`` for each generation above ``name``."""
+        person = self.find_person(name)
+        return self.pedigree().ancestor_counts(person.id, generations) if person else []
+
+    def kinship_coefficient(self, name, relative_name):
+        """Kinship coefficient of two people (0.25 for full siblings), or None if either is unknown."""
+        person, relative = self.find_person(name), self.find_person(relative_name)
+        if person and relative:
+            return self.pedigree().kinship(person.id, relative.id)
+        return None
+
+    def inbreeding_coefficient(self, name):
+        person = self.find_person(name)
+        return self.pedigree().inbreeding(person.id) if person else None
+
+    def get_birthdays(self):
+        return {name: person.birth_date for name, person in self.people.items() if person.birth_date}
+
+    def birthdays(self):
+        """Day-of-year birthday index, built on first use and kept current afterwards."""
+        if self._birthdays is None:
+            self._birthdays = BirthdayCalendar(self.store)
+        return self._birthdays
+
+    def get_sorted_birthdays(self):
+        return [(datetime(2000, month, day).strftime("%B %d"), [self.store.name(person_id) for person_id in ids])
+                for (month, day), ids in self.birthdays().by_day()]
+
+    def birthdays_between(self, start, end):
+        """``(date, name)`` for every birthday from ``start`` to ``end`` inclusive, wrapping at year end."""
+        return [(day, self.store.name(person_id)) for day, person_id in self.birthdays().between(start, end)]
+
+    def upcoming_birthdays(self, days=14, start=None):
+        """Birthdays in the ``days`` days starting at ``start`` (default today)."""
+        start = start or date.today()
+        return self.birthdays_between(start, start + timedelta(days=days - 1))
+
+    def next_birthdays(self, count, start=None):
+        """The next ``count`` birthdays on or after ``start`` (default today), as ``(date, name)``."""
+        return [(day, self.store.name(person_id)) for day, person_id in self.birthdays().upcoming(count, start)]
+
+    def statistics(self):
+        """Running aggregates, built on first use and updated on every change afterwards."""
+        if self._statistics is None:
+            self._statistics = RunningStats(self.store, self.kinship())
+        return self._statistics
+
+    def average_age_at_death(self):
+        return self.statistics().average_age_at_death()
+
+    def median_age_at_death(self):
+        return self.statistics().median_age_at_death()
+
+    def fertility_by_generation(self):
+        return self.statistics().fertility_by_generation()
+
+    def check_statistics(self):
+        """Recompute the statistics from scratch and return any mismatches (empty when consistent)."""
+        return self.statistics().check()
+
+    def number_of_children(self):
+        children_count = {}
+        for person in self.people.values():
+            children_count[person.name] = len(person.children)
+        return children_count
+
+    def average_number_of_children(self):
+        return self.statistics().average_number_of_children()
+
+    def demographics(self):
+        """Export dates, child counts and generations to NumPy for bulk analytics (needs NumPy).
+
+        The arrays are a copy taken now; call again after changing the tree.
+        """
+        from familytree.analytics import Demographics
+        return Demographics(self.store, self.kinship())
+
+    def batch_query(self, query, person_ids=None, workers=None):
+        """Run a per-person query for many people at once on a process pool.
+
+        ``query`` is a name from ``familytree.parallel.QUERIES`` (e.g.
+        'extended_family') or a module-level ``query(store, person_id)``.
+        Returns one result per person in ``person_ids`` (default: everyone).
+        """
+        from familytree import parallel
+        return parallel.run(self.store, query, person_ids, workers)
+
+    def validate(self):
+        """Stream every integrity problem as ``(kind, person_ids, message)`` in one linear pass."""
+        from familytree.validate import validate
+        return validate(self.store)
+
+    def watch_integrity(self, callback=None):
+        """Check each later change as it happens; the returned Validator collects the problems."""
+        from familytree.validate import Validator
+        return Validator(self.store, callback)
+
+    def lineage(self):
+        """Descendant counts and lineage depths, built on first use and kept current afterwards."""
+        if self._lineage is None:
+            self._lineage = LineageIndex(self.store)
+        return self._lineage
+
+    def descendant_counts(self):
+        """Number of descendants of every person, indexed by ID; shared descendants count once."""
+        return self.lineage().descendant_counts()
+
+    def instrumentation(self):
+        """Call counts, latency histograms and rows visited per query; off until ``enable()`` is called."""
+        if self._instrumentation is None:
+            from familytree.instrument import Instrumentation
+            self._instrumentation = Instrumentation(self, Person)
+        return self._instrumentation
+
+    def lineage_summary(self, name):
+        """Descendants, living descendants and generations below ``name``, or None if unknown."""
+        person = self.find_person(name)
+        if person is None:
+            return None
+        lineage = self.lineage()
+        return {
+            'descendants': lineage.descendant_count(person.id),
+            'living_descendants': lineage.living_descendant_count(person.id),
+            'generations': lineage.lineage_depth(person.id),
+        }
@@ -0,0 +1,201 @@
+"""Name index: normalised exact lookup, prefix completion and fuzzy search.
+
+Names are normalised by stripping accents, casefolding and collapsing
+whitespace, so "Zoë  Müller" and "zoe muller" are the same key. Every key
+keeps a list of values (person IDs, or Person objects in Feature 1.py), so
+people who share a name are all found instead of one replacing the other.
+
+* Exact lookup is a dict probe on the normalised key.
+* Prefix search uses a sorted key table, the flattened form of a trie: the
+  keys under a prefix are one contiguous run found by bisection. Keys added
+  since the last merge wait in a small sorted side list, the same way
+  ``Adjacency`` buffers appends between compactions.
+* Fuzzy search uses a trigram inverted index. An edit changes at most three
+  trigrams, so a key within ``k`` edits shares all but ``3k`` of the query's
+  trigrams and must appear in one of its ``3k + 1`` rarest posting lists.
+  Further lists are counted while cheap to tighten the shared-trigram
+  bound, and only candidates that pass it are ranked by edit distance.
+"""
+
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import merge
+from math import isqrt
+
+MIN_PENDING = 256
+COUNT_RATIO = 2  # fuzzy search skips posting lists longer than this times the candidates
+
+
+def normalize(name):
+    """Casefold, strip accents and collapse runs of whitespace."""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(character for character in decomposed if not unicodedata.combining(character))
+    return ' '.join(stripped.casefold().split())
+
+
+def trigrams(key):
+    """Distinct three-character substrings of ``key`` padded with a space at both ends."""
+    padded = f' {key} '
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+def edit_distance(first, second, limit):
+    """Levenshtein distance, or ``limit + 1`` as soon as it must exceed ``limit``.
+
+    Shared prefixes and suffixes are dropped first, and only the diagonal band
+    of width ``2 * limit + 1`` is filled in.
+    """
+    too_far = limit + 1
+    if abs(len(first) - len(second)) > limit:
+        return too_far
+    start = 0
+    while start < len(first) and start < len(second) and first[start] == second[start]:
+        start += 1
+    end_first, end_second = len(first), len(second)
+    while end_first > start and end_second > start and first[end_first - 1] == second[end_second - 1]:
+        end_first -= 1
+        end_second -= 1
+    first, second = first[start:end_first], second[start:end_second]
+    if not first or not second:
+        return max(len(first), len(second))
+
+    previous = [column if column <= limit else too_far for column in range(len(second) + 1)]
+    for row, character in enumerate(first, 1):
+        current = [too_far] * (len(second) + 1)
+        if row <= limit:
+            current[0] = row
+        smallest = current[0]
+        for column in range(max(1, row - limit), min(len(second), row + limit) + 1):
+            value = previous[column - 1] + (character != second[column - 1])
+            if previous[column] + 1 < value:
+                value = previous[column] + 1
+            if current[column - 1] + 1 < value:
+                value = current[column - 1] + 1
+            if value > too_far:
+                value = too_far
+            current[column] = value
+            if value < smallest:
+                smallest = value
+        if smallest > limit:
+            return too_far
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    def __init__(self, store=None):
+        self.keys = []  # key ID -> normalised name
+        self.key_ids = {}  # normalised name -> key ID
+        self.values = []  # key ID -> list of values with that name
+        self.sorted_keys = []  # merged part of the prefix table
+        self.pending = []  # sorted keys added since the last merge
+        self.postings = {}  # trigram -> array of key IDs
+        self.store = store
+        if store is not None:
+            for person_id in store.ids():
+                self._add(store.name(person_id), person_id, pending=False)
+            self.sorted_keys = sorted(self.keys)
+            if hasattr(store, 'subscribe'):
+                store.subscribe(self._on_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+
+    def __len__(self):
+        """Number of distinct normalised names."""
+        return len(self.keys)
+
+    def _on_change(self, event, *args):
+        if event == 'add_person':
+            self.add(self.store.name(args[0]), args[0])
+
+    # Maintenance
+
+    def add(self, name, value):
+        """Index ``value`` (a person ID or object) under ``name``."""
+        self._add(name, value, pending=True)
+
+    def _add(self, name, value, pending):
+        key = normalize(name)
+        key_id = self.key_ids.get(key)
+        if key_id is not None:
+            self.values[key_id].append(value)
+            return
+        key_id = len(self.keys)
+        self.keys.append(key)
+        self.key_ids[key] = key_id
+        self.values.append([value])
+        for gram in trigrams(key):
+            postings = self.postings.get(gram)
+            if postings is None:
+                postings = self.postings[gram] = array('i')
+            postings.append(key_id)
+        if pending:
+            insort(self.pending, key)
+            if len(self.pending) > max(MIN_PENDING, isqrt(len(self.sorted_keys))):
+                self.sorted_keys = list(merge(self.sorted_keys, self.pending))
+                self.pending = []
+
+    # Queries
+
+    def exact(self, name):
+        """Values whose name matches ``name`` after normalisation (a new list, possibly empty)."""
+        key_id = self.key_ids.get(normalize(name))
+        return [] if key_id is None else list(self.values[key_id])
+
+    def prefix(self, prefix, limit=None):
+        """``(key, values)`` for names starting with ``prefix``, in alphabetical order."""
+        wanted = normalize(prefix)
+        if prefix[-1:].isspace() and wanted:
+            wanted += ' '  # "otto " should not match "ottoline"
+        found = []
+        for key in merge(self._run(self.sorted_keys, wanted), self._run(self.pending, wanted)):
+            if limit is not None and len(found) >= limit:
+                break
+            found.append((key, list(self.values[self.key_ids[key]])))
+        return found
+
+    @staticmethod
+    def _run(keys, wanted):
+        position = bisect_left(keys, wanted)
+        while position < len(keys) and keys[position].startswith(wanted):
+            yield keys[position]
+            position += 1
+
+    def fuzzy(self, name, limit=10, max_distance=2):
+        """Rank names within ``max_distance`` edits of ``name``: a list of ``(key, distance, values)``.
+
+        Short names allow fewer edits (at most a third of their trigrams), so
+        that every candidate still shares a trigram with the query.
+        """
+        key = normalize(name)
+        grams = trigrams(key)
+        distance_limit = min(max_distance, (len(grams) - 1) // 3)
+        # Candidates come from the 3k + 1 rarest of the query's trigrams. The
+        # other lists only count hits on those candidates (in C, via sets),
+        # and lists much longer than the candidate set are skipped: each one
+        # skipped lowers the shared count a candidate must reach by one.
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        required = 3 * distance_limit + 1
+        candidates = set()
+        for postings in lists[:required]:
+            candidates.update(postings)
+        counted = [postings for postings in lists if len(postings) <= COUNT_RATIO * len(candidates)]
+        shared = Counter()
+        for postings in counted:
+            shared.update(candidates.intersection(postings))
+        needed = len(grams) - 3 * distance_limit - (len(lists) - len(counted))
+        ranked = []
+        for key_id, count in shared.items():
+            candidate = self.keys[key_id]
+            if count < needed or abs(len(candidate) - len(key)) > distance_limit:
+                continue
+            distance = edit_distance(key, candidate, distance_limit)
+            if distance <= distance_limit:
+                ranked.append((distance, -count, candidate, key_id))
+        ranked.sort()
+        return [(candidate, distance, list(self.values[key_id]))
+                for distance, _, candidate, key_id in ranked[:limit]]
@@ -0,0 +1,119 @@
+"""Whole-tree batch queries on a process pool.
+
+The tree is written once into a shared memory block in snapshot format and
+every worker opens that block as a read-only ``Snapshot`` when it starts,
+so the graph is never pickled per task. People are grouped by connected
+component (a family stays in one chunk where it fits, which keeps each
+worker's reads local) and cut into chunks of equal size; every chunk's
+results are put back in the caller's order.
+
+A query is the name of one of ``QUERIES`` or any picklable module-level
+function ``query(store, person_id)`` that reads only through ``store``.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from familytree import relatives
+from familytree.snapshot import Snapshot, dump_snapshot
+from familytree.store import PersonStore, copy_store
+
+QUERIES = {
+    'cousins': relatives.first_cousin_ids,
+    'immediate_family': relatives.immediate_family_ids,
+    'extended_family': relatives.extended_family_ids,
+    'grandchildren': relatives.grandchildren_ids,
+    'descendant_count': relatives.descendant_count,
+}
+CHUNKS_PER_WORKER = 8  # several chunks each, so one slow chunk does not hold up the rest
+
+
+def components(store):
+    """Label every person with a representative of their connected component."""
+    parent = list(range(len(store)))
+
+    def find(person_id):
+        while parent[person_id] != person_id:
+            parent[person_id] = parent[parent[person_id]]
+            person_id = parent[person_id]
+        return person_id
+
+    for kind in ('child', 'sibling'):
+        offsets, targets = store.adjacency(kind)
+        for person_id in store.ids():
+            root = find(person_id)
+            for relative in targets[offsets[person_id]:offsets[person_id + 1]]:
+                other = find(relative)
+                if other != root:
+                    parent[other] = root
+    return [find(person_id) for person_id in store.ids()]
+
+
+def partition(store, person_ids, chunks):
+    """Split positions in ``person_ids`` into ``chunks`` lists, whole families together where possible."""
+    label = components(store)
+    order = sorted(range(len(person_ids)), key=lambda position: label[person_ids[position]])
+    size = -(-len(order) // chunks) if order else 1
+    return [order[start:start + size] for start in range(0, len(order), size)]
+
+
+def shared_snapshot(store):
+    """Write ``store`` into a new shared memory block; the caller closes and unlinks it."""
+    if not hasattr(store, 'name_table'):
+        copy = PersonStore()
+        copy_store(store, copy)
+        store = copy
+    buffer = io.BytesIO()
+    dump_snapshot(store, buffer)
+    data = buffer.getbuffer()
+    memory = shared_memory.SharedMemory(create=True, size=len(data))
+    memory.buf[:len(data)] = data
+    data.release()
+    return memory
+
+
+# Worker side: one shared snapshot per process, opened by the pool initializer
+
+_memory = None
+_store = None
+
+
+def _attach(name):
+    global _memory, _store
+    _memory = shared_memory.SharedMemory(name=name)
+    _store = Snapshot(_memory.buf)
+
+
+def _run(query, person_ids):
+    query = QUERIES.get(query, query)
+    return [query(_store, person_id) for person_id in person_ids]
+
+
+def run(store, query, person_ids=None, workers=None):
+    """Return ``[query(store, person_id) for person_id in person_ids]``, computed on ``workers`` processes.
+
+    ``person_ids`` defaults to everyone; ``workers`` defaults to the CPU
+    count. With one worker the query runs here, on ``store`` itself.
+    """
+    person_ids = list(store.ids() if person_ids is None else person_ids)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        query = QUERIES.get(query, query)
+        return [query(store, person_id) for person_id in person_ids]
+
+    results = [None] * len(person_ids)
+    memory = shared_snapshot(store)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(memory.name,)) as pool:
+            chunks = partition(store, person_ids, workers * CHUNKS_PER_WORKER)
+            futures = [(chunk, pool.submit(_run, query, [person_ids[position] for position in chunk]))
+                       for chunk in chunks]
+            for chunk, future in futures:
+                for position, result in zip(chunk, future.result()):
+                    results[position] = result
+    finally:
+        memory.close()
+        memory.unlink()
+    return results
@@ -0,0 +1,155 @@
+"""Ancestor counts and kinship coefficients that stay polynomial under pedigree collapse.
+
+Walking ``parents`` recursively visits every path, which is 2**n at n
+generations even when a few dozen people fill all of those slots. Here
+each generation is a set: a shared ancestor is expanded once per level, so
+``ancestors_by_generation`` costs O(generations * people in the pedigree).
+
+The kinship coefficient phi(a, b) is the chance that an allele drawn at
+random from ``a`` and one from ``b`` are identical by descent. It is the
+sum over Wright's paths through every common ancestor, computed with the
+usual recursion instead of listing the paths:
+
+    phi(a, a) = (1 + phi(father, mother)) / 2
+    phi(a, b) = (phi(father of a, b) + phi(mother of a, b)) / 2
+
+where ``a`` is the one who cannot be an ancestor of ``b`` (the one further
+from the founders). A missing parent is an unrelated founder and adds 0.
+Every pair is computed once and memoised, so a query costs at most the
+product of the two pedigrees' sizes. The inbreeding coefficient of a
+person is the kinship of their parents.
+"""
+
+from itertools import chain
+
+MAX_PARENTS = 2  # the recursion halves per parent; extra parents are ignored
+
+
+class Pedigree:
+    def __init__(self, store):
+        self.store = store
+        self._depth = {}  # person ID -> longest chain of parents above them
+        self._kinship = {}  # (lower ID, higher ID) -> kinship coefficient
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+
+    def _on_change(self, event, *args):
+        if event == 'add_child':
+            # A new parent changes depths and kinship below the child only,
+            # but working out who that is costs more than recomputing
+            self.clear()
+
+    def clear(self):
+        self._depth.clear()
+        self._kinship.clear()
+
+    # Ancestors
+
+    def ancestors_by_generation(self, person_id, generations=None):
+        """Yield the distinct ancestors in each generation (parents first) as tuples.
+
+        An ancestor reached along several lines appears once per generation
+        they occupy; the walk stops at the founders or after ``generations``.
+        """
+        parents = self.store.parents
+        level = [person_id]
+        generation = 0
+        while generations is None or generation < generations:
+            level = list(dict.fromkeys(chain.from_iterable(map(parents, level))))
+            if not level:
+                return
+            generation += 1
+            yield tuple(level)
+
+    def ancestor_counts(self, person_id, generations=None):
+        """``(generation, distinct ancestors, slots)`` per generation; slots is 2**generation."""
+        return [(generation, len(level), 2 ** generation)
+                for generation, level in enumerate(self.ancestors_by_generation(person_id, generations), 1)]
+
+    def distinct_ancestors(self, person_id):
+        """Everyone above ``person_id``, each once, however many lines lead to them."""
+        parents = self.store.parents
+        seen = set()
+        stack = [person_id]
+        while stack:
+            for parent_id in parents(stack.pop()):
+                if parent_id not in seen:
+                    seen.add(parent_id)
+                    stack.append(parent_id)
+        return seen
+
+    def depth(self, person_id):
+        """Length of the longest chain of recorded parents above ``person_id``."""
+        depth, parents = self._depth, self.store.parents
+        if person_id in depth:
+            return depth[person_id]
+        on_stack = {person_id}
+        stack = [(person_id, iter(parents(person_id)))]
+        while stack:
+            child_id, pending = stack[-1]
+            for parent_id in pending:
+                if parent_id not in depth:
+                    if parent_id in on_stack:
+                        raise ValueError(f"person {parent_id} is their own ancestor")
+                    on_stack.add(parent_id)
+                    stack.append((parent_id, iter(parents(parent_id))))
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(child_id)
+                depth[child_id] = max((depth[parent_id] + 1 for parent_id in parents(child_id)), default=0)
+        return depth[person_id]
+
+    # Coefficients
+
+    def kinship(self, person_id, other_id):
+        """Kinship coefficient of two people: 0.25 for full siblings or parent and child, 0.5 for oneself."""
+        memo, depth = self._kinship, self._depth
+        rows = {}  # person ID -> their first MAX_PARENTS parents, read once per query
+
+        def parents(person_id):
+            row = rows.get(person_id)
+            if row is None:
+                row = rows[person_id] = tuple(self.store.parents(person_id)[:MAX_PARENTS])
+            return row
+
+        key = _pair(person_id, other_id)
+        stack = [key]
+        while stack:
+            pair = stack[-1]
+            if pair in memo:
+                stack.pop()
+                continue
+            first, second = pair
+            if first == second:
+                needed = [_pair(*parents(first))] if len(parents(first)) == MAX_PARENTS else []
+            else:
+                first_depth = depth[first] if first in depth else self.depth(first)
+                if first_depth < (depth[second] if second in depth else self.depth(second)):
+                    first, second = second, first  # expand the one who cannot be the other's ancestor
+                needed = [_pair(parent_id, second) for parent_id in parents(first)]
+            total, waiting = 0.0, False
+            for dependency in needed:
+                value = memo.get(dependency)
+                if value is None:
+                    stack.append(dependency)
+                    waiting = True
+                else:
+                    total += value
+            if not waiting:
+                memo[pair] = (1 + total) / 2 if first == second else total / 2
+                stack.pop()
+        return memo[key]
+
+    def inbreeding(self, person_id):
+        """Inbreeding coefficient: the kinship of the person's two parents, 0 with fewer recorded."""
+        parents = self.store.parents(person_id)[:MAX_PARENTS]
+        return self.kinship(*parents) if len(parents) == MAX_PARENTS else 0.0
+
+
+def _pair(first, second):
+    return (first, second) if first <= second else (second, first)
@@ -0,0 +1,111 @@
+"""Per-person relative queries over any store.
+
+Each function takes ``(store, person_id)``, reads only through the store and
+returns a tuple. That one signature lets the query cache share results and
+lets the parallel runner pickle a query by name and call it in a worker.
+
+The ``*_many`` variants answer a whole list of people at once. Cousins and
+extended family depend only on a person's parents, so they are computed
+once per family unit (the same parents, in the same order) and every
+sibling in the unit gets that result minus themselves. Each parent's
+siblings are also looked up only once per batch, which helps when the
+parents of several units are themselves siblings.
+"""
+
+from itertools import chain
+
+from familytree import traversal
+
+
+def full_sibling_ids(store, person_id):
+    """Siblings with the same two (or more) recorded parents."""
+    parents = set(store.parents(person_id))
+    if len(parents) < 2:
+        return ()
+    return tuple(sibling_id for sibling_id in store.siblings(person_id)
+                 if set(store.parents(sibling_id)) == parents)
+
+
+def half_sibling_ids(store, person_id):
+    """Siblings sharing some recorded parents but not all of them."""
+    parents = set(store.parents(person_id))
+    half = []
+    for sibling_id in store.siblings(person_id):
+        sibling_parents = set(store.parents(sibling_id))
+        if sibling_parents & parents and sibling_parents != parents:
+            half.append(sibling_id)
+    return tuple(half)
+
+
+def first_cousin_ids(store, person_id):
+    if hasattr(store, 'cousin_ids'):
+        return tuple(store.cousin_ids(person_id))
+    return tuple(traversal.nth_cousins(person_id, 1, store.parents, store.children, store.siblings))
+
+
+def _family_units(store, person_ids, compute):
+    # Yield (person_id, result) with compute(parents, siblings_of) run once per
+    # distinct parent tuple; results include every member of the unit, so
+    # each person is taken out of their own
+    units, siblings = {}, {}
+
+    def siblings_of(person_id):
+        row = siblings.get(person_id)
+        if row is None:
+            row = siblings[person_id] = tuple(store.siblings(person_id))
+        return row
+
+    for person_id in person_ids:
+        parents = tuple(store.parents(person_id))
+        unit = units.get(parents)
+        if unit is None:
+            result = compute(parents, siblings_of)
+            unit = units[parents] = result, frozenset(result)
+        result, members = unit
+        if person_id in members:
+            result = tuple(relative for relative in result if relative != person_id)
+        yield person_id, result
+
+
+def _unit_cousins(store, parents, siblings_of):
+    collaterals = dict.fromkeys(chain.from_iterable(map(siblings_of, parents)))
+    return tuple(traversal.generation(collaterals, store.children, 1))
+
+
+def first_cousin_ids_many(store, person_ids):
+    """Yield ``(person_id, first_cousin_ids(store, person_id))`` for each of ``person_ids``, in order."""
+    return _family_units(store, person_ids,
+                         lambda parents, siblings_of: _unit_cousins(store, parents, siblings_of))
+
+
+def extended_family_ids_many(store, person_ids):
+    """Yield ``(person_id, extended_family_ids(store, person_id))`` for each of ``person_ids``, in order."""
+    def compute(parents, siblings_of):
+        extended_family = dict.fromkeys(parents)
+        extended_family.update(dict.fromkeys(traversal.generation(parents, siblings_of, 1)))
+        extended_family.update(dict.fromkeys(_unit_cousins(store, parents, siblings_of)))
+        return tuple(extended_family)
+    return _family_units(store, person_ids, compute)
+
+
+def immediate_family_ids(store, person_id):
+    return (tuple(store.parents(person_id)), tuple(store.siblings(person_id)), store.spouse(person_id),
+            tuple(store.children(person_id)))
+
+
+def extended_family_ids(store, person_id):
+    # Parents, their siblings and cousins
+    parents = store.parents(person_id)
+    extended_family = dict.fromkeys(parents)
+    extended_family.update(dict.fromkeys(traversal.generation(parents, store.siblings, 1)))
+    extended_family.update(dict.fromkeys(first_cousin_ids(store, person_id)))
+    extended_family.pop(person_id, None)
+    return tuple(extended_family)
+
+
+def grandchildren_ids(store, person_id):
+    return tuple(traversal.generation([person_id], store.children, 2))
+
+
+def descendant_count(store, person_id):
+    return sum(1 for _ in traversal.descendants(person_id, store.children))
@@ -0,0 +1,130 @@
+"""Whole-tree listings streamed as text, CSV or JSON Lines.
+
+Each report is a generator of row tuples read from the store one person at
+a time, so the first line is written straight away and memory does not
+grow with the tree. ``write`` formats rows as they arrive, ``start`` and
+``limit`` cut out one page, and ``pages`` splits a report for the
+interactive menu. Orderings are only offered where they can be produced
+without holding every row: 'most' for child counts makes one extra pass
+over the store per distinct count, and 'calendar' for birthdays reads the
+tree's birthday index.
+"""
+
+import csv
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+
+from familytree.relatives import extended_family_ids
+
+FORMATS = ('text', 'csv', 'jsonl')
+
+
+def children_counts(tree, order='id'):
+    """Yield ``(name, number of children)`` for everyone, in the order added or with the most children first."""
+    store = tree.store
+    if order == 'id':
+        for person_id in store.ids():
+            yield store.name(person_id), len(store.children(person_id))
+    elif order == 'most':
+        counts = {len(store.children(person_id)) for person_id in store.ids()}  # a handful of values
+        for count in sorted(counts, reverse=True):
+            for person_id in store.ids():
+                if len(store.children(person_id)) == count:
+                    yield store.name(person_id), count
+    else:
+        raise ValueError(f"Unknown order for children counts: {order!r}")
+
+
+def birthdays(tree, order='id'):
+    """Yield ``(name, birth date)`` for everyone with one, in the order added or by day of the year."""
+    store = tree.store
+    if order == 'id':
+        for person_id in store.ids():
+            birth_date = store.birth_date(person_id)
+            if birth_date:
+                yield store.name(person_id), birth_date
+    elif order == 'calendar':
+        for _, person_ids in tree.birthdays().by_day():
+            for person_id in person_ids:
+                yield store.name(person_id), store.birth_date(person_id)
+    else:
+        raise ValueError(f"Unknown order for birthdays: {order!r}")
+
+
+def calendar(tree):
+    """Yield ``(day, names)`` for every day with a birthday, from January to December."""
+    store = tree.store
+    for (month, day), person_ids in tree.birthdays().by_day():
+        yield datetime(2000, month, day).strftime("%B %d"), [store.name(person_id) for person_id in person_ids]
+
+
+def extended_family(tree, names=None):
+    """Yield ``(name, relative)`` for the extended family of each of ``names`` (default everyone)."""
+    store = tree.store
+    if names is None:
+        people = store.ids()
+    else:
+        people = (person.id for person in map(tree.find_person, names) if person)
+    for person_id in people:
+        name = store.name(person_id)
+        for relative_id in extended_family_ids(store, person_id):
+            yield name, store.name(relative_id)
+
+
+# name -> (rows, column names, text template)
+REPORTS = {
+    'children': (children_counts, ('name', 'children'), "{0} has {1} children."),
+    'birthdays': (birthdays, ('name', 'birth_date'), "{0}: {1:%B %d}"),
+    'calendar': (calendar, ('day', 'names'), "{0}: {1}"),
+    'extended': (extended_family, ('name', 'relative'), "{0}: {1}"),
+}
+
+
+def _text_value(value):
+    return ', '.join(value) if isinstance(value, list) else value
+
+
+def write(tree, report, out=sys.stdout, format='text', start=0, limit=None, **options):
+    """Stream the named report on ``tree`` to ``out``; returns the number of rows written.
+
+    ``start`` skips that many rows and ``limit`` stops after that many, so
+    page n of size k is ``start=(n - 1) * k, limit=k``. Other keyword
+    arguments go to the report, e.g. ``order='most'`` for 'children'.
+    """
+    rows = REPORTS[report][0](tree, **options)
+    return write_rows(report, islice(rows, start, None if limit is None else start + limit), out, format)
+
+
+def write_rows(report, rows, out=sys.stdout, format='text'):
+    """Format ``rows`` of the named report as they are produced (CSV starts with a header)."""
+    _, columns, template = REPORTS[report]
+    written = 0
+    if format == 'text':
+        for row in rows:
+            out.write(template.format(*map(_text_value, row)) + '\n')
+            written += 1
+    elif format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(['; '.join(value) if isinstance(value, list) else value for value in row])
+            written += 1
+    elif format == 'jsonl':
+        for row in rows:
+            out.write(json.dumps(dict(zip(columns, row)), default=str) + '\n')
+            written += 1
+    else:
+        raise ValueError(f"Unknown report format: {format!r}")
+    return written
+
+
+def pages(rows, page_size):
+    """Yield ``(page, more)``: lists of up to ``page_size`` rows, and whether another page follows."""
+    rows = iter(rows)
+    page = list(islice(rows, page_size))
+    while page:
+        following = list(islice(rows, page_size))
+        yield page, bool(following)
+        page = following
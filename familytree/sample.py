@@ -0,0 +1,29 @@
+"""The example family used by the Feature 3 menu, built on request."""
+
+from datetime import datetime
+
+
+def sample_tree():
+    """A new FamilyTree holding the example family (integrating both partners' branches)."""
+    from familytree.model import FamilyTree
+
+    family_tree = FamilyTree()
+
+    # Partner A's branch
+    otto = family_tree.add_person("Otto Emmersohn", birth_date=datetime(1980, 3, 15).date())
+    emmerlia = family_tree.add_person("Cornelia Emmersohn", birth_date=datetime(1985, 6, 20).date())
+
+    anna = family_tree.add_person("Anna Emmersohn", birth_date=datetime(2010, 5, 15).date())
+    otto.add_child(anna)
+    emmerlia.add_child(anna)
+
+    # Partner B's branch
+    karanbir = family_tree.add_person("Karanbir Thakuri", birth_date=datetime(1935, 10, 10).date(),
+                                      death_date=datetime(2005, 5, 25).date())
+    laxmi = family_tree.add_person("Laxmi Thakuri", birth_date=datetime(1938, 2, 5).date(),
+                                   death_date=datetime(2010, 9, 10).date())
+
+    # Adding spouses and children
+    karanbir.spouse = laxmi
+    laxmi.add_child(otto)  # Laxmi is Otto's grandparent
+    return family_tree
@@ -0,0 +1,368 @@
+"""Local HTTP/JSON query service over a FamilyTree, built on asyncio streams.
+
+Reads never touch the tree that is being written. They are answered from
+the current published snapshot: a read-only FamilyTree over a memory-mapped
+``Snapshot`` file. Any number of connections are served concurrently by the
+event loop, and each request runs start to finish against one snapshot.
+
+Writes go through a queue to a single writer task. It applies everything
+queued so far to the master tree in order, writes one new snapshot for the
+whole batch and builds its indexes off the event loop, swaps it in, and
+only then answers the waiting requests. A reader therefore sees either
+none or all of a batch, and never waits for an index to be built.
+
+Endpoints (GET parameters go in the query string, POST bodies are JSON):
+
+    GET  /health                            people count and snapshot version
+    GET  /person?name=...                   dates, spouse, parents, children, siblings
+    GET  /siblings?name=...                 also /cousins, /immediate-family,
+                                            /extended-family
+    GET  /birthdays                         the sorted birthday calendar
+    GET  /birthdays/upcoming?days=14&start=YYYY-MM-DD
+    GET  /statistics                        averages, median, fertility by generation
+    POST /batch         {"requests": [{"query": "cousins", "name": "..."}, ...]}
+    POST /people        {"name": ..., "birth_date": "YYYY-MM-DD", "death_date": ...}
+    POST /relationships {"edges": [["child", "Parent Name", "Child Name"], ...]}
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from familytree.snapshot import write_snapshot
+from familytree.store import PersonStore, copy_store
+
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _date(value):
+    return date.fromisoformat(value) if value else None
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# Read queries: each takes the snapshot tree and a dict of parameters
+
+def _person(tree, parameters):
+    name = parameters.get('name')
+    if not name:
+        raise RequestError(400, "missing 'name'")
+    person = tree.find_person(name)
+    if person is None:
+        raise RequestError(404, tree.not_found_message(name))
+    return person
+
+
+def query_person(tree, parameters):
+    person = _person(tree, parameters)
+    spouse = person.spouse
+    return {
+        'id': person.id,
+        'name': person.name,
+        'birth_date': _iso(person.birth_date),
+        'death_date': _iso(person.death_date),
+        'spouse': spouse.name if spouse else None,
+        'parents': [parent.name for parent in person.parents],
+        'children': [child.name for child in person.children],
+        'siblings': [sibling.name for sibling in person.siblings],
+    }
+
+
+def query_siblings(tree, parameters):
+    return [sibling.name for sibling in _person(tree, parameters).get_siblings()]
+
+
+def query_cousins(tree, parameters):
+    return [cousin.name for cousin in _person(tree, parameters).get_cousins()]
+
+
+def query_immediate_family(tree, parameters):
+    return _person(tree, parameters).get_immediate_family()
+
+
+def query_extended_family(tree, parameters):
+    return _person(tree, parameters).get_extended_family()
+
+
+def query_birthdays(tree, parameters):
+    return [{'date': day, 'names': names} for day, names in tree.get_sorted_birthdays()]
+
+
+def query_upcoming_birthdays(tree, parameters):
+    try:
+        days = int(parameters.get('days', 14))
+        start = _date(parameters.get('start'))
+    except ValueError as error:
+        raise RequestError(400, str(error))
+    return [{'date': day.isoformat(), 'name': name} for day, name in tree.upcoming_birthdays(days, start)]
+
+
+def query_statistics(tree, parameters):
+    return {
+        'people': len(tree.store),
+        'average_age_at_death': tree.average_age_at_death(),
+        'median_age_at_death': tree.median_age_at_death(),
+        'average_number_of_children': tree.average_number_of_children(),
+        'fertility_by_generation': {str(generation): value
+                                    for generation, value in tree.fertility_by_generation().items()},
+    }
+
+
+QUERIES = {
+    'person': query_person,
+    'siblings': query_siblings,
+    'cousins': query_cousins,
+    'immediate-family': query_immediate_family,
+    'extended-family': query_extended_family,
+    'birthdays': query_birthdays,
+    'birthdays/upcoming': query_upcoming_birthdays,
+    'statistics': query_statistics,
+}
+
+
+class TreeService:
+    """Serve ``tree`` over HTTP; see the module docstring.
+
+    Unless ``tree`` is backed by a PersonStore, the service writes to an
+    in-memory copy, so changes are not saved back to a snapshot or database.
+    """
+
+    def __init__(self, tree, directory=None):
+        if not isinstance(tree.store, PersonStore):
+            # Snapshots are read-only and only a PersonStore can be written
+            # out as one, so the writer works on its own in-memory copy
+            store = PersonStore()
+            copy_store(tree.store, store)
+            tree = type(tree)(store)
+        self.tree = tree
+        self._temporary = None
+        if directory is None:
+            self._temporary = tempfile.TemporaryDirectory(prefix='familytree-')
+            directory = self._temporary.name
+        self.directory = directory
+        self.version = 0
+        self.snapshot = None  # read-only FamilyTree over the current snapshot
+        self._path = None
+        self._writes = None
+        self._writer = None
+        self._server = None
+
+    # Snapshots
+
+    def _write_snapshot(self):
+        """Write and open the next snapshot with its read indexes built; runs in the executor."""
+        path = os.path.join(self.directory, f'tree-{self.version + 1}.snap')
+        write_snapshot(self.tree.store, path)
+        tree = type(self.tree).open_snapshot(path)
+        try:
+            tree.name_index()
+            tree.birthdays()
+            tree.statistics()  # builds the kinship index too
+        except Exception:
+            tree.store.close()
+            os.remove(path)
+            raise
+        return path, tree
+
+    def _publish(self, path, tree):
+        # Requests run to completion without awaiting, so no request can
+        # still be using the old snapshot when it is swapped out here.
+        old, old_path = self.snapshot, self._path
+        self.snapshot = tree
+        self._path = path
+        self.version += 1
+        if old is not None:
+            old.store.close()
+            os.remove(old_path)
+
+    # Writes
+
+    async def write(self, operation):
+        """Queue ``operation(tree)`` for the writer; returns its result once published."""
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operation, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._writes.get()]
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            results = []
+            for operation, future in batch:
+                try:
+                    results.append((future, operation(self.tree), None))
+                except Exception as error:  # reported to that request only
+                    results.append((future, None, error))
+            try:
+                self._publish(*await loop.run_in_executor(None, self._write_snapshot))
+            except Exception as error:
+                # Fail this batch but keep the writer alive; its changes are
+                # in the master tree and go out with the next snapshot
+                failure = RequestError(500, f"could not publish snapshot: {type(error).__name__}: {error}")
+                results = [(future, None, failure) for future, _, _ in results]
+            for future, result, error in results:
+                if not future.done():
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+
+    def _add_person(self, body):
+        name = body.get('name')
+        if not name or not isinstance(name, str):
+            raise RequestError(400, "missing 'name'")
+        birth_date, death_date = _date(body.get('birth_date')), _date(body.get('death_date'))
+        return lambda tree: {'id': tree.add_person(name, birth_date, death_date).id}
+
+    def _add_relationships(self, body):
+        edges = body.get('edges', ())
+        if not isinstance(edges, list) or not all(isinstance(edge, list) and len(edge) == 3 for edge in edges):
+            raise RequestError(400, "each edge is [kind, person, relative]")
+        edges = [tuple(edge) for edge in edges]
+
+        def operation(tree):
+            tree.add_relationships(edges)
+            return {'edges': len(edges)}
+        return operation
+
+    # HTTP
+
+    async def handle(self, method, path, parameters, body):
+        """Answer one request; returns a JSON-serialisable value or raises RequestError."""
+        route = path.strip('/')
+        if method == 'GET':
+            if route == 'health':
+                return {'people': len(self.snapshot.store), 'version': self.version}
+            query = QUERIES.get(route)
+            if query is None:
+                raise RequestError(404, f"unknown endpoint /{route}")
+            return query(self.snapshot, parameters)
+        if method != 'POST':
+            raise RequestError(405, f"{method} is not supported")
+        try:
+            body = json.loads(body or b'{}')
+        except ValueError as error:
+            raise RequestError(400, f"invalid JSON: {error}")
+        if not isinstance(body, dict):
+            raise RequestError(400, "the request body must be a JSON object")
+        if route == 'batch':
+            return self._batch(body)
+        try:
+            if route == 'people':
+                operation = self._add_person(body)
+            elif route == 'relationships':
+                operation = self._add_relationships(body)
+            else:
+                raise RequestError(404, f"unknown endpoint /{route}")
+            return await self.write(operation)
+        except KeyError as error:
+            raise RequestError(404, f"No person found with name {error.args[0]}.")
+        except ValueError as error:
+            raise RequestError(400, str(error))
+
+    def _batch(self, body):
+        # Every lookup in a batch is answered from the same snapshot
+        tree, results = self.snapshot, []
+        requests = body.get('requests', ())
+        if not isinstance(requests, list):
+            raise RequestError(400, "'requests' must be a list")
+        for request in requests:
+            try:
+                if not isinstance(request, dict):
+                    raise RequestError(400, "each request must be a JSON object")
+                query = QUERIES.get(request.get('query', ''))
+                if query is None:
+                    raise RequestError(404, f"unknown query {request.get('query')!r}")
+                results.append({'status': 200, 'result': query(tree, request)})
+            except RequestError as error:
+                results.append({'status': error.status, 'error': str(error)})
+        return {'version': self.version, 'results': results}
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = None
+                if length > MAX_BODY:
+                    status, payload = 413, {'error': 'request body too large'}
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    url = urlsplit(target)
+                    parameters = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                    try:
+                        status, payload = 200, await self.handle(method, url.path, parameters, body)
+                    except RequestError as error:
+                        status, payload = error.status, {'error': str(error)}
+                    except Exception as error:
+                        status, payload = 500, {'error': f"{type(error).__name__}: {error}"}
+                data = json.dumps(payload).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close' and body is not None
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                             + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8080):
+        self._publish(*await asyncio.get_running_loop().run_in_executor(None, self._write_snapshot))
+        self._writes = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._connection, host, port)
+        return self._server
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._writer.cancel()
+        self.snapshot.store.close()
+        if self._temporary is not None:
+            self._temporary.cleanup()
+
+
+def serve(tree, host='127.0.0.1', port=8080):
+    """Run the service for ``tree`` until interrupted."""
+    async def run():
+        service = TreeService(tree)
+        server = await service.start(host, port)
+        print(f"Serving {len(tree.store)} people on http://{host}:{port}/")
+        try:
+            await server.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
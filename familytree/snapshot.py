@@ -0,0 +1,216 @@
+"""Versioned binary snapshots of a PersonStore that open with mmap.
+
+Layout (native byte order, every section 8-byte aligned):
+
+    header      magic, format version, byte order, person count
+    sections    (offset, item count) for each entry of SECTIONS
+    names       UTF-8 string table
+    name_offsets  uint32 per person + 1, into names
+    index       open-addressing name index (slot -> person ID + 1)
+    records     fixed-width uint32 records: name hash, birth ordinal,
+                death ordinal, spouse ID + 1
+    *_offsets / *_targets   CSR adjacency for parents, children, siblings
+
+A ``Snapshot`` answers the same read calls as ``PersonStore`` straight from
+the mapped bytes, so opening one costs a header read regardless of size.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from familytree.store import NO_PERSON, PersonStore, copy_store, derive_siblings, ordinal_to_date, probe_name_index
+
+MAGIC = b'FTSNAP\x00\x00'
+VERSION = 1
+BYTE_ORDERS = {'little': 1, 'big': 2}
+SECTIONS = (
+    ('names', 'B'),
+    ('name_offsets', 'I'),
+    ('index', 'i'),
+    ('records', 'I'),
+    ('parent_offsets', 'i'),
+    ('parent_targets', 'i'),
+    ('child_offsets', 'i'),
+    ('child_targets', 'i'),
+    ('sibling_offsets', 'i'),
+    ('sibling_targets', 'i'),
+)
+HEADER = struct.Struct('<8sIIQ')
+SECTION_TABLE = struct.Struct('<' + 'QQ' * len(SECTIONS))
+
+RECORD_FIELDS = 4
+HASH, BIRTH, DEATH, SPOUSE = range(RECORD_FIELDS)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def write_snapshot(store, path):
+    """Write ``store`` to ``path`` atomically."""
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as handle:
+        dump_snapshot(store, handle)
+    os.replace(temporary, path)
+
+
+def dump_snapshot(store, handle):
+    """Write the snapshot bytes of ``store`` to a seekable binary ``handle``.
+
+    The columns are taken from a PersonStore; any other store (a snapshot,
+    SQLite, a working set) is copied into a temporary one first.
+    """
+    if not isinstance(store, PersonStore):
+        copy = PersonStore()
+        copy_store(store, copy)
+        store = copy
+    store.compact()
+    names, name_offsets, name_hashes, index = store.name_table()
+    count = len(store)
+    records = array('I', bytes(4 * RECORD_FIELDS * count))
+    records[HASH::RECORD_FIELDS] = name_hashes
+    records[BIRTH::RECORD_FIELDS] = array('I', store.birth_ordinals)
+    records[DEATH::RECORD_FIELDS] = array('I', store.death_ordinals)
+    records[SPOUSE::RECORD_FIELDS] = array('I', map((1).__add__, store.spouses))
+    columns = {
+        'names': names,
+        'name_offsets': name_offsets,
+        'index': index,
+        'records': records,
+    }
+    for kind, adjacency in (('parent', store.parent_adjacency), ('child', store.child_adjacency),
+                            ('sibling', store.sibling_adjacency)):
+        columns[f'{kind}_offsets'] = adjacency.offsets
+        columns[f'{kind}_targets'] = adjacency.targets
+
+    position = HEADER.size + SECTION_TABLE.size
+    table = []
+    handle.write(bytes(position))
+    for name, _ in SECTIONS:
+        column = columns[name]
+        padding = -position % 8
+        handle.write(bytes(padding))
+        position += padding
+        table.extend((position, len(column)))
+        handle.write(column)
+        position += len(column) * getattr(column, 'itemsize', 1)
+    handle.seek(0)
+    handle.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDERS[sys.byteorder], count))
+    handle.write(SECTION_TABLE.pack(*table))
+    handle.seek(position)
+
+
+class Snapshot:
+    """Read-only, zero-copy store over snapshot bytes (an mmap or shared memory)."""
+
+    def __init__(self, buffer, closer=None):
+        self._closer = closer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size + SECTION_TABLE.size:
+            raise SnapshotError("file is too short to be a snapshot")
+        magic, version, byte_order, count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise SnapshotError("not a family tree snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"unsupported snapshot version {version}")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise SnapshotError("snapshot was written on a machine with a different byte order")
+        table = SECTION_TABLE.unpack_from(view, HEADER.size)
+        self._views = [view]
+        sections = {}
+        for position, (name, typecode) in enumerate(SECTIONS):
+            offset, length = table[2 * position], table[2 * position + 1]
+            size = struct.calcsize(typecode)
+            section = view[offset:offset + length * size].cast(typecode)
+            self._views.append(section)
+            sections[name] = section
+        self._count = count
+        self._names = sections['names']
+        self._name_offsets = sections['name_offsets']
+        self._index = sections['index']
+        self._records = sections['records']
+        self._hashes = self._records[HASH::RECORD_FIELDS]
+        self._views.append(self._hashes)
+        self._adjacency = {
+            kind: (sections[f'{kind}_offsets'], sections[f'{kind}_targets'])
+            for kind in ('parent', 'child', 'sibling')
+        }
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, closer=mapped.close)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._closer:
+            self._closer()
+            self._closer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def ids(self):
+        return range(self._count)
+
+    def find(self, name):
+        for person_id in probe_name_index(name, self._index, self._hashes, self._names, self._name_offsets):
+            return person_id
+        return NO_PERSON
+
+    def find_all(self, name):
+        return sorted(probe_name_index(name, self._index, self._hashes, self._names, self._name_offsets))
+
+    def name(self, person_id):
+        offsets = self._name_offsets
+        return bytes(self._names[offsets[person_id]:offsets[person_id + 1]]).decode('utf-8')
+
+    @property
+    def birth_ordinals(self):
+        return self._records[BIRTH::RECORD_FIELDS]
+
+    @property
+    def death_ordinals(self):
+        return self._records[DEATH::RECORD_FIELDS]
+
+    def birth_date(self, person_id):
+        return ordinal_to_date(self._records[person_id * RECORD_FIELDS + BIRTH])
+
+    def death_date(self, person_id):
+        return ordinal_to_date(self._records[person_id * RECORD_FIELDS + DEATH])
+
+    def spouse(self, person_id):
+        return self._records[person_id * RECORD_FIELDS + SPOUSE] - 1
+
+    def adjacency(self, kind):
+        """Return the ``(offsets, targets)`` CSR views for 'parent', 'child' or 'sibling'."""
+        return self._adjacency[kind]
+
+    def _row(self, kind, person_id):
+        offsets, targets = self._adjacency[kind]
+        return targets[offsets[person_id]:offsets[person_id + 1]]
+
+    def parents(self, person_id):
+        return self._row('parent', person_id)
+
+    def children(self, person_id):
+        return self._row('child', person_id)
+
+    def siblings(self, person_id):
+        return derive_siblings(person_id, self._row('parent', person_id), self.children,
+                               self._row('sibling', person_id))
+
+    def recorded_siblings(self, person_id):
+        return self._row('sibling', person_id)
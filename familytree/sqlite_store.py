@@ -0,0 +1,393 @@
+"""Persistent SQLite backend with the same interface as PersonStore.
+
+People are rows of one table; parent/child and sibling links are edge
+tables indexed in both directions. The database runs in WAL mode and
+writes are grouped into transactions of ``batch_size`` statements (bulk
+calls use one transaction each), so imports do not pay for a sync per row.
+Call ``commit`` or ``close`` to make the last batch durable.
+
+Besides the PersonStore read/write calls, the store answers multi-hop
+questions itself with recursive CTEs (``descendant_ids``,
+``ancestor_ids``, ``generation_ids`` and ``cousin_ids``), so FamilyTree
+can push those queries down instead of walking the graph one row at a
+time from Python.
+"""
+
+import sqlite3
+from array import array
+
+from familytree.store import NO_PERSON, date_to_ordinal, derive_siblings, ordinal_to_date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS person (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    birth INTEGER NOT NULL DEFAULT 0,
+    death INTEGER NOT NULL DEFAULT 0,
+    spouse INTEGER NOT NULL DEFAULT -1
+);
+CREATE INDEX IF NOT EXISTS person_name ON person (name, id);
+CREATE TABLE IF NOT EXISTS parent_child (
+    parent INTEGER NOT NULL,
+    child INTEGER NOT NULL,
+    UNIQUE (parent, child)
+);
+CREATE INDEX IF NOT EXISTS parent_child_child ON parent_child (child, parent);
+CREATE TABLE IF NOT EXISTS sibling (
+    person INTEGER NOT NULL,
+    sibling INTEGER NOT NULL,
+    UNIQUE (person, sibling)
+);
+"""
+
+# Rows keep insertion order (rowid), like the rows of a PersonStore.
+EDGE_QUERIES = {
+    'parent': "SELECT parent FROM parent_child WHERE child = ? ORDER BY rowid",
+    'child': "SELECT child FROM parent_child WHERE parent = ? ORDER BY rowid",
+    'sibling': "SELECT sibling FROM sibling WHERE person = ? ORDER BY rowid",
+}
+EDGE_TABLES = {
+    'parent': "SELECT child, parent FROM parent_child ORDER BY child, rowid",
+    'child': "SELECT parent, child FROM parent_child ORDER BY parent, rowid",
+    'sibling': "SELECT person, sibling FROM sibling ORDER BY person, rowid",
+}
+# Every edge of one person, for loading a whole record in one query
+RECORD_EDGES = """
+SELECT 0 AS kind, parent, rowid AS position FROM parent_child WHERE child = ?1
+UNION ALL
+SELECT 1, child, rowid FROM parent_child WHERE parent = ?1
+UNION ALL
+SELECT 2, sibling, rowid FROM sibling WHERE person = ?1
+ORDER BY kind, position
+"""
+
+# (id, depth) pairs reachable by following ``step`` from the start person;
+# UNION drops repeated pairs, so pedigree collapse cannot blow up the walk.
+WALK = """
+WITH RECURSIVE walk(id, depth) AS (
+    SELECT ?, 0
+    UNION
+    SELECT {next}, walk.depth + 1 FROM parent_child JOIN walk ON {previous} = walk.id
+    WHERE walk.depth < ?
+)
+"""
+DOWN = WALK.format(next='parent_child.child', previous='parent_child.parent')
+UP = WALK.format(next='parent_child.parent', previous='parent_child.child')
+
+COUSINS = """
+WITH RECURSIVE up(id, depth) AS (
+    SELECT :person, 0
+    UNION
+    SELECT parent_child.parent, up.depth + 1 FROM parent_child JOIN up ON parent_child.child = up.id
+    WHERE up.depth < :n
+),
+collateral(id) AS (
+    SELECT sibling.sibling FROM sibling JOIN up ON sibling.person = up.id WHERE up.depth = :n
+    UNION
+    SELECT brood.child FROM up
+    JOIN parent_child AS own ON own.child = up.id
+    JOIN parent_child AS brood ON brood.parent = own.parent
+    WHERE up.depth = :n AND brood.child != up.id
+),
+down(id, depth) AS (
+    SELECT id, 0 FROM collateral
+    UNION
+    SELECT parent_child.child, down.depth + 1 FROM parent_child JOIN down ON parent_child.parent = down.id
+    WHERE down.depth < :down
+)
+SELECT DISTINCT id FROM down WHERE depth = :down AND id != :person
+"""
+
+
+class SQLiteStore:
+    def __init__(self, path, batch_size=10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._count = self._connection.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM person").fetchone()[0]
+        self._writes = 0
+        self.listeners = []
+
+    def close(self):
+        if self._connection is not None:
+            self.commit()
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Transactions
+
+    def commit(self):
+        if self._connection.in_transaction:
+            self._connection.execute("COMMIT")
+        self._writes = 0
+
+    def _write(self, sql, parameters=(), many=False):
+        connection = self._connection
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+        cursor = connection.executemany(sql, parameters) if many else connection.execute(sql, parameters)
+        self._writes += 1
+        if self._writes >= self.batch_size:
+            self.commit()
+        return cursor
+
+    def _column(self, sql, parameters=()):
+        return [row[0] for row in self._connection.execute(sql, parameters)]
+
+    def _value(self, sql, parameters):
+        row = self._connection.execute(sql, parameters).fetchone()
+        if row is None:
+            raise IndexError("person ID out of range")
+        return row[0]
+
+    # People
+
+    def __len__(self):
+        return self._count
+
+    def ids(self):
+        return range(self._count)
+
+    def add(self, name, birth_date=None, death_date=None):
+        """Add a person and return their ID. Duplicate names are allowed."""
+        person_id = self._count
+        self._write("INSERT INTO person (id, name, birth, death) VALUES (?, ?, ?, ?)",
+                    (person_id, name, date_to_ordinal(birth_date), date_to_ordinal(death_date)))
+        self._count += 1
+        if self.listeners:
+            self._notify('add_person', person_id)
+        return person_id
+
+    def add_many(self, rows):
+        """Add (name, birth_date, death_date) rows in one transaction and return the range of new IDs."""
+        first = self._count
+        self._write("INSERT INTO person (id, name, birth, death) VALUES (?, ?, ?, ?)",
+                    ((person_id, name, date_to_ordinal(birth_date), date_to_ordinal(death_date))
+                     for person_id, (name, birth_date, death_date) in enumerate(rows, first)), many=True)
+        self._count = self._connection.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM person").fetchone()[0]
+        self.commit()
+        if self.listeners:
+            for person_id in range(first, self._count):
+                self._notify('add_person', person_id)
+        return range(first, self._count)
+
+    def find(self, name):
+        """Return the ID of the first person called ``name``, or NO_PERSON."""
+        row = self._connection.execute("SELECT id FROM person WHERE name = ? ORDER BY id LIMIT 1",
+                                       (name,)).fetchone()
+        return row[0] if row else NO_PERSON
+
+    def find_all(self, name):
+        return self._column("SELECT id FROM person WHERE name = ? ORDER BY id", (name,))
+
+    def name(self, person_id):
+        return self._value("SELECT name FROM person WHERE id = ?", (person_id,))
+
+    def birth_date(self, person_id):
+        return ordinal_to_date(self._value("SELECT birth FROM person WHERE id = ?", (person_id,)))
+
+    def death_date(self, person_id):
+        return ordinal_to_date(self._value("SELECT death FROM person WHERE id = ?", (person_id,)))
+
+    @property
+    def birth_ordinals(self):
+        return array('i', self._column("SELECT birth FROM person ORDER BY id"))
+
+    @property
+    def death_ordinals(self):
+        return array('i', self._column("SELECT death FROM person ORDER BY id"))
+
+    def set_birth_date(self, person_id, value):
+        old = self.birth_date(person_id)
+        self._write("UPDATE person SET birth = ? WHERE id = ?", (date_to_ordinal(value), person_id))
+        if self.listeners:
+            self._notify('set_birth_date', person_id, old)
+
+    def set_death_date(self, person_id, value):
+        old = self.death_date(person_id)
+        self._write("UPDATE person SET death = ? WHERE id = ?", (date_to_ordinal(value), person_id))
+        if self.listeners:
+            self._notify('set_death_date', person_id, old)
+
+    # Relationships
+
+    def parents(self, person_id):
+        return self._column(EDGE_QUERIES['parent'], (person_id,))
+
+    def children(self, person_id):
+        return self._column(EDGE_QUERIES['child'], (person_id,))
+
+    def siblings(self, person_id):
+        return derive_siblings(person_id, self.parents(person_id), self.children,
+                               self.recorded_siblings(person_id))
+
+    def recorded_siblings(self, person_id):
+        return self._column(EDGE_QUERIES['sibling'], (person_id,))
+
+    def person_record(self, person_id):
+        """``(name, birth date, death date, spouse, parents, children, recorded siblings)`` in two queries."""
+        row = self._connection.execute("SELECT name, birth, death, spouse FROM person WHERE id = ?",
+                                       (person_id,)).fetchone()
+        if row is None:
+            raise IndexError("person ID out of range")
+        rows = ([], [], [])
+        for kind, other, _ in self._connection.execute(RECORD_EDGES, (person_id,)):
+            rows[kind].append(other)
+        name, birth, death, spouse = row
+        return (name, ordinal_to_date(birth), ordinal_to_date(death), spouse,
+                tuple(rows[0]), tuple(rows[1]), tuple(rows[2]))
+
+    def spouse(self, person_id):
+        return self._value("SELECT spouse FROM person WHERE id = ?", (person_id,))
+
+    def set_spouse(self, person_id, spouse_id):
+        """Marry the two people (``NO_PERSON`` unsets); earlier spouses of either are unlinked."""
+        old = self.spouse(person_id)
+        if old != NO_PERSON and old != spouse_id:
+            self._write("UPDATE person SET spouse = ? WHERE id = ? AND spouse = ?", (NO_PERSON, old, person_id))
+        jilted = NO_PERSON
+        if spouse_id != NO_PERSON:
+            other = self.spouse(spouse_id)
+            if other not in (NO_PERSON, person_id) and self._write(
+                    "UPDATE person SET spouse = ? WHERE id = ? AND spouse = ?",
+                    (NO_PERSON, other, spouse_id)).rowcount:
+                jilted = other
+            self._write("UPDATE person SET spouse = ? WHERE id = ?", (person_id, spouse_id))
+        self._write("UPDATE person SET spouse = ? WHERE id = ?", (spouse_id, person_id))
+        if self.listeners:
+            if jilted != NO_PERSON:
+                self._notify('set_spouse', jilted, NO_PERSON, spouse_id)
+            self._notify('set_spouse', person_id, spouse_id, old)
+
+    def add_child(self, parent_id, child_id):
+        """Record ``child_id`` as a child of ``parent_id``. Returns False if already known."""
+        cursor = self._write("INSERT OR IGNORE INTO parent_child (parent, child) VALUES (?, ?)",
+                             (parent_id, child_id))
+        if not cursor.rowcount:
+            return False
+        if self.listeners:
+            self._notify('add_child', parent_id, child_id)
+        return True
+
+    def share_parent(self, person_id, other_id):
+        return bool(self._value("SELECT COUNT(*) FROM parent_child AS a JOIN parent_child AS b "
+                                "ON a.parent = b.parent WHERE a.child = ? AND b.child = ?", (person_id, other_id)))
+
+    def add_sibling(self, person_id, sibling_id):
+        """Record a sibling link; returns False if they are already siblings (linked or sharing a parent)."""
+        if person_id == sibling_id or self.share_parent(person_id, sibling_id):
+            return False
+        cursor = self._write("INSERT OR IGNORE INTO sibling (person, sibling) VALUES (?, ?), (?, ?)",
+                             (person_id, sibling_id, sibling_id, person_id))
+        if not cursor.rowcount:
+            return False
+        if self.listeners:
+            self._notify('add_sibling', person_id, sibling_id)
+        return True
+
+    def add_relationships(self, edges):
+        """Bulk-insert ``(kind, person_id, relative_id)`` edges in one transaction.
+
+        ``kind`` says what the relative is to the person: 'parent', 'child',
+        'sibling' or 'spouse'. Duplicates are skipped as in add_child.
+        """
+        children, siblings = [], []
+        for kind, person_id, relative_id in edges:
+            if kind == 'child':
+                children.append((person_id, relative_id))
+            elif kind == 'parent':
+                children.append((relative_id, person_id))
+            elif kind == 'sibling':
+                if person_id != relative_id:
+                    siblings.append((person_id, relative_id))
+            elif kind == 'spouse':
+                self.set_spouse(person_id, relative_id)
+            else:
+                raise ValueError(f"Unknown relationship kind: {kind!r}")
+
+        if not self.listeners:
+            self._write("INSERT OR IGNORE INTO parent_child (parent, child) VALUES (?, ?)", children, many=True)
+            # Siblings who share a parent (in the store or in this batch) need no link
+            siblings = [(a, b) for a, b in siblings if not self.share_parent(a, b)]
+            self._write("INSERT OR IGNORE INTO sibling (person, sibling) VALUES (?, ?)",
+                        siblings + [(b, a) for a, b in siblings], many=True)
+            self.commit()
+            return
+        # Listeners need to know which edges are new, so insert them one at a time
+        added_children, added_siblings = [], []
+        for parent_id, child_id in children:
+            if self._write("INSERT OR IGNORE INTO parent_child (parent, child) VALUES (?, ?)",
+                           (parent_id, child_id)).rowcount:
+                added_children.append((parent_id, child_id))
+        for a, b in siblings:
+            if self.share_parent(a, b):
+                continue
+            if self._write("INSERT OR IGNORE INTO sibling (person, sibling) VALUES (?, ?), (?, ?)",
+                           (a, b, b, a)).rowcount:
+                added_siblings.append((a, b))
+        self.commit()
+        for parent_id, child_id in added_children:
+            self._notify('add_child', parent_id, child_id)
+        for a, b in added_siblings:
+            self._notify('add_sibling', a, b)
+
+    def adjacency(self, kind):
+        """Return ``(offsets, targets)`` CSR arrays for 'parent', 'child' or 'sibling'."""
+        offsets, targets = array('i', bytes(4 * (self._count + 1))), array('i')
+        for node, target in self._connection.execute(EDGE_TABLES[kind]):
+            offsets[node + 1] += 1
+            targets.append(target)
+        for node in range(self._count):
+            offsets[node + 1] += offsets[node]
+        return offsets, targets
+
+    # Recursive queries run inside SQLite
+
+    def descendant_ids(self, person_id, max_depth=None):
+        """IDs of everyone 1..max_depth generations below ``person_id``, nearest first."""
+        return self._column(DOWN + "SELECT id FROM walk WHERE id != ? GROUP BY id ORDER BY MIN(depth), id",
+                            (person_id, self._depth(max_depth), person_id))
+
+    def ancestor_ids(self, person_id, max_depth=None):
+        """IDs of everyone 1..max_depth generations above ``person_id``, nearest first."""
+        return self._column(UP + "SELECT id FROM walk WHERE id != ? GROUP BY id ORDER BY MIN(depth), id",
+                            (person_id, self._depth(max_depth), person_id))
+
+    def generation_ids(self, person_id, kind, depth):
+        """IDs exactly ``depth`` 'child' or 'parent' steps from ``person_id`` (e.g. grandchildren)."""
+        walk = DOWN if kind == 'child' else UP
+        return self._column(walk + "SELECT DISTINCT id FROM walk WHERE depth = ? ORDER BY id",
+                            (person_id, depth, depth))
+
+    def cousin_ids(self, person_id, n=1, removed=0):
+        """nth cousins, ``removed`` generations down, as in traversal.nth_cousins."""
+        return self._column(COUSINS, {'person': person_id, 'n': n, 'down': n + removed})
+
+    def _depth(self, max_depth):
+        # A chain of parents can be at most as long as the population
+        return self._count if max_depth is None else max_depth
+
+    # Change notification
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            listener(event, *args)
+
+    def compact(self):
+        """Nothing to compact; commits the open batch instead."""
+        self.commit()
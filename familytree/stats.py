@@ -0,0 +1,166 @@
+"""Running aggregate statistics for a family tree.
+
+``RunningStats`` computes its totals once and then follows store
+notifications, so averages, the lifespan median and per-generation
+fertility are read from counters instead of scanning every person.
+``check`` recomputes everything from scratch and reports any drift.
+"""
+
+from array import array
+from collections import Counter
+
+from familytree.kinship import KinshipIndex
+
+
+def age_between(birth_date, death_date):
+    """Whole years from birth to death, or None unless both dates are known."""
+    if not birth_date or not death_date:
+        return None
+    return death_date.year - birth_date.year - (
+        (death_date.month, death_date.day) < (birth_date.month, birth_date.day))
+
+
+class RunningStats:
+    def __init__(self, store, kinship):
+        self.store = store
+        self.kinship = kinship
+        self._reset()
+        self._recompute()
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+            kinship.generation_listeners.append(self._on_generation_change)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+            self.kinship.generation_listeners.remove(self._on_generation_change)
+
+    def _reset(self):
+        self.people = 0
+        self.child_counts = array('i')  # per person, as of the last event seen
+        self.total_children = 0
+        self.children_histogram = Counter()  # number of children -> number of people
+        self.deaths = 0  # people with both dates known
+        self.age_sum = 0
+        self.age_square_sum = 0
+        self.age_histogram = Counter()  # age at death -> number of people
+        self.generation_people = Counter()
+        self.generation_children = Counter()
+
+    def _recompute(self):
+        for person_id in self.store.ids():
+            self._add_person(person_id)
+
+    # Incremental updates
+
+    def _add_person(self, person_id):
+        children = len(self.store.children(person_id))
+        generation = self.kinship.generation[person_id]
+        self.child_counts.append(children)
+        self.people += 1
+        self.total_children += children
+        self.children_histogram[children] += 1
+        self.generation_people[generation] += 1
+        self.generation_children[generation] += children
+        self._count_age(self.store.birth_date(person_id), self.store.death_date(person_id), 1)
+
+    def _count_age(self, birth_date, death_date, sign):
+        age = age_between(birth_date, death_date)
+        if age is None:
+            return
+        self.deaths += sign
+        self.age_sum += sign * age
+        self.age_square_sum += sign * age * age
+        self.age_histogram[age] += sign
+        if not self.age_histogram[age]:
+            del self.age_histogram[age]
+
+    def _on_change(self, event, *args):
+        store = self.store
+        if event == 'add_person':
+            self._add_person(args[0])
+        elif event == 'add_child':
+            parent_id = args[0]
+            self.child_counts[parent_id] += 1
+            children = self.child_counts[parent_id]
+            self.total_children += 1
+            self._move(self.children_histogram, children - 1, children)
+            self.generation_children[self.kinship.generation[parent_id]] += 1
+        elif event == 'set_birth_date':
+            person_id, old = args
+            death_date = store.death_date(person_id)
+            self._count_age(old, death_date, -1)
+            self._count_age(store.birth_date(person_id), death_date, 1)
+        elif event == 'set_death_date':
+            person_id, old = args
+            birth_date = store.birth_date(person_id)
+            self._count_age(birth_date, old, -1)
+            self._count_age(birth_date, store.death_date(person_id), 1)
+
+    def _on_generation_change(self, person_id, old, new):
+        children = self.child_counts[person_id]
+        self._move(self.generation_people, old, new)
+        self.generation_children[old] -= children
+        self.generation_children[new] += children
+        if not self.generation_people[old]:
+            del self.generation_people[old]
+            del self.generation_children[old]
+
+    @staticmethod
+    def _move(counter, old, new):
+        counter[old] -= 1
+        if not counter[old]:
+            del counter[old]
+        counter[new] += 1
+
+    # Queries
+
+    def average_age_at_death(self):
+        return self.age_sum / self.deaths if self.deaths else None
+
+    def age_at_death_stddev(self):
+        if not self.deaths:
+            return None
+        mean = self.age_sum / self.deaths
+        return max(self.age_square_sum / self.deaths - mean * mean, 0) ** 0.5
+
+    def median_age_at_death(self):
+        """Median lifespan, read off the age histogram (ages are a small fixed range)."""
+        if not self.deaths:
+            return None
+        ages = sorted(self.age_histogram)
+        middle = (self.deaths - 1) // 2, self.deaths // 2
+        values, seen = [], 0
+        for age in ages:
+            count = self.age_histogram[age]
+            values.extend(age for position in middle if seen <= position < seen + count)
+            seen += count
+        return sum(values) / 2
+
+    def average_number_of_children(self):
+        return self.total_children / self.people if self.people else None
+
+    def fertility_by_generation(self):
+        """Average number of children per person for each generation (0 = founders)."""
+        return {generation: self.generation_children[generation] / count
+                for generation, count in sorted(self.generation_people.items())}
+
+    def check(self):
+        """Compare the running values with a full recompute; returns a list of mismatches."""
+        fresh = RunningStats.__new__(RunningStats)
+        fresh.store, fresh.kinship = self.store, KinshipIndex(self.store)
+        fresh.kinship.close()
+        fresh._reset()
+        fresh._recompute()
+        problems = []
+        for field in ('people', 'child_counts', 'total_children', 'children_histogram', 'deaths', 'age_sum',
+                      'age_square_sum', 'age_histogram', 'generation_people', 'generation_children'):
+            running, expected = getattr(self, field), getattr(fresh, field)
+            if isinstance(running, Counter):
+                # Ignore zero entries
+                running = {key: value for key, value in running.items() if value}
+                expected = {key: value for key, value in expected.items() if value}
+            if running != expected:
+                problems.append(f"{field}: running value {running!r} != recomputed {expected!r}")
+        return problems
+
@@ -0,0 +1,560 @@
+"""Compact columnar storage for family tree data.
+
+Every person is an integer ID (0, 1, 2, ...). Names live in one UTF-8 string
+table, dates are packed into typed arrays as proleptic ordinals and each
+relationship kind is kept as CSR adjacency (an offsets array plus a flat
+targets array). Nothing here creates one Python object per person.
+"""
+
+import sys
+from array import array
+from datetime import date
+from itertools import chain
+from zlib import crc32
+
+NO_PERSON = -1
+NO_DATE = 0  # date.toordinal() is always >= 1, so 0 is free to mean "unknown"
+
+
+def date_to_ordinal(value):
+    return value.toordinal() if value else NO_DATE
+
+
+def ordinal_to_date(value):
+    return date.fromordinal(value) if value else None
+
+
+def probe_name_index(name, index, hashes, names, offsets):
+    """Yield the IDs called ``name`` from an open-addressing name index.
+
+    ``index`` maps hash slots to person ID + 1 (0 is empty); ``hashes`` holds
+    each person's crc32 name hash and ``names[offsets[i]:offsets[i + 1]]`` their
+    UTF-8 name. Works on arrays and on memoryviews of a snapshot alike.
+    """
+    key = name.encode('utf-8')
+    wanted = crc32(key)
+    mask = len(index) - 1
+    slot = wanted & mask
+    while index[slot]:
+        person_id = index[slot] - 1
+        if hashes[person_id] == wanted and names[offsets[person_id]:offsets[person_id + 1]] == key:
+            yield person_id
+        slot = (slot + 1) & mask
+
+
+def derive_siblings(person_id, parents, children_of, recorded):
+    """Everyone sharing one of ``parents`` (full and half siblings), then the ``recorded`` links.
+
+    Siblings are not stored when they can be derived: the children of a
+    person's parents already say who they are. Links are only recorded for
+    people whose parents are unknown.
+    """
+    if not len(parents):
+        return array('i', recorded)
+    if not len(recorded):
+        # One parent, or a couple whose children are the same: no merging needed
+        first = children_of(parents[0])
+        if len(parents) == 1 or (len(parents) == 2 and first == children_of(parents[1])):
+            siblings = array('i', first)
+            if person_id in siblings:
+                siblings.remove(person_id)
+            return siblings
+    siblings = dict.fromkeys(chain.from_iterable(map(children_of, parents)))
+    siblings.update(dict.fromkeys(recorded))
+    siblings.pop(person_id, None)
+    return array('i', siblings)
+
+
+HASHED_DEGREE = 16  # rows longer than this keep a set for O(1) membership tests
+
+
+def copy_store(source, target):
+    """Copy every person and relationship of ``source`` into ``target`` (any store), keeping IDs in order.
+
+    Each person's parents keep their order; children come out in ID order.
+    """
+    offset = len(target)
+    target.add_many((source.name(person_id), source.birth_date(person_id), source.death_date(person_id))
+                    for person_id in source.ids())
+
+    def edges():
+        for person_id in source.ids():
+            for parent_id in source.parents(person_id):
+                yield 'parent', offset + person_id, offset + parent_id
+        # Only recorded sibling links; shared parents imply the rest
+        sibling_offsets, sibling_targets = source.adjacency('sibling')
+        for person_id in source.ids():
+            for sibling_id in sibling_targets[sibling_offsets[person_id]:sibling_offsets[person_id + 1]]:
+                if person_id < sibling_id:
+                    yield 'sibling', offset + person_id, offset + sibling_id
+            spouse_id = source.spouse(person_id)
+            if person_id <= spouse_id:  # once per couple, and self-marriages too
+                yield 'spouse', offset + person_id, offset + spouse_id
+
+    target.add_relationships(edges())
+
+
+class Adjacency:
+    """CSR adjacency for one relationship kind.
+
+    Edges added since the last compaction sit in a small per-node log
+    (``pending``) so inserts stay cheap; the log is folded back into the
+    flat arrays once it grows past a fraction of the compacted edge count.
+    Row order is always insertion order.
+
+    Duplicate checks scan the row while it has at most ``HASHED_DEGREE``
+    entries; longer rows (prolific ancestors) also keep a set of their
+    targets, so ``contains`` is constant time either way.
+    """
+
+    __slots__ = ('offsets', 'targets', 'pending', 'pending_count', 'hashed')
+
+    def __init__(self):
+        self.offsets = array('i', [0])  # offsets[i]:offsets[i + 1] is row i
+        self.targets = array('i')
+        self.pending = {}  # node ID -> array of targets added since compact()
+        self.pending_count = 0
+        self.hashed = {}  # node ID -> set of targets, only for long rows
+
+    def __len__(self):
+        return len(self.targets) + self.pending_count
+
+    def row(self, node):
+        offsets = self.offsets
+        if node + 1 < len(offsets):
+            row = self.targets[offsets[node]:offsets[node + 1]]
+        else:
+            row = array('i')
+        extra = self.pending.get(node)
+        if extra:
+            row.extend(extra)
+        return row
+
+    def degree(self, node):
+        offsets = self.offsets
+        base = offsets[node + 1] - offsets[node] if node + 1 < len(offsets) else 0
+        extra = self.pending.get(node)
+        return base + (len(extra) if extra else 0)
+
+    def contains(self, node, target):
+        members = self.hashed.get(node)
+        if members is not None:
+            return target in members
+        return target in self.row(node)
+
+    def append(self, node, target):
+        extra = self.pending.get(node)
+        if extra is None:
+            self.pending[node] = array('i', [target])
+        else:
+            extra.append(target)
+        self.pending_count += 1
+        self._track(node, (target,))
+
+    def _track(self, node, added):
+        members = self.hashed.get(node)
+        if members is not None:
+            members.update(added)
+        elif self.degree(node) > HASHED_DEGREE:
+            self.hashed[node] = set(self.row(node))
+
+    def needs_compaction(self):
+        return self.pending_count > max(1024, len(self.targets) >> 2)
+
+    def compact(self, node_count):
+        """Fold pending edges into the CSR arrays and cover ``node_count`` rows."""
+        if not self.pending and len(self.offsets) - 1 == node_count:
+            return
+        self._merge(sorted(self.pending.items()), node_count)
+        self.pending = {}
+        self.pending_count = 0
+
+    def extend(self, sources, targets, node_count):
+        """Add the edges ``sources[k] -> targets[k]`` in a single pass.
+
+        Edges already present (or repeated within the batch) are skipped and
+        each row keeps its first-seen order. Returns the (node, new targets)
+        pairs that were actually added.
+        """
+        self.compact(node_count)
+
+        # Stable counting sort of the batch by source node.
+        starts = array('i', bytes(4 * (node_count + 1)))
+        for source in sources:
+            starts[source + 1] += 1
+        for node in range(node_count):
+            starts[node + 1] += starts[node]
+        grouped = array('i', bytes(4 * len(sources)))
+        cursor = starts[:-1]
+        for source, target in zip(sources, targets):
+            grouped[cursor[source]] = target
+            cursor[source] += 1
+        del cursor
+
+        touched = []
+
+        def fresh_rows():
+            for node in sorted(set(sources)):
+                batch = dict.fromkeys(grouped[starts[node]:starts[node + 1]])
+                if self.degree(node):
+                    existing = self.hashed.get(node) or set(self.row(node))
+                    fresh = [target for target in batch if target not in existing]
+                else:
+                    fresh = list(batch)
+                if fresh:
+                    touched.append((node, fresh))
+                    yield node, fresh
+
+        self._merge(fresh_rows(), node_count)
+        for node, fresh in touched:
+            self._track(node, fresh)
+        return touched
+
+    def _merge(self, rows, node_count):
+        # Rebuild the CSR arrays with each (node, extra targets) row appended,
+        # copying untouched stretches of the old arrays in bulk. ``rows`` must
+        # be in ascending node order.
+        old_offsets, old_targets = self.offsets, self.targets
+        base_rows = len(old_offsets) - 1
+        targets = array('i')
+        offsets = array('i')
+        cursor = 0  # next unread position in old_targets
+        row = 0  # next row whose offset has not been written yet
+        shift = 0  # edges inserted ahead of the current row
+        for node, extra in rows:
+            end = old_offsets[node + 1] if node < base_rows else len(old_targets)
+            targets.extend(old_targets[cursor:end])
+            targets.extend(extra)
+            cursor = end
+            offsets.extend(self._shifted(old_offsets, row, node + 1, shift, base_rows))
+            shift += len(extra)
+            row = node + 1
+        targets.extend(old_targets[cursor:])
+        offsets.extend(self._shifted(old_offsets, row, node_count + 1, shift, base_rows))
+        self.offsets = offsets
+        self.targets = targets
+        return shift
+
+    @staticmethod
+    def _shifted(old_offsets, start, stop, shift, base_rows):
+        # Offsets for rows start..stop-1, moved right by ``shift`` edges.
+        # Rows past the old end start where the old targets ended.
+        known = old_offsets[start:min(stop, base_rows + 1)]
+        if shift:
+            known = array('i', map(shift.__add__, known))
+        missing = stop - max(start, base_rows + 1)
+        if missing > 0:
+            known.extend([old_offsets[-1] + shift] * missing)
+        return known
+
+    def memory_usage(self):
+        size = sys.getsizeof(self.offsets) + sys.getsizeof(self.targets) + sys.getsizeof(self.pending)
+        size += sum(sys.getsizeof(extra) for extra in self.pending.values())
+        return size + sum(sys.getsizeof(members) for members in self.hashed.values())
+
+
+class PersonStore:
+    """Array-backed storage engine behind ``FamilyTree``.
+
+    Names are looked up through an open-addressing hash index over the string
+    table, so several people may share a name; ``find`` returns the first one
+    that was added and ``find_all`` returns all of them.
+
+    Indexes built on top of the store can ``subscribe`` to changes; each
+    listener is called as ``listener(event, *args)`` after the change:
+
+        ('add_person', person_id)
+        ('set_birth_date' / 'set_death_date', person_id, old_date)
+        ('set_spouse', person_id, spouse_id, old_spouse_id)
+        ('add_child', parent_id, child_id)
+        ('add_sibling', person_id, sibling_id)
+
+    ``siblings`` is derived: the other children of a person's parents plus
+    any recorded links, so a new child changes the siblings of every child
+    of that parent.
+    """
+
+    def __init__(self):
+        self._names = bytearray()
+        self._name_offsets = array('I', [0])
+        self._name_hashes = array('I')
+        self._index = array('i', [0]) * 8  # slot -> person ID + 1, 0 means empty
+        self.birth_ordinals = array('i')
+        self.death_ordinals = array('i')
+        self.spouses = array('i')
+        self.parent_adjacency = Adjacency()
+        self.child_adjacency = Adjacency()
+        self.sibling_adjacency = Adjacency()  # recorded links; shared parents imply the rest
+        self._sibling_rows = None  # person ID -> derived sibling row, see materialize_siblings
+        self.listeners = []
+
+    def __len__(self):
+        return len(self._name_hashes)
+
+    def ids(self):
+        return range(len(self))
+
+    # People
+
+    def add(self, name, birth_date=None, death_date=None):
+        """Add a person and return their ID. Duplicate names are allowed."""
+        person_id = len(self)
+        key = name.encode('utf-8')
+        self._names.extend(key)
+        self._name_offsets.append(len(self._names))
+        self._name_hashes.append(crc32(key))
+        self.birth_ordinals.append(date_to_ordinal(birth_date))
+        self.death_ordinals.append(date_to_ordinal(death_date))
+        self.spouses.append(NO_PERSON)
+        if 2 * len(self) > len(self._index):
+            self._rebuild_index(2 * len(self._index))
+        else:
+            self._index_insert(person_id)
+        if self.listeners:
+            self._notify('add_person', person_id)
+        return person_id
+
+    def add_many(self, rows):
+        """Add (name, birth_date, death_date) rows and return the range of new IDs."""
+        first = len(self)
+        for name, birth_date, death_date in rows:
+            self.add(name, birth_date, death_date)
+        return range(first, len(self))
+
+    def find(self, name):
+        """Return the ID of the first person called ``name``, or NO_PERSON."""
+        for person_id in self._probe(name):
+            return person_id
+        return NO_PERSON
+
+    def find_all(self, name):
+        return sorted(self._probe(name))
+
+    def name(self, person_id):
+        offsets = self._name_offsets
+        return self._names[offsets[person_id]:offsets[person_id + 1]].decode('utf-8')
+
+    def birth_date(self, person_id):
+        return ordinal_to_date(self.birth_ordinals[person_id])
+
+    def death_date(self, person_id):
+        return ordinal_to_date(self.death_ordinals[person_id])
+
+    def set_birth_date(self, person_id, value):
+        old = self.birth_date(person_id)
+        self.birth_ordinals[person_id] = date_to_ordinal(value)
+        if self.listeners:
+            self._notify('set_birth_date', person_id, old)
+
+    def set_death_date(self, person_id, value):
+        old = self.death_date(person_id)
+        self.death_ordinals[person_id] = date_to_ordinal(value)
+        if self.listeners:
+            self._notify('set_death_date', person_id, old)
+
+    def _index_insert(self, person_id):
+        index = self._index
+        mask = len(index) - 1
+        slot = self._name_hashes[person_id] & mask
+        while index[slot]:
+            slot = (slot + 1) & mask
+        index[slot] = person_id + 1
+
+    def _rebuild_index(self, size):
+        self._index = array('i', [0]) * size
+        for person_id in range(len(self)):
+            self._index_insert(person_id)
+
+    def _probe(self, name):
+        return probe_name_index(name, self._index, self._name_hashes, self._names, self._name_offsets)
+
+    def name_table(self):
+        """Return the (names, name_offsets, name_hashes, index) columns, e.g. for snapshots."""
+        return self._names, self._name_offsets, self._name_hashes, self._index
+
+    # Relationships
+
+    def parents(self, person_id):
+        return self.parent_adjacency.row(person_id)
+
+    def children(self, person_id):
+        return self.child_adjacency.row(person_id)
+
+    def siblings(self, person_id):
+        rows = self._sibling_rows
+        if rows is not None:
+            row = rows.get(person_id)
+            if row is None:
+                row = rows[person_id] = self._derive_siblings(person_id)
+            return row
+        return self._derive_siblings(person_id)
+
+    def recorded_siblings(self, person_id):
+        """Sibling links added explicitly, without the ones implied by shared parents."""
+        return self.sibling_adjacency.row(person_id)
+
+    def _derive_siblings(self, person_id):
+        recorded = self.sibling_adjacency.row(person_id) if len(self.sibling_adjacency) else ()
+        return derive_siblings(person_id, self.parent_adjacency.row(person_id), self.child_adjacency.row, recorded)
+
+    def share_parent(self, person_id, other_id):
+        return not set(self.parents(person_id)).isdisjoint(self.parents(other_id))
+
+    def materialize_siblings(self, enabled=True):
+        """Keep each sibling row once derived, dropping it when that family changes.
+
+        Repeat lookups become a dict hit instead of a walk over the parents'
+        children, at the cost of one array per person looked up. Rows are
+        shared, so callers must not modify them.
+        """
+        self._sibling_rows = {} if enabled else None
+
+    def _forget_siblings(self, parent_id, child_id):
+        rows = self._sibling_rows
+        if rows:
+            rows.pop(child_id, None)
+            for sibling_id in self.child_adjacency.row(parent_id):
+                rows.pop(sibling_id, None)
+
+    def spouse(self, person_id):
+        return self.spouses[person_id]
+
+    def set_spouse(self, person_id, spouse_id):
+        """Marry the two people (``NO_PERSON`` unsets); earlier spouses of either are unlinked."""
+        spouses = self.spouses
+        old = spouses[person_id]
+        if old != NO_PERSON and old != spouse_id and spouses[old] == person_id:
+            spouses[old] = NO_PERSON
+        jilted = NO_PERSON
+        if spouse_id != NO_PERSON:
+            jilted = spouses[spouse_id]
+            if jilted not in (NO_PERSON, person_id) and spouses[jilted] == spouse_id:
+                spouses[jilted] = NO_PERSON
+            else:
+                jilted = NO_PERSON
+            spouses[spouse_id] = person_id
+        spouses[person_id] = spouse_id
+        if self.listeners:
+            if jilted != NO_PERSON:
+                self._notify('set_spouse', jilted, NO_PERSON, spouse_id)
+            self._notify('set_spouse', person_id, spouse_id, old)
+
+    def add_child(self, parent_id, child_id):
+        """Record ``child_id`` as a child of ``parent_id``. Returns False if already known."""
+        if self.child_adjacency.contains(parent_id, child_id):
+            return False
+        self._append(self.child_adjacency, parent_id, child_id)
+        self._append(self.parent_adjacency, child_id, parent_id)
+        self._forget_siblings(parent_id, child_id)
+        if self.listeners:
+            self._notify('add_child', parent_id, child_id)
+        return True
+
+    def add_sibling(self, person_id, sibling_id):
+        """Record a sibling link; returns False if they are already siblings (linked or sharing a parent)."""
+        if (person_id == sibling_id or self.sibling_adjacency.contains(person_id, sibling_id)
+                or self.share_parent(person_id, sibling_id)):
+            return False
+        self._append(self.sibling_adjacency, person_id, sibling_id)
+        self._append(self.sibling_adjacency, sibling_id, person_id)
+        if self._sibling_rows:
+            self._sibling_rows.pop(person_id, None)
+            self._sibling_rows.pop(sibling_id, None)
+        if self.listeners:
+            self._notify('add_sibling', person_id, sibling_id)
+        return True
+
+    def add_relationships(self, edges):
+        """Bulk-insert ``(kind, person_id, relative_id)`` edges in one pass.
+
+        ``kind`` says what the relative is to the person: 'parent', 'child',
+        'sibling' or 'spouse'. Duplicates are skipped as in add_child.
+        """
+        parents, children = array('i'), array('i')
+        sibling_a, sibling_b = array('i'), array('i')
+        for kind, person_id, relative_id in edges:
+            if kind == 'child':
+                parents.append(person_id)
+                children.append(relative_id)
+            elif kind == 'parent':
+                parents.append(relative_id)
+                children.append(person_id)
+            elif kind == 'sibling':
+                if person_id == relative_id:
+                    continue
+                sibling_a.append(person_id)
+                sibling_b.append(relative_id)
+            elif kind == 'spouse':
+                self.set_spouse(person_id, relative_id)
+            else:
+                raise ValueError(f"Unknown relationship kind: {kind!r}")
+
+        count = len(self)
+        new_children = self.child_adjacency.extend(parents, children, count)
+        self.parent_adjacency.extend(children, parents, count)
+        if self._sibling_rows:
+            for parent_id, added in new_children:
+                for child_id in added:
+                    self._forget_siblings(parent_id, child_id)
+        # Siblings who share a parent (in the store or in this batch) need no
+        # link. Both directions of each link go in side by side, so every row
+        # lists its new siblings in batch order, as one add_sibling at a time would.
+        linked = [(a, b) for a, b in zip(sibling_a, sibling_b) if not self.share_parent(a, b)]
+        sources, targets = array('i'), array('i')
+        for a, b in linked:
+            sources.extend((a, b))
+            targets.extend((b, a))
+        new_siblings = self.sibling_adjacency.extend(sources, targets, count)
+        if self._sibling_rows:
+            for person_id, _ in new_siblings:
+                self._sibling_rows.pop(person_id, None)
+        if self.listeners:
+            # Report the new edges in batch order, so a listener that replays
+            # them (a change log) rebuilds every row in the same order
+            added = {(parent_id, child_id) for parent_id, fresh in new_children for child_id in fresh}
+            for edge in zip(parents, children):
+                if edge in added:
+                    added.discard(edge)
+                    self._notify('add_child', *edge)
+            added = {(person_id, sibling_id) for person_id, fresh in new_siblings for sibling_id in fresh}
+            for edge in linked:
+                if edge in added:
+                    added.discard(edge)
+                    added.discard(edge[::-1])
+                    self._notify('add_sibling', *edge)
+
+    # Change notification
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            listener(event, *args)
+
+    def _append(self, adjacency, node, target):
+        adjacency.append(node, target)
+        if adjacency.needs_compaction():
+            adjacency.compact(len(self))
+
+    def adjacency(self, kind):
+        """Return the compacted ``(offsets, targets)`` CSR arrays for 'parent', 'child' or 'sibling'."""
+        adjacency = getattr(self, f'{kind}_adjacency')
+        adjacency.compact(len(self))
+        return adjacency.offsets, adjacency.targets
+
+    def compact(self):
+        for adjacency in (self.parent_adjacency, self.child_adjacency, self.sibling_adjacency):
+            adjacency.compact(len(self))
+
+    def memory_usage(self):
+        """Approximate number of bytes held by the store."""
+        columns = (self._names, self._name_offsets, self._name_hashes, self._index,
+                   self.birth_ordinals, self.death_ordinals, self.spouses)
+        size = sum(sys.getsizeof(column) for column in columns)
+        for adjacency in (self.parent_adjacency, self.child_adjacency, self.sibling_adjacency):
+            size += adjacency.memory_usage()
+        return size
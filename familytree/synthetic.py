@@ -0,0 +1,122 @@
+"""Deterministic synthetic populations for benchmarks.
+
+``populate`` grows a population generation by generation: founders marry
+at ``marriage_rate``, each couple has a Poisson number of children with mean
+``fertility`` about ``generation_gap`` years after the older partner was
+born, children take the father's surname, and lifespans mix child mortality
+with a normal adult lifespan. The same arguments and seed always produce
+the same people, names, dates and IDs.
+
+People and relationships are written to the store in batches, so only one
+generation of IDs and birth years is held in memory; tens of millions of
+people only cost the store's own columns.
+"""
+
+import math
+import random
+from array import array
+from datetime import date
+
+SYLLABLES = ('an', 'ber', 'ca', 'dor', 'el', 'fi', 'gar', 'ha', 'is', 'jo', 'ka', 'lin', 'ma', 'nes',
+             'o', 'pe', 'qui', 'ro', 'sa', 'to', 'ul', 'va', 'wil', 'ya', 'zo', 'mü', 'sø', 'é')
+BATCH_SIZE = 50_000
+
+
+def vocabulary(rng, size, syllables=(2, 3)):
+    """``size`` distinct capitalised words of ``syllables`` (min, max) syllables."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(*syllables))).capitalize())
+    return sorted(words)
+
+
+def poisson(rng, mean):
+    # Knuth's method; family sizes are small so the loop is short
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def founder_count(people, generations, fertility, marriage_rate):
+    """Founders needed for ``people`` in total over ``generations`` at the expected growth rate."""
+    growth = marriage_rate * fertility / 2
+    total = generations if abs(growth - 1) < 1e-9 else (growth ** generations - 1) / (growth - 1)
+    return max(2, int(people / total))
+
+
+def populate(store, people, seed=0, generations=8, fertility=2.5, marriage_rate=0.85,
+             mean_lifespan=68, lifespan_sd=16, child_mortality=0.12, start_year=1600,
+             generation_gap=28, present_year=2025, given_names=3000,
+             surnames=20_000):
+    """Add up to ``people`` synthetic people to ``store``; returns the range of new IDs.
+
+    Generation after generation is added until ``people`` is reached or the
+    population dies out; ``generations`` only sizes the founding generation.
+    People whose death would fall after ``present_year`` are still alive (no
+    death date). Siblings are not linked; they follow from shared parents.
+    """
+    rng = random.Random(seed)
+    given, families = vocabulary(rng, given_names), vocabulary(rng, surnames, (2, 4))
+    first = len(store)
+    rows, edges = [], []
+    added = 0
+
+    def flush():
+        store.add_many(rows)
+        store.add_relationships(edges)
+        rows.clear()
+        edges.clear()
+
+    def person(surname, year):
+        nonlocal added
+        birth = date(year, 1, 1).toordinal() + rng.randrange(365)
+        if rng.random() < child_mortality:
+            age_days = rng.randrange(5 * 365)
+        else:
+            age_days = int(365.25 * min(max(rng.gauss(mean_lifespan, lifespan_sd), 5), 105))
+        death = birth + age_days
+        rows.append((f"{rng.choice(given)} {surname}", date.fromordinal(birth),
+                     date.fromordinal(death) if death < date(present_year, 1, 1).toordinal() else None))
+        person_id = first + added
+        added += 1
+        return person_id
+
+    # A generation is parallel arrays of IDs, birth years and surname numbers
+    ids, years, names = array('i'), array('i'), array('i')
+    for _ in range(min(people, founder_count(people, generations, fertility, marriage_rate))):
+        year, surname = start_year + rng.randrange(generation_gap), rng.randrange(len(families))
+        ids.append(person(families[surname], year))
+        years.append(year)
+        names.append(surname)
+
+    while added < people and len(ids) > 1:
+        # Shuffle the generation and pair neighbours off as couples
+        order = list(range(len(ids)))
+        rng.shuffle(order)
+        next_ids, next_years, next_names = array('i'), array('i'), array('i')
+        for position in range(0, len(order) - 1, 2):
+            if added >= people:
+                break
+            father, mother = order[position], order[position + 1]
+            if rng.random() >= marriage_rate:
+                continue
+            edges.append(('spouse', ids[father], ids[mother]))
+            base = max(years[father], years[mother]) + generation_gap
+            for _ in range(poisson(rng, fertility)):
+                if added >= people:
+                    break
+                year = base + rng.randint(-8, 8)
+                child = person(families[names[father]], year)
+                edges.append(('child', ids[father], child))
+                edges.append(('child', ids[mother], child))
+                next_ids.append(child)
+                next_years.append(year)
+                next_names.append(names[father])
+            # Batches grow with the store so that merging them stays linear overall
+            if len(rows) >= max(BATCH_SIZE, len(store) // 4):
+                flush()
+        ids, years, names = next_ids, next_years, next_names
+    flush()
+    return range(first, first + added)
@@ -0,0 +1,82 @@
+"""Breadth-first traversal engine for relative queries.
+
+Everything here is written against neighbour functions (``parents_of``,
+``children_of``, ...) rather than a particular person type, so the same code
+walks integer IDs in a PersonStore and the Person objects of Feature 1.py
+and Feature 2.py. Results are generators: the first relatives come out
+before the walk over a large clan has finished.
+"""
+
+from itertools import chain
+
+
+def bfs(starts, neighbours, max_depth=None):
+    """Yield ``(person, depth)`` once per person reachable from ``starts``.
+
+    Depth is the number of steps on the shortest path; ``max_depth`` stops
+    the walk after that many steps. The starting people come out at depth 0.
+    """
+    frontier = list(dict.fromkeys(starts))
+    visited = set(frontier)
+    for person in frontier:
+        yield person, 0
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for relative in neighbours(person):
+                if relative not in visited:
+                    visited.add(relative)
+                    next_frontier.append(relative)
+                    yield relative, depth
+        frontier = next_frontier
+
+
+def within(start, neighbours, max_depth):
+    """Yield everyone 1..max_depth steps from ``start`` (not ``start`` itself)."""
+    for person, depth in bfs([start], neighbours, max_depth):
+        if depth:
+            yield person
+
+
+def generation(starts, neighbours, depth):
+    """Yield the people exactly ``depth`` steps from ``starts``, each once.
+
+    Unlike ``bfs`` a person may be reached along several paths of different
+    lengths (pedigree collapse); they count at every exact distance. Earlier
+    levels are built eagerly, the last one is produced lazily.
+    """
+    level = list(dict.fromkeys(starts))
+    if depth <= 0:
+        yield from level
+        return
+    for _ in range(depth - 1):
+        level = list(dict.fromkeys(chain.from_iterable(map(neighbours, level))))
+    seen = set()
+    for person in level:
+        for relative in neighbours(person):
+            if relative not in seen:
+                seen.add(relative)
+                yield relative
+
+
+def descendants(start, children_of, max_depth=None):
+    return within(start, children_of, max_depth)
+
+
+def ancestors(start, parents_of, max_depth=None):
+    return within(start, parents_of, max_depth)
+
+
+def nth_cousins(start, n, parents_of, children_of, siblings_of, removed=0):
+    """Yield ``start``'s nth cousins, ``removed`` generations further down.
+
+    Cousins follow the family's own records: go up ``n`` generations, across
+    to those ancestors' siblings, then down ``n + removed`` generations.
+    ``n=1`` gives first cousins (children of the parents' siblings).
+    """
+    collaterals = dict.fromkeys(chain.from_iterable(map(siblings_of, generation([start], parents_of, n))))
+    for cousin in generation(collaterals, children_of, n + removed):
+        if cousin != start:
+            yield cousin
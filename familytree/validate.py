@@ -0,0 +1,238 @@
+"""Relationship integrity checks, in one linear pass or after every change.
+
+``validate(store)`` walks every person and every edge a bounded number of
+times (O(V + E)) and yields problems as soon as they are found, so a large
+import can be reported on while the check is still running. Each problem is
+a ``(kind, person_ids, message)`` tuple; the kinds are:
+
+    too_many_parents        more than MAX_PARENTS parents recorded
+    cycle                   a person is their own ancestor (one per back edge)
+    self_link               a person is their own parent, sibling or spouse
+    born_before_parent      a child's birth date is not after a parent's
+    death_before_birth      a death date earlier than the birth date
+    asymmetric_parent       a parent -> child edge without the child -> parent one
+    asymmetric_sibling      a sibling link recorded in one direction only
+    asymmetric_spouse       a spouse who does not point back
+    siblings_without_common_parent   both have parents recorded, none shared
+
+``Validator`` subscribes to a store and re-checks only the people each
+change touches, collecting problems (or passing them to a callback).
+"""
+
+from functools import partial
+from itertools import chain
+
+from familytree.store import NO_PERSON
+
+MAX_PARENTS = 2
+
+
+def _label(store, person_id):
+    return f"{store.name(person_id)} (#{person_id})"
+
+
+def _rows(store, kind):
+    offsets, targets = store.adjacency(kind)
+    for person_id in store.ids():
+        yield person_id, targets[offsets[person_id]:offsets[person_id + 1]]
+
+
+def validate(store):
+    """Yield every integrity problem in ``store`` as ``(kind, person_ids, message)``."""
+    births, deaths = store.birth_ordinals, store.death_ordinals
+    label = partial(_label, store)
+
+    # One pass over each person: own dates, parent count, spouse link
+    for person_id, parents in _rows(store, 'parent'):
+        if births[person_id] and deaths[person_id] and deaths[person_id] < births[person_id]:
+            yield ('death_before_birth', (person_id,),
+                   f"{label(person_id)} died on {store.death_date(person_id)}, "
+                   f"before their birth on {store.birth_date(person_id)}")
+        if len(parents) > MAX_PARENTS:
+            yield ('too_many_parents', (person_id, *parents),
+                   f"{label(person_id)} has {len(parents)} parents: {', '.join(map(label, parents))}")
+        spouse_id = store.spouse(person_id)
+        if spouse_id == person_id:
+            yield 'self_link', (person_id,), f"{label(person_id)} is their own spouse"
+        elif spouse_id != NO_PERSON and store.spouse(spouse_id) != person_id:
+            yield ('asymmetric_spouse', (person_id, spouse_id),
+                   f"{label(person_id)} is married to {label(spouse_id)}, who does not point back")
+
+    # Parent/child edges: both directions recorded, dates in order
+    child_edges = set()
+    for parent_id, children in _rows(store, 'child'):
+        for child_id in children:
+            child_edges.add((parent_id, child_id))
+            if child_id == parent_id:
+                yield 'self_link', (parent_id,), f"{label(parent_id)} is their own parent"
+            elif births[parent_id] and births[child_id] and births[child_id] <= births[parent_id]:
+                yield ('born_before_parent', (parent_id, child_id),
+                       f"{label(child_id)} (born {store.birth_date(child_id)}) is recorded as a child of "
+                       f"{label(parent_id)} (born {store.birth_date(parent_id)})")
+    for child_id, parents in _rows(store, 'parent'):
+        for parent_id in parents:
+            if (parent_id, child_id) in child_edges:
+                child_edges.discard((parent_id, child_id))
+            else:
+                yield ('asymmetric_parent', (parent_id, child_id),
+                       f"{label(child_id)} lists {label(parent_id)} as a parent, but not the other way round")
+    for parent_id, child_id in child_edges:
+        yield ('asymmetric_parent', (parent_id, child_id),
+               f"{label(parent_id)} lists {label(child_id)} as a child, but not the other way round")
+    del child_edges
+
+    # Sibling links: both directions, and a shared parent when both have parents
+    sibling_edges = set()
+    for person_id, siblings in _rows(store, 'sibling'):
+        sibling_edges.update((person_id, sibling_id) for sibling_id in siblings)
+    for person_id, sibling_id in sibling_edges:
+        if person_id == sibling_id:
+            yield 'self_link', (person_id,), f"{label(person_id)} is their own sibling"
+        elif (sibling_id, person_id) not in sibling_edges:
+            yield ('asymmetric_sibling', (person_id, sibling_id),
+                   f"{label(person_id)} lists {label(sibling_id)} as a sibling, but not the other way round")
+        elif person_id < sibling_id:
+            yield from _sibling_parents(store, person_id, sibling_id, label)
+    del sibling_edges
+
+    yield from _cycles(store, label)
+
+
+def _sibling_parents(store, person_id, sibling_id, label):
+    parents, sibling_parents = store.parents(person_id), store.parents(sibling_id)
+    if len(parents) and len(sibling_parents) and not set(parents).intersection(sibling_parents):
+        yield ('siblings_without_common_parent', (person_id, sibling_id),
+               f"{label(person_id)} and {label(sibling_id)} are recorded as siblings "
+               f"but have no parent in common")
+
+
+def _cycles(store, label):
+    # Iterative DFS over children, colouring people 1 while on the stack and
+    # 2 when finished; an edge back to a person on the stack closes a cycle.
+    offsets, targets = store.adjacency('child')
+    colour = bytearray(len(store))
+    for start in store.ids():
+        if colour[start]:
+            continue
+        colour[start] = 1
+        path = [start]
+        stack = [iter(targets[offsets[start]:offsets[start + 1]])]
+        while stack:
+            for child_id in stack[-1]:
+                if not colour[child_id]:
+                    colour[child_id] = 1
+                    path.append(child_id)
+                    stack.append(iter(targets[offsets[child_id]:offsets[child_id + 1]]))
+                    break
+                if colour[child_id] == 1 and child_id != path[-1]:
+                    loop = path[path.index(child_id):]
+                    yield ('cycle', tuple(loop),
+                           f"{label(child_id)} is their own ancestor: "
+                           f"{' -> '.join(map(label, chain(loop, [child_id])))}")
+            else:
+                stack.pop()
+                colour[path.pop()] = 2
+
+
+def report(problems, out):
+    """Write each problem to ``out`` as it arrives, then a count by kind; returns the counts."""
+    counts = {}
+    for kind, _, message in problems:
+        counts[kind] = counts.get(kind, 0) + 1
+        out.write(f"{kind}: {message}\n")
+    if counts:
+        out.write("Found " + ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())) + "\n")
+    else:
+        out.write("No problems found.\n")
+    return counts
+
+
+class Validator:
+    """Check the people touched by every store change and collect any problems.
+
+    Problems go to ``callback(kind, person_ids, message)`` if given, and are
+    always appended to ``problems``. Nothing is rejected: the store has
+    already changed when it notifies, so this reports rather than prevents.
+    """
+
+    def __init__(self, store, callback=None):
+        self.store = store
+        self.callback = callback
+        self.problems = []
+        store.subscribe(self._on_change)
+
+    def close(self):
+        self.store.unsubscribe(self._on_change)
+
+    def _report(self, problems):
+        for problem in problems:
+            self.problems.append(problem)
+            if self.callback:
+                self.callback(*problem)
+
+    def _on_change(self, event, *args):
+        if event == 'add_child':
+            self._report(self.check_child(*args))
+        elif event == 'add_sibling':
+            self._report(self.check_siblings(*args))
+        elif event == 'set_spouse':
+            self._report(self.check_spouse(*args))
+        elif event in ('set_birth_date', 'set_death_date'):
+            self._report(self.check_dates(args[0]))
+
+    def check_child(self, parent_id, child_id):
+        store, label = self.store, partial(_label, self.store)
+        if parent_id == child_id:
+            yield 'self_link', (parent_id,), f"{label(parent_id)} is their own parent"
+            return
+        parents = store.parents(child_id)
+        if len(parents) > MAX_PARENTS:
+            yield ('too_many_parents', (child_id, *parents),
+                   f"{label(child_id)} has {len(parents)} parents: {', '.join(map(label, parents))}")
+        yield from self._child_dates(parent_id, child_id)
+        # A cycle through the new edge means the parent descends from the child
+        seen, stack = {child_id}, [child_id]
+        while stack:
+            for descendant_id in store.children(stack.pop()):
+                if descendant_id == parent_id:
+                    yield ('cycle', (parent_id, child_id),
+                           f"{label(parent_id)} is both a parent and a descendant of {label(child_id)}")
+                    return
+                if descendant_id not in seen:
+                    seen.add(descendant_id)
+                    stack.append(descendant_id)
+
+    def _child_dates(self, parent_id, child_id):
+        store = self.store
+        parent_birth, child_birth = store.birth_date(parent_id), store.birth_date(child_id)
+        if parent_birth and child_birth and child_birth <= parent_birth:
+            label = partial(_label, store)
+            yield ('born_before_parent', (parent_id, child_id),
+                   f"{label(child_id)} (born {child_birth}) is recorded as a child of "
+                   f"{label(parent_id)} (born {parent_birth})")
+
+    def check_siblings(self, person_id, sibling_id):
+        return _sibling_parents(self.store, person_id, sibling_id, partial(_label, self.store))
+
+    def check_spouse(self, person_id, spouse_id, old):
+        store, label = self.store, partial(_label, self.store)
+        for someone in dict.fromkeys((person_id, spouse_id, old)):
+            if someone == NO_PERSON:
+                continue
+            partner = store.spouse(someone)
+            if partner == someone:
+                yield 'self_link', (someone,), f"{label(someone)} is their own spouse"
+            elif partner != NO_PERSON and store.spouse(partner) != someone:
+                yield ('asymmetric_spouse', (someone, partner),
+                       f"{label(someone)} is married to {label(partner)}, who does not point back")
+
+    def check_dates(self, person_id):
+        store = self.store
+        birth, death = store.birth_date(person_id), store.death_date(person_id)
+        if birth and death and death < birth:
+            yield ('death_before_birth', (person_id,),
+                   f"{_label(store, person_id)} died on {death}, before their birth on {birth}")
+        for parent_id in store.parents(person_id):
+            yield from self._child_dates(parent_id, person_id)
+        for child_id in store.children(person_id):
+            yield from self._child_dates(person_id, child_id)
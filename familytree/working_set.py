@@ -0,0 +1,135 @@
+"""Bounded working set of person records over a disk-backed store.
+
+``WorkingSetStore`` wraps a ``SQLiteStore`` or a ``Snapshot`` and loads a
+person's record (name, dates, spouse, parents, children and recorded
+siblings) the first time any of it is read. Records are kept in LRU order
+and the coldest is dropped once there are more than ``capacity``, so a
+query about one person holds only the few dozen records it walks through,
+however large the file is. Siblings are derived from the cached parent and
+child rows, the same way the stores themselves derive them.
+
+Whole-tree reads (``ids``, ``find``, the ordinal columns, ``adjacency``)
+and every write go straight to the backing store. The working set listens
+to the backing store's notifications and drops the records a change
+touches, so a cached record never differs from a fresh read.
+"""
+
+from collections import OrderedDict
+
+from familytree.store import NO_PERSON, derive_siblings
+
+NAME, BIRTH, DEATH, SPOUSE, PARENTS, CHILDREN, SIBLINGS = range(7)
+
+# Calls answered by the backing store itself
+PASSTHROUGH = frozenset((
+    'ids', 'find', 'find_all', 'birth_ordinals', 'death_ordinals', 'adjacency',
+    'add', 'add_many', 'set_birth_date', 'set_death_date', 'set_spouse', 'add_child', 'add_sibling',
+    'add_relationships', 'share_parent', 'subscribe', 'unsubscribe', 'commit', 'compact',
+))
+
+
+def _load(store, person_id):
+    if hasattr(store, 'person_record'):
+        return store.person_record(person_id)  # SQLite: one round trip for the row, one for the edges
+    if not 0 <= person_id < len(store):
+        raise IndexError("person ID out of range")
+    return (store.name(person_id), store.birth_date(person_id), store.death_date(person_id),
+            store.spouse(person_id), tuple(store.parents(person_id)), tuple(store.children(person_id)),
+            tuple(store.recorded_siblings(person_id)))
+
+
+class WorkingSetStore:
+    def __init__(self, store, capacity=4096):
+        self.store = store
+        self.capacity = capacity
+        self.records = OrderedDict()  # person ID -> record tuple, coldest first
+        self.hits = self.loads = self.evictions = 0
+        if hasattr(store, 'subscribe'):
+            store.subscribe(self._on_change)
+
+    def __getattr__(self, attribute):
+        if attribute in PASSTHROUGH:
+            return getattr(self.store, attribute)
+        raise AttributeError(attribute)
+
+    def close(self):
+        if hasattr(self.store, 'unsubscribe'):
+            self.store.unsubscribe(self._on_change)
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.store)
+
+    # Records
+
+    def record(self, person_id):
+        records = self.records
+        record = records.get(person_id)
+        if record is not None:
+            records.move_to_end(person_id)
+            self.hits += 1
+            return record
+        record = _load(self.store, person_id)
+        self.loads += 1
+        records[person_id] = record
+        if len(records) > self.capacity:
+            records.popitem(last=False)
+            self.evictions += 1
+        return record
+
+    def forget(self, person_ids):
+        for person_id in person_ids:
+            self.records.pop(person_id, None)
+
+    def _on_change(self, event, *args):
+        if event in ('add_child', 'add_sibling'):
+            self.forget(args)
+        elif event == 'set_spouse':
+            self.forget(person_id for person_id in args if person_id != NO_PERSON)
+        elif event in ('set_birth_date', 'set_death_date'):
+            self.forget(args[:1])
+
+    def info(self):
+        """Counters for sizing the working set."""
+        reads = self.hits + self.loads
+        return {
+            'size': len(self.records),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'loads': self.loads,
+            'hit_rate': self.hits / reads if reads else None,
+            'evictions': self.evictions,
+        }
+
+    # Reads, each from the person's record
+
+    def name(self, person_id):
+        return self.record(person_id)[NAME]
+
+    def birth_date(self, person_id):
+        return self.record(person_id)[BIRTH]
+
+    def death_date(self, person_id):
+        return self.record(person_id)[DEATH]
+
+    def spouse(self, person_id):
+        return self.record(person_id)[SPOUSE]
+
+    def parents(self, person_id):
+        return self.record(person_id)[PARENTS]
+
+    def children(self, person_id):
+        return self.record(person_id)[CHILDREN]
+
+    def recorded_siblings(self, person_id):
+        return self.record(person_id)[SIBLINGS]
+
+    def siblings(self, person_id):
+        record = self.record(person_id)
+        return derive_siblings(person_id, record[PARENTS], self.children, record[SIBLINGS])
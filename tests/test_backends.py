@@ -0,0 +1,247 @@
+"""The FamilyTree API against every storage backend.
+
+Each backend is filled with the same family through the public API (the
+snapshot is written from an in-memory tree, since it is read-only) and must
+answer every query the same way as the in-memory PersonStore. The writable
+backends also take the same mutations, and the disk-backed ones must still
+hold everything after being closed and reopened.
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.snapshot import Snapshot  # noqa: E402
+from familytree.sqlite_store import SQLiteStore  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.working_set import WorkingSetStore  # noqa: E402
+
+PEOPLE = [
+    ("George Hart", date(1900, 4, 2), date(1970, 1, 9)),
+    ("Martha Hart", date(1905, 7, 30), date(1980, 3, 3)),
+    ("Henry Moss", date(1903, 11, 12), date(1975, 6, 1)),
+    ("Ivy Moss", date(1908, 2, 29), None),
+    ("Alice Hart", date(1930, 5, 15), None),
+    ("Bob Hart", date(1932, 9, 1), date(2001, 12, 24)),
+    ("Carol Moss", date(1934, 5, 15), None),
+    ("Dan Reed", date(1928, 1, 20), None),
+    ("Jill Park", None, None),
+    ("Liam Reed", date(1926, 8, 8), None),
+    ("Eve Reed", date(1955, 3, 14), None),
+    ("Frank Reed", date(1957, 10, 31), None),
+    ("Gina Hart", date(1958, 6, 6), None),
+    ("Kevin Reed", date(1960, 2, 2), None),
+]
+EDGES = [
+    ('spouse', "George Hart", "Martha Hart"),
+    ('spouse', "Henry Moss", "Ivy Moss"),
+    ('spouse', "Alice Hart", "Dan Reed"),
+    ('child', "George Hart", "Alice Hart"),
+    ('child', "Martha Hart", "Alice Hart"),
+    ('parent', "Bob Hart", "Martha Hart"),
+    ('parent', "Bob Hart", "George Hart"),  # Bob's parents are recorded mother first
+    ('child', "Henry Moss", "Carol Moss"),
+    ('child', "Ivy Moss", "Carol Moss"),
+    ('child', "Alice Hart", "Eve Reed"),
+    ('child', "Dan Reed", "Eve Reed"),
+    ('child', "Alice Hart", "Frank Reed"),
+    ('child', "Dan Reed", "Frank Reed"),
+    ('child', "Jill Park", "Kevin Reed"),
+    ('child', "Dan Reed", "Kevin Reed"),
+    ('sibling', "Liam Reed", "Dan Reed"),
+]
+NAMES = [name for name, _, _ in PEOPLE]
+
+
+def build(tree):
+    """Add the test family through the FamilyTree and Person API."""
+    for name, birth_date, death_date in PEOPLE:
+        tree.add_person(name, birth_date, death_date)
+    tree.add_relationships(EDGES)
+    # Single mutations on top of the bulk insert
+    bob, carol, gina = (tree.find_person(name) for name in ("Bob Hart", "Carol Moss", "Gina Hart"))
+    bob.spouse = carol
+    bob.add_child(gina)
+    carol.add_child(gina)
+    return tree
+
+
+def snapshot(directory):
+    path = os.path.join(directory, 'tree.snap')
+    build(FamilyTree()).save_snapshot(path)
+    return FamilyTree.open_snapshot(path)
+
+
+BACKENDS = {
+    'memory': lambda directory: build(FamilyTree()),
+    'sqlite': lambda directory: build(FamilyTree.open_database(os.path.join(directory, 'tree.db'))),
+    'snapshot': snapshot,
+    'working_set': lambda directory: build(FamilyTree.open_lazy(os.path.join(directory, 'tree.db'), 4)),
+}
+WRITABLE = ('memory', 'sqlite', 'working_set')
+STORE_TYPES = {'memory': PersonStore, 'sqlite': SQLiteStore, 'snapshot': Snapshot, 'working_set': WorkingSetStore}
+
+
+@pytest.fixture
+def reference():
+    return build(FamilyTree())
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path):
+    tree = BACKENDS[request.param](str(tmp_path))
+    yield request.param, tree
+    tree.close()
+
+
+@pytest.fixture(params=WRITABLE)
+def writable(request, tmp_path):
+    tree = BACKENDS[request.param](str(tmp_path))
+    yield request.param, tree
+    tree.close()
+
+
+def answers(tree, name):
+    """Every per-person query, with orderless answers sorted."""
+    person = tree.find_person(name)
+    spouse = person.spouse
+    return {
+        'dates': (person.birth_date, person.death_date, person.age_at_death()),
+        'spouse': spouse.name if spouse else None,
+        'parents': [parent.name for parent in person.parents],
+        'children': [child.name for child in person.children],
+        'siblings': sorted(tree.get_siblings(name)),
+        'full_siblings': sorted(sibling.name for sibling in person.get_full_siblings()),
+        'half_siblings': sorted(sibling.name for sibling in person.get_half_siblings()),
+        'cousins': sorted(tree.get_cousins(name)),
+        'grandchildren': sorted(grandchild.name for grandchild in person.get_grandchildren()),
+        'immediate_family': person.get_immediate_family(),
+        'extended_family': sorted(person.get_extended_family()),
+        'descendants': sorted(tree.descendants(name)),
+        'ancestors': sorted(tree.ancestors(name)),
+        'second_cousins': sorted(tree.nth_cousins(name, 2)),
+        'ancestor_counts': tree.ancestor_counts(name),
+        'inbreeding': tree.inbreeding_coefficient(name),
+    }
+
+
+def test_backend_type(backend):
+    kind, tree = backend
+    assert isinstance(tree.store, STORE_TYPES[kind])
+
+
+def test_people(backend, reference):
+    _, tree = backend
+    assert len(tree.store) == len(PEOPLE)
+    assert [tree.store.name(person_id) for person_id in tree.store.ids()] == NAMES
+    assert tree.find_person("Nobody Here") is None
+    assert tree.find_person("alice  HART").name == "Alice Hart"
+    assert tree.complete_names("Re") == reference.complete_names("Re")
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_person_queries(backend, reference, name):
+    _, tree = backend
+    assert answers(tree, name) == answers(reference, name)
+
+
+def test_known_answers(backend):
+    _, tree = backend
+    assert tree.find_person("Bob Hart").get_immediate_family()['parents'] == ["Martha Hart", "George Hart"]
+    assert sorted(tree.get_siblings("Dan Reed")) == ["Liam Reed"]
+    assert sorted(tree.get_cousins("Eve Reed")) == ["Gina Hart"]
+    assert [p.name for p in tree.find_person("Eve Reed").get_half_siblings()] == ["Kevin Reed"]
+    assert tree.relationship("Eve Reed", "Gina Hart") == "first cousin"
+    assert tree.kinship_coefficient("Eve Reed", "Frank Reed") == 0.25
+    assert tree.kinship_coefficient("Eve Reed", "Gina Hart") == 0.0625
+
+
+def test_pair_queries(backend, reference):
+    _, tree = backend
+    for name in NAMES:
+        for relative in NAMES:
+            assert tree.relationship(name, relative) == reference.relationship(name, relative)
+            assert tree.is_ancestor(name, relative) == reference.is_ancestor(name, relative)
+
+
+def test_whole_tree_queries(backend, reference):
+    _, tree = backend
+    assert tree.number_of_children() == reference.number_of_children()
+    assert tree.get_birthdays() == reference.get_birthdays()
+    assert tree.get_sorted_birthdays() == reference.get_sorted_birthdays()
+    assert tree.birthdays_between(date(2024, 5, 1), date(2024, 6, 30)) == \
+        reference.birthdays_between(date(2024, 5, 1), date(2024, 6, 30))
+    assert tree.average_age_at_death() == pytest.approx(reference.average_age_at_death())
+    assert tree.median_age_at_death() == pytest.approx(reference.median_age_at_death())
+    assert tree.average_number_of_children() == pytest.approx(reference.average_number_of_children())
+    assert tree.descendant_counts() == reference.descendant_counts()
+    assert list(tree.validate()) == list(reference.validate())
+
+
+def test_mutations(writable, reference):
+    _, tree = writable
+    for current in (tree, reference):
+        # Build the caches and indexes first so the changes must invalidate them
+        answers(current, "Kevin Reed")
+        current.get_sorted_birthdays()
+        current.average_age_at_death()
+        kevin = current.find_person("Kevin Reed")
+        jill = current.find_person("Jill Park")
+        nora = current.add_person("Nora Reed", date(1985, 1, 1))
+        kevin.add_child(nora)
+        kevin.spouse = current.find_person("Gina Hart")
+        jill.birth_date = date(1931, 5, 15)
+        jill.death_date = date(1999, 9, 9)
+        current.find_person("Carol Moss").add_sibling(current.find_person("Liam Reed"))
+        current.find_person("Liam Reed").spouse = current.find_person("Carol Moss")
+    assert len(tree.store) == len(PEOPLE) + 1
+    for name in NAMES + ["Nora Reed"]:
+        assert answers(tree, name) == answers(reference, name)
+    assert tree.find_person("Gina Hart").spouse.name == "Kevin Reed"
+    assert tree.find_person("Bob Hart").spouse is None  # Carol's marriage to Liam unlinks Bob
+    assert tree.get_sorted_birthdays() == reference.get_sorted_birthdays()
+    assert tree.average_age_at_death() == pytest.approx(reference.average_age_at_death())
+
+
+def test_snapshot_is_read_only(tmp_path):
+    tree = snapshot(str(tmp_path))
+    with pytest.raises(AttributeError):
+        tree.add_person("Late Arrival")
+    tree.close()
+
+
+@pytest.mark.parametrize('kind', ('sqlite', 'working_set'))
+def test_reopen_after_close(tmp_path, reference, kind):
+    path = os.path.join(str(tmp_path), 'tree.db')
+    tree = BACKENDS[kind](str(tmp_path))
+    tree.find_person("Eve Reed").death_date = date(2020, 2, 20)
+    tree.add_person("Omar Reed")
+    tree.close()
+    reference.find_person("Eve Reed").death_date = date(2020, 2, 20)
+    reference.add_person("Omar Reed")
+
+    reopened = FamilyTree.open_database(path)
+    assert len(reopened.store) == len(PEOPLE) + 1
+    for name in NAMES + ["Omar Reed"]:
+        assert answers(reopened, name) == answers(reference, name)
+    reopened.close()
+
+
+@pytest.mark.parametrize('kind', WRITABLE)
+def test_copies_between_backends(tmp_path, reference, kind):
+    # save_snapshot and save_database work from any backend and keep parent order
+    tree = BACKENDS[kind](str(tmp_path))
+    snapshot_path = os.path.join(str(tmp_path), 'copy.snap')
+    database_path = os.path.join(str(tmp_path), 'copy.db')
+    tree.save_snapshot(snapshot_path)
+    tree.save_database(database_path)
+    tree.close()
+    for copy in (FamilyTree.open_snapshot(snapshot_path), FamilyTree.open_database(database_path)):
+        for name in NAMES:
+            assert answers(copy, name) == answers(reference, name)
+        copy.close()
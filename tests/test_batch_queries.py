@@ -0,0 +1,42 @@
+"""Batched relative queries must answer each person as the single queries do."""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.relatives import (  # noqa: E402
+    extended_family_ids, extended_family_ids_many, first_cousin_ids, first_cousin_ids_many)
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+def test_many_matches_one_at_a_time():
+    store = PersonStore()
+    populate(store, 3000, seed=7)
+    rng = random.Random(2)
+    for _ in range(40):  # recorded sibling links on top of the synthetic families
+        a, b = rng.sample(range(3000), 2)
+        store.add_sibling(a, b)
+    people = list(range(0, 3000, 3)) + [5, 5, 17]  # repeats are answered again, in order
+    cousins = list(first_cousin_ids_many(store, people))
+    extended = list(extended_family_ids_many(store, people))
+    assert [person_id for person_id, _ in cousins] == people
+    assert [person_id for person_id, _ in extended] == people
+    for (person_id, many_cousins), (_, many_extended) in zip(cousins, extended):
+        assert sorted(many_cousins) == sorted(first_cousin_ids(store, person_id))
+        assert sorted(many_extended) == sorted(extended_family_ids(store, person_id))
+
+
+def test_tree_batches_by_name():
+    tree = FamilyTree()
+    for name in ("Gran", "Mum", "Aunt", "Kid", "Twin", "Cousin"):
+        tree.add_person(name)
+    tree.add_relationships([('child', "Gran", "Mum"), ('child', "Gran", "Aunt"), ('child', "Mum", "Kid"),
+                            ('child', "Mum", "Twin"), ('child', "Aunt", "Cousin")])
+    names = ["Kid", "Nobody", "Twin", "Cousin"]
+    assert list(tree.get_cousins_many(names)) == [(name, tree.get_cousins(name) if tree.find_person(name) else [])
+                                                  for name in names]
+    assert dict(tree.get_extended_family_many(["Kid"]))["Kid"] == ["Mum", "Aunt", "Cousin"]
@@ -0,0 +1,88 @@
+"""The birthday calendar against a scan of every birth date."""
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.birthdays import BirthdayCalendar, is_leap  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+
+
+def celebrated(birth_date, year, leap_day):
+    """The date someone born on ``birth_date`` celebrates in ``year``."""
+    if (birth_date.month, birth_date.day) == (2, 29) and not is_leap(year):
+        return date(year, 2, 28) if leap_day == 'feb28' else date(year, 3, 1)
+    return birth_date.replace(year=year)
+
+
+def scanned(store, start, end, leap_day):
+    found = []
+    for person_id in store.ids():
+        birth_date = store.birth_date(person_id)
+        if birth_date:
+            for year in range(start.year, end.year + 1):
+                day = celebrated(birth_date, year, leap_day)
+                if start <= day <= end:
+                    found.append((day, person_id))
+    return sorted(found)
+
+
+@pytest.fixture
+def store():
+    rng = random.Random(2)
+    store = PersonStore()
+    for index in range(800):
+        birth_date = date(1900, 1, 1) + timedelta(days=rng.randrange(40_000)) if index % 9 else None
+        store.add(f"Person {index}", birth_date)
+    for year in (1952, 1996, 2000):
+        store.add(f"Leapling {year}", date(year, 2, 29))
+    return store
+
+
+@pytest.mark.parametrize('leap_day', ('feb28', 'mar1'))
+def test_between_matches_a_scan(store, leap_day):
+    calendar = BirthdayCalendar(store, leap_day)
+    for start, end in ((date(2023, 2, 20), date(2023, 3, 5)), (date(2024, 2, 20), date(2024, 3, 5)),
+                       (date(2023, 12, 20), date(2024, 1, 10)), (date(2025, 1, 1), date(2025, 12, 31))):
+        found = list(calendar.between(start, end))
+        assert [day for day, _ in found] == sorted(day for day, _ in found)
+        assert sorted(found) == scanned(store, start, end, leap_day)
+
+
+def test_upcoming_lists_each_person_once(store):
+    calendar = BirthdayCalendar(store)
+    start = date(2023, 11, 30)
+    upcoming = calendar.upcoming(len(store) + 10, start)
+    assert len(upcoming) == len(calendar)
+    assert len({person_id for _, person_id in upcoming}) == len(upcoming)
+    assert upcoming == sorted(upcoming)
+    assert upcoming[:25] == scanned(store, start, start + timedelta(days=365), 'feb28')[:25]
+    assert calendar.upcoming(0, start) == []
+
+
+def test_changes_move_people_between_days(store):
+    calendar = BirthdayCalendar(store)
+    count = len(calendar)
+    newcomer = store.add("Newcomer", date(2001, 7, 4))
+    assert newcomer in calendar.on(7, 4) and len(calendar) == count + 1
+    store.set_birth_date(newcomer, date(2001, 7, 5))
+    assert newcomer not in calendar.on(7, 4) and newcomer in calendar.on(7, 5)
+    store.set_birth_date(newcomer, None)
+    assert newcomer not in calendar.on(7, 5) and len(calendar) == count
+    assert [day for day, _ in calendar.by_day()] == sorted(day for day, _ in calendar.by_day())
+
+
+def test_leap_day_celebrations(store):
+    leaplings = store.find_all("Leapling 1952") + store.find_all("Leapling 1996") + store.find_all("Leapling 2000")
+    feb28, mar1 = BirthdayCalendar(store), BirthdayCalendar(store, 'mar1')
+    assert set(leaplings) <= set(feb28.celebrating(date(2023, 2, 28)))
+    assert set(leaplings) <= set(mar1.celebrating(date(2023, 3, 1)))
+    assert set(leaplings) <= set(feb28.celebrating(date(2024, 2, 29)))
+    assert not set(leaplings) & set(feb28.celebrating(date(2024, 2, 28)))
+    with pytest.raises(ValueError):
+        BirthdayCalendar(store, 'feb29')
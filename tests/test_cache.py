@@ -0,0 +1,120 @@
+"""The relative query cache must always answer like a fresh computation."""
+
+import os
+import random
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.cache import QueryCache  # noqa: E402
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.relatives import first_cousin_ids  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+def cousins(store, person_id):
+    return tuple(sorted(first_cousin_ids(store, person_id)))
+
+
+def test_cached_answers_follow_every_change():
+    store = PersonStore()
+    populate(store, 2000, seed=3)
+    cache = QueryCache(store, maxsize=500)
+    rng = random.Random(7)
+    for round_ in range(300):
+        size = len(store)
+        choice = rng.random()
+        if choice < 0.3:
+            store.add_child(rng.randrange(size), rng.randrange(size))
+        elif choice < 0.45:
+            store.add_sibling(rng.randrange(size), rng.randrange(size))
+        elif choice < 0.6:
+            store.set_spouse(rng.randrange(size), rng.randrange(size))
+        elif choice < 0.7:
+            store.add_child(rng.randrange(size), store.add(f"New {round_}"))
+        for person_id in rng.sample(range(len(store)), 20):
+            assert cache.get('cousins', person_id, cousins) == cousins(store, person_id)
+    assert cache.hits and cache.invalidations
+    cache.close()
+
+
+def test_only_readers_of_a_changed_person_are_dropped():
+    store = PersonStore()
+    grandparent, parent, aunt, child, cousin, stranger = (store.add(name) for name in "ABCDEF")
+    store.add_relationships([('child', grandparent, parent), ('child', grandparent, aunt),
+                             ('child', parent, child), ('child', aunt, cousin)])
+    cache = QueryCache(store)
+    assert cache.get('cousins', child, cousins) == (cousin,)
+    assert cache.get('cousins', stranger, cousins) == ()
+    store.set_birth_date(stranger, date(1990, 1, 1))
+    store.add_child(stranger, store.add("G"))
+    assert cache.invalidations == 1  # the stranger's own entry only
+    assert cache.get('cousins', child, cousins) == (cousin,)
+    assert cache.hits == 1
+    late = store.add("H")
+    store.add_child(aunt, late)
+    assert cache.get('cousins', child, cousins) == (cousin, late)
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = PersonStore()
+    people = [store.add(str(index)) for index in range(3)]
+    cache = QueryCache(store, maxsize=2)
+    cache.get('cousins', people[0], cousins)
+    cache.get('cousins', people[1], cousins)
+    cache.get('cousins', people[0], cousins)
+    cache.get('cousins', people[2], cousins)
+    assert set(cache.entries) == {('cousins', people[0]), ('cousins', people[2])}
+    assert cache.info()['evictions'] == 1
+
+
+def test_tree_cache_can_be_turned_off():
+    for cache_size in (0, 1024):
+        tree = FamilyTree(cache_size=cache_size)
+        for name in ("Gran", "Mum", "Aunt", "Kid", "Cousin"):
+            tree.add_person(name)
+        tree.add_relationships([('child', "Gran", "Mum"), ('child', "Gran", "Aunt"),
+                                ('child', "Mum", "Kid"), ('child', "Aunt", "Cousin")])
+        assert tree.get_cousins("Kid") == ["Cousin"]
+        tree.find_person("Aunt").add_child(tree.add_person("Second Cousin"))
+        assert sorted(tree.get_cousins("Kid")) == ["Cousin", "Second Cousin"]
+
+
+def test_catch_up_needs_a_replica():
+    with pytest.raises(ValueError, match="open_replica"):
+        FamilyTree().catch_up()
+
+
+def test_catch_up_after_compaction_drops_the_old_indexes(tmp_path):
+    directory = str(tmp_path / 'log')
+    master = FamilyTree()
+    master.record_changes(directory)
+    for name in ("Gran", "Mum", "Aunt", "Kid"):
+        master.add_person(name, date(1950, 3, 1))
+    master.add_relationships([('child', "Gran", "Mum"), ('child', "Gran", "Aunt"), ('child', "Mum", "Kid")])
+    master._changelog.flush()
+    replica = FamilyTree.open_replica(directory)
+    instrumentation = replica.instrumentation()
+    instrumentation.enable()
+    # Build the indexes over the store the replica is about to drop
+    assert replica.get_cousins("Kid") == []
+    assert replica.get_sorted_birthdays() == [("March 01", ["Gran", "Mum", "Aunt", "Kid"])]
+    assert replica.find_person("Cousin") is None
+    old_store = replica.store
+
+    master.find_person("Aunt").add_child(master.add_person("Cousin", date(1980, 7, 4)))
+    master.checkpoint()
+    master.add_person("Newest")
+    master._changelog.flush()
+    replica.catch_up()
+    assert replica.store is not old_store
+    assert replica.get_cousins("Kid") == ["Cousin"]
+    assert ("July 04", ["Cousin"]) in replica.get_sorted_birthdays()
+    assert replica.find_person("Newest").name == "Newest"
+    assert instrumentation.enabled and 'get_cousins' in instrumentation.operations
+    instrumentation.disable()
+    master.close()
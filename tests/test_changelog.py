@@ -0,0 +1,130 @@
+"""Change log replicas must match their master exactly, row order included."""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.changelog import BULK_EDGES, HEADER, ChangeLog, Replica  # noqa: E402
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.store import NO_PERSON  # noqa: E402
+
+
+def rows(store):
+    """Everything a store records, with every relationship row in its stored order."""
+    return [(store.name(person_id), store.birth_date(person_id), store.death_date(person_id),
+             store.spouse(person_id), list(store.parents(person_id)), list(store.children(person_id)),
+             list(store.recorded_siblings(person_id)))
+            for person_id in store.ids()]
+
+
+@pytest.fixture
+def master(tmp_path):
+    tree = FamilyTree()
+    tree.record_changes(str(tmp_path / 'log'))
+    yield tree
+    tree.close()
+
+
+def replica_of(master, tmp_path):
+    master._changelog.flush()
+    return FamilyTree.open_replica(str(tmp_path / 'log'))
+
+
+def test_bulk_edges_keep_batch_order(master, tmp_path):
+    store = master.store
+    mum, dad, kid = store.add("Mum"), store.add("Dad"), store.add("Kid")
+    replica = replica_of(master, tmp_path)
+    master.add_relationships([('child', dad, kid), ('child', mum, kid)])
+    master._changelog.flush()
+    assert replica.catch_up() == 2
+    assert [person.name for person in master.person(kid).parents] == ["Dad", "Mum"]
+    assert [person.name for person in replica.person(kid).parents] == ["Dad", "Mum"]
+
+
+def test_long_batches_replay_exactly(master, tmp_path):
+    # Long enough for the replica to replay the run as one bulk insert
+    store = master.store
+    people = [store.add(f"Person {index}", date(1900 + index % 100, 1, 1)) for index in range(2 * BULK_EDGES)]
+    edges = [('child', people[-1 - index], people[index // 3]) for index in range(BULK_EDGES)]
+    edges += [('sibling', people[-1 - index], people[index]) for index in range(BULK_EDGES)]
+    master.add_relationships(edges)
+    assert rows(replica_of(master, tmp_path).store) == rows(store)
+
+
+def test_catch_up_applies_every_kind_of_change(master, tmp_path):
+    store = master.store
+    people = [store.add(f"Person {index}") for index in range(6)]
+    replica = replica_of(master, tmp_path)
+    store.add_child(people[0], people[2])
+    store.add_child(people[1], people[2])
+    store.add_sibling(people[3], people[4])
+    store.set_spouse(people[0], people[1])
+    store.set_spouse(people[5], people[1])  # leaves person 0 unmarried
+    store.set_birth_date(people[2], date(2001, 2, 3))
+    store.set_death_date(people[0], date(2070, 1, 1))
+    store.add("Late Arrival", date(2020, 5, 5))
+    master._changelog.flush()
+    assert replica.catch_up() > 0
+    assert rows(replica.store) == rows(store)
+    assert replica.store.spouse(people[0]) == NO_PERSON
+    assert replica.catch_up() == 0
+
+
+def test_self_marriage_survives_compaction(master, tmp_path):
+    store = master.store
+    loner = store.add("Loner")
+    store.set_spouse(loner, loner)
+    master.checkpoint()
+    replica = replica_of(master, tmp_path)
+    assert replica.store.spouse(loner) == loner
+    assert rows(replica.store) == rows(store)
+
+
+def test_replica_rebuilds_after_compaction(master, tmp_path):
+    store = master.store
+    first = store.add("First")
+    replica = replica_of(master, tmp_path)
+    replica.get_cousins("First")  # an index that must be rebuilt with the store
+    second = store.add("Second")
+    store.add_child(first, second)
+    master.checkpoint()
+    store.add("Third")
+    master._changelog.flush()
+    replica.catch_up()
+    assert rows(replica.store) == rows(store)
+    assert [person.name for person in replica.person(first).children] == ["Second"]
+
+
+def test_catch_up_reads_only_new_records(master, tmp_path):
+    store = master.store
+    for index in range(10):
+        store.add(f"Person {index}")
+    replica = replica_of(master, tmp_path)
+    segment, = (name for name in os.listdir(tmp_path / 'log') if name.startswith('log-'))
+    path = tmp_path / 'log' / segment
+    # Scribble over the records already applied: a catch-up that re-read them would fail
+    data = bytearray(path.read_bytes())
+    data[HEADER.size:] = b'\xff' * (len(data) - HEADER.size)
+    path.write_bytes(bytes(data))
+    store.add("Newcomer")
+    master._changelog.flush()
+    assert replica.catch_up() == 1
+    assert replica.store.name(len(store) - 1) == "Newcomer"
+
+
+def test_torn_record_is_ignored_and_truncated(master, tmp_path):
+    store = master.store
+    store.add("Whole")
+    master._changelog.close()
+    segment, = (name for name in os.listdir(tmp_path / 'log') if name.startswith('log-'))
+    path = tmp_path / 'log' / segment
+    size = path.stat().st_size
+    with open(path, 'ab') as handle:
+        handle.write(b'\x01\x05')  # half a record, as after a crash
+    assert len(Replica(str(tmp_path / 'log')).store) == 1
+    with ChangeLog(str(tmp_path / 'log'), store):
+        assert path.stat().st_size == size
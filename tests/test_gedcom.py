@@ -0,0 +1,103 @@
+"""GEDCOM export and import must give back the tree that was written."""
+
+import io
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree import gedcom  # noqa: E402
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.sample import sample_tree  # noqa: E402
+from familytree.store import NO_PERSON, PersonStore  # noqa: E402
+
+
+def round_trip(store):
+    text = io.StringIO()
+    gedcom.write_gedcom(store, text)
+    copy = PersonStore()
+    gedcom.read_gedcom(io.StringIO(text.getvalue()), copy)
+    return copy
+
+
+def described(store):
+    """Each person's dates, spouse, parents and recorded siblings, by name."""
+    def name(person_id):
+        return store.name(person_id) if person_id != NO_PERSON else None
+    return {store.name(person_id): (store.birth_date(person_id), store.death_date(person_id),
+                                    name(store.spouse(person_id)),
+                                    [store.name(parent) for parent in store.parents(person_id)],
+                                    sorted(map(store.name, store.recorded_siblings(person_id))))
+            for person_id in store.ids()}
+
+
+def test_sample_tree_round_trip():
+    store = sample_tree().store
+    copy = round_trip(store)
+    assert described(copy) == described(store)
+    otto = FamilyTree(copy).find_person("Otto Emmersohn")
+    assert otto.spouse is None  # a child with Cornelia does not make them married
+    assert [child.name for child in otto.children] == ["Anna Emmersohn"]
+
+
+def test_spouses_parents_and_siblings_round_trip():
+    tree = FamilyTree()
+    names = ["Ada", "Ben", "Cleo", "Dov", "Eli", "Fay", "Gus"]
+    for name in names:
+        tree.add_person(name, date(1950 + len(name), 1, 2))
+    tree.add_relationships([
+        ('spouse', "Ada", "Ben"),
+        ('parent', "Cleo", "Ben"), ('parent', "Cleo", "Ada"),  # father recorded first
+        ('parent', "Dov", "Gus"), ('parent', "Dov", "Fay"),  # a second family for Dov
+        ('sibling', "Eli", "Fay"),
+        ('spouse', "Gus", "Gus"),
+    ])
+    copy = round_trip(tree.store)
+    assert described(copy) == described(tree.store)
+
+
+def test_every_parent_round_trips():
+    # Three parents make two families, which come back in file order
+    tree = FamilyTree()
+    for name in ("Ada", "Ben", "Cy", "Dov"):
+        tree.add_person(name)
+    tree.add_relationships([('parent', "Dov", "Cy"), ('parent', "Dov", "Ada"), ('parent', "Dov", "Ben")])
+    copy = FamilyTree(round_trip(tree.store))
+    assert sorted(parent.name for parent in copy.find_person("Dov").parents) == ["Ada", "Ben", "Cy"]
+
+
+def test_marriage_needs_marr():
+    text = '\n'.join([
+        '0 @F1@ FAM', '1 HUSB @I1@', '1 WIFE @I2@', '1 CHIL @I3@',
+        '0 @F2@ FAM', '1 HUSB @I3@', '1 WIFE @I4@', '1 MARR', '2 DATE 1 JAN 1990',
+        '0 @I1@ INDI', '1 NAME Al /Moe/',
+        '0 @I2@ INDI', '1 NAME Bea /Moe/',
+        '0 @I3@ INDI', '1 NAME Cy /Moe/', '1 BIRT', '2 DATE ABT 3 MAR 1960',
+        '0 @I4@ INDI', '1 NAME Di /Lo/', '1 DEAT', '2 DATE 1999',
+    ])
+    store = PersonStore()
+    xrefs = gedcom.read_gedcom(io.StringIO(text), store)
+    assert store.spouse(xrefs['@I1@']) == NO_PERSON
+    assert store.spouse(xrefs['@I3@']) == xrefs['@I4@']
+    assert list(store.parents(xrefs['@I3@'])) == [xrefs['@I1@'], xrefs['@I2@']]
+    assert store.birth_date(xrefs['@I3@']) == date(1960, 3, 3)
+    assert store.death_date(xrefs['@I4@']) is None  # a year alone is not a date
+
+
+def test_families_before_people_are_merged_a_few_times():
+    # Every family comes before its people; merging the backlog each batch would be quadratic
+    families = 2000
+    lines = []
+    for index in range(families):
+        lines += [f'0 @F{index}@ FAM', f'1 HUSB @I{2 * index}@', f'1 CHIL @I{2 * index + 1}@']
+    for index in range(2 * families):
+        lines += [f'0 @I{index}@ INDI', f'1 NAME Person /{index}/']
+    store = PersonStore()
+    merges = []
+    add_relationships = store.add_relationships
+    store.add_relationships = lambda edges: merges.append(len(edges)) or add_relationships(edges)
+    gedcom.read_gedcom(io.StringIO('\n'.join(lines)), store, batch_size=10)
+    assert sum(merges) == families
+    assert len(merges) < 20
+    assert all(list(store.parents(2 * index + 1)) == [2 * index] for index in range(families))
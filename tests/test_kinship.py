@@ -0,0 +1,86 @@
+"""The kinship index against plain searches over the store."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.kinship import KinshipIndex, relationship_name  # noqa: E402
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+def ancestors(store, person_id):
+    found, stack = set(), [person_id]
+    while stack:
+        for parent_id in store.parents(stack.pop()):
+            if parent_id not in found:
+                found.add(parent_id)
+                stack.append(parent_id)
+    return found
+
+
+def test_ancestor_tests_stay_exact_through_new_edges():
+    store = PersonStore()
+    populate(store, 600, seed=4)
+    index = KinshipIndex(store)
+    rng = random.Random(9)
+    for round_ in range(6):
+        for person_id in rng.sample(range(len(store)), 40):
+            above = ancestors(store, person_id)
+            for other in range(len(store)):
+                assert index.is_ancestor(other, person_id) == (other in above)
+        for _ in range(30):
+            # Older to younger, so no parent cycles
+            parent_id, child_id = sorted(rng.sample(range(len(store)), 2))
+            store.add_child(parent_id, child_id)
+        store.add_child(rng.randrange(len(store)), store.add(f"New {round_}"))
+    index.close()
+
+
+def test_generations_are_longest_parent_chains():
+    store = PersonStore()
+    populate(store, 400, seed=6)
+    index = KinshipIndex(store)
+    store.add_child(0, store.add("Late"))
+    for person_id in store.ids():
+        parents = store.parents(person_id)
+        expected = max((index.generation[parent_id] + 1 for parent_id in parents), default=0)
+        assert index.generation[person_id] == expected
+
+
+@pytest.mark.parametrize('up, down, name', [
+    (0, 0, 'self'), (0, 1, 'child'), (0, 3, 'great-grandchild'), (2, 0, 'grandparent'),
+    (1, 1, 'sibling'), (1, 2, 'niece/nephew'), (1, 3, 'grandniece/grandnephew'), (2, 1, 'aunt/uncle'),
+    (4, 1, 'great-great-aunt/uncle'), (2, 2, 'first cousin'), (3, 2, 'first cousin once removed'),
+    (3, 5, 'second cousin twice removed'), (2, 6, 'first cousin 4 times removed'), (12, 12, '11th cousin'),
+])
+def test_relationship_names(up, down, name):
+    assert relationship_name(up, down) == name
+
+
+def test_named_relationships():
+    tree = FamilyTree()
+    for name in ("Gran", "Grandad", "Mum", "Aunt", "Dad", "Step", "Kid", "Half", "Cousin", "Baby", "Wife", "Loner"):
+        tree.add_person(name)
+    tree.add_relationships([
+        ('child', "Gran", "Mum"), ('child', "Grandad", "Mum"), ('child', "Gran", "Aunt"),
+        ('child', "Grandad", "Aunt"), ('child', "Mum", "Kid"), ('child', "Dad", "Kid"),
+        ('child', "Mum", "Half"), ('child', "Step", "Half"), ('child', "Aunt", "Cousin"),
+        ('child', "Cousin", "Baby"), ('spouse', "Kid", "Wife"), ('sibling', "Loner", "Wife"),
+    ])
+    assert tree.relationship("Kid", "Half") == 'half-sibling'
+    assert tree.relationship("Kid", "Cousin") == 'first cousin'
+    assert tree.relationship("Kid", "Baby") == 'first cousin once removed'
+    assert tree.relationship("Baby", "Gran") == 'great-grandparent'
+    assert tree.relationship("Kid", "Wife") == 'spouse'
+    assert tree.relationship("Wife", "Loner") == 'sibling'
+    assert tree.relationship("Kid", "Loner") is None
+    assert tree.is_ancestor("Grandad", "Baby") and not tree.is_ancestor("Baby", "Grandad")
+    index = tree.kinship()
+    ids = {name: tree.find_person(name).id for name in ("Gran", "Grandad", "Kid", "Cousin")}
+    assert index.nearest_common_ancestors(ids["Kid"], ids["Cousin"]) == (2, 2, sorted([ids["Gran"], ids["Grandad"]]))
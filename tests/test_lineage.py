@@ -0,0 +1,65 @@
+"""Lineage counts against walking every person's descendants."""
+
+import os
+import random
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.lineage import LineageIndex  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+def walked(store, person_id):
+    """Descendants (each once) and generations below, the slow way."""
+    found, frontier, depth = set(), [person_id], 0
+    while True:
+        frontier = {child_id for parent_id in frontier for child_id in store.children(parent_id)}
+        if not frontier:
+            return found, depth
+        depth += 1
+        found.update(frontier)
+
+
+def check(store, index):
+    for person_id in store.ids():
+        descendants, depth = walked(store, person_id)
+        assert index.descendant_count(person_id) == len(descendants)
+        assert index.living_descendant_count(person_id) == sum(
+            1 for descendant_id in descendants if store.death_date(descendant_id) is None)
+        assert index.lineage_depth(person_id) == depth
+
+
+def test_counts_follow_changes():
+    store = PersonStore()
+    populate(store, 500, seed=12)
+    index = LineageIndex(store)
+    check(store, index)
+    rng = random.Random(1)
+    for round_ in range(8):
+        for _ in range(rng.randrange(1, 6)):
+            # Older to younger keeps the pedigree acyclic; shared lines make collapse
+            parent_id, child_id = sorted(rng.sample(range(len(store)), 2))
+            store.add_child(parent_id, child_id)
+        store.add_child(rng.randrange(len(store)), store.add(f"New {round_}"))
+        store.set_death_date(rng.randrange(len(store)), date(2000, 1, 1))
+        store.set_death_date(rng.randrange(len(store)), None)
+        check(store, index)
+    # A large bulk insert is recounted in one pass
+    edges = [('child',) + tuple(sorted(rng.sample(range(len(store)), 2))) for _ in range(len(store) // 4)]
+    store.add_relationships(edges)
+    check(store, index)
+
+
+def test_pedigree_collapse_counts_once():
+    store = PersonStore()
+    gran, mum, dad, kid = (store.add(name) for name in ("Gran", "Mum", "Dad", "Kid"))
+    store.add_relationships([('child', gran, mum), ('child', gran, dad), ('child', mum, kid), ('child', dad, kid)])
+    index = LineageIndex(store)
+    assert index.descendant_count(gran) == 3
+    assert index.lineage_depth(gran) == 2
+    assert index.largest_lineages(2) == [gran, mum]
+    store.add_child(kid, store.add("Baby"))
+    assert index.descendant_count(gran) == 4 and index.lineage_depth(gran) == 3
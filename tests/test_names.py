@@ -0,0 +1,85 @@
+"""Name lookups against plain scans of every name."""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.names import NameIndex, edit_distance, normalize  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+
+SYLLABLES = ["an", "be", "ca", "do", "el", "fi", "go", "ha", "is", "jo", "ka", "lu", "ma", "ne", "ö", "ré"]
+
+
+def levenshtein(first, second):
+    previous = list(range(len(second) + 1))
+    for row, character in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(previous[column] + 1, current[-1] + 1, previous[column - 1] + (character != other)))
+        previous = current
+    return previous[-1]
+
+
+def random_names(count, seed=1):
+    rng = random.Random(seed)
+    return [' '.join(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+                     for _ in range(2))
+            for _ in range(count)]
+
+
+def test_normalize():
+    assert normalize("  Zoë   MÜLLER ") == "zoe muller"
+    assert normalize("Straße") == "strasse"
+
+
+def test_edit_distance_matches_levenshtein():
+    rng = random.Random(4)
+    words = [''.join(rng.choice("abcde") for _ in range(rng.randint(0, 7))) for _ in range(300)]
+    for first, second in zip(words, words[1:]):
+        for limit in (0, 1, 2, 3):
+            expected = levenshtein(first, second)
+            assert edit_distance(first, second, limit) == (expected if expected <= limit else limit + 1)
+
+
+def test_lookups_match_a_scan():
+    store = PersonStore()
+    names = random_names(1500)
+    for name in names[:1000]:
+        store.add(name)
+    index = NameIndex(store)
+    for name in names[1000:]:  # through notifications, so some keys wait in the pending list
+        store.add(name)
+    keys = {}
+    for person_id, name in enumerate(names):
+        keys.setdefault(normalize(name), []).append(person_id)
+    assert len(index) == len(keys)
+    for name in names[::50]:
+        assert index.exact(name.upper()) == keys[normalize(name)]
+    for prefix in ("An", "be", "Ca d", "ré ", "ö", "zz"):
+        wanted = normalize(prefix) + (' ' if prefix.endswith(' ') else '')
+        expected = sorted((key, ids) for key, ids in keys.items() if key.startswith(wanted))
+        assert index.prefix(prefix) == expected
+        assert index.prefix(prefix, limit=3) == expected[:3]
+    for query in ("Anbe Cado", "Ka Lumane", "Goha Isjo", "Reö Ma"):
+        key = normalize(query)
+        found = index.fuzzy(query, limit=1000)
+        limit = min(2, (len({key[i:i + 3] for i in range(-1, len(key) - 1)}) - 1) // 3)
+        expected = {candidate for candidate in keys if levenshtein(key, candidate) <= limit}
+        assert {candidate for candidate, _, _ in found} == expected
+        assert all(distance == levenshtein(key, candidate) for candidate, distance, _ in found)
+        assert [distance for _, distance, _ in found] == sorted(distance for _, distance, _ in found)
+
+
+def test_tree_lookups():
+    tree = FamilyTree()
+    for name in ("Otto Emmersohn", "Otto Emmersohn", "Ottoline Ash", "Anna Emmersohn"):
+        tree.store.add(name)  # add_person would return the first Otto again
+    assert [person.id for person in tree.find_people("otto  emmersohn")] == [0, 1]
+    assert tree.find_person("OTTO EMMERSOHN").id == 0
+    assert tree.complete_names("Otto ") == ["Otto Emmersohn"]
+    assert tree.complete_names("otto") == ["Otto Emmersohn", "Ottoline Ash"]
+    assert "Otto Emmersohn" in tree.suggest_names("Oto Emersohn")
+    assert "Did you mean" in tree.not_found_message("Ana Emmersohn")
@@ -0,0 +1,87 @@
+"""Ancestor enumeration and kinship coefficients on collapsed pedigrees."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.pedigree import Pedigree  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+
+
+@pytest.fixture
+def tree():
+    # A brother's son marries his sister's daughter: their baby has 8 great-grandparent slots and 2 people
+    tree = FamilyTree()
+    for name in ("Gramps", "Granny", "Son", "Daughter", "Son's Wife", "Daughter's Husband",
+                 "Grandson", "Granddaughter", "Baby", "Stranger"):
+        tree.add_person(name)
+    tree.add_relationships([
+        ('child', "Gramps", "Son"), ('child', "Granny", "Son"),
+        ('child', "Gramps", "Daughter"), ('child', "Granny", "Daughter"),
+        ('child', "Son", "Grandson"), ('child', "Son's Wife", "Grandson"),
+        ('child', "Daughter's Husband", "Granddaughter"), ('child', "Daughter", "Granddaughter"),
+        ('child', "Grandson", "Baby"), ('child', "Granddaughter", "Baby"),
+    ])
+    return tree
+
+
+def test_ancestors_by_generation(tree):
+    assert list(tree.ancestors_by_generation("Baby")) == [
+        ["Grandson", "Granddaughter"],
+        ["Son", "Son's Wife", "Daughter's Husband", "Daughter"],
+        ["Gramps", "Granny"],
+    ]
+    assert tree.ancestor_counts("Baby") == [(1, 2, 2), (2, 4, 4), (3, 2, 8)]
+    assert tree.ancestor_counts("Baby", generations=1) == [(1, 2, 2)]
+    assert tree.ancestor_counts("Nobody") == []
+
+
+def test_kinship_coefficients(tree):
+    kinship = tree.kinship_coefficient
+    assert kinship("Baby", "Baby") == 0.5 + 0.5 * kinship("Grandson", "Granddaughter")
+    assert kinship("Son", "Daughter") == 0.25
+    assert kinship("Son", "Gramps") == 0.25
+    assert kinship("Grandson", "Granddaughter") == 0.0625
+    assert kinship("Baby", "Stranger") == 0.0
+    assert tree.inbreeding_coefficient("Baby") == 0.0625
+    assert tree.inbreeding_coefficient("Son") == 0.0
+
+
+def test_new_parents_clear_the_memo(tree):
+    assert tree.inbreeding_coefficient("Baby") == 0.0625
+    # Son's wife turns out to be Gramps' daughter too: half-sibling marriage
+    tree.find_person("Gramps").add_child(tree.find_person("Son's Wife"))
+    assert tree.kinship_coefficient("Son", "Son's Wife") == 0.125
+    assert tree.inbreeding_coefficient("Grandson") == 0.125
+
+
+def test_deep_collapse_stays_fast():
+    # Brother-sister matings for 60 generations: 2**60 paths, 2 people per level
+    store = PersonStore()
+    couple = store.add("Adam"), store.add("Eve")
+    for generation in range(60):
+        children = store.add(f"Brother {generation}"), store.add(f"Sister {generation}")
+        store.add_relationships([('child', parent, child) for child in children for parent in couple])
+        couple = children
+    pedigree = Pedigree(store)
+    start = time.perf_counter()
+    counts = pedigree.ancestor_counts(couple[0])
+    inbreeding = pedigree.inbreeding(couple[0])
+    assert time.perf_counter() - start < 2
+    assert counts[-1] == (60, 2, 2 ** 60)
+    assert len(pedigree.distinct_ancestors(couple[0])) == 120
+    assert 0.9 < inbreeding < 1
+
+
+def test_cycles_are_reported():
+    store = PersonStore()
+    a, b = store.add("A"), store.add("B")
+    store.add_child(a, b)
+    store.add_child(b, a)
+    with pytest.raises(ValueError, match="own ancestor"):
+        Pedigree(store).depth(a)
@@ -0,0 +1,95 @@
+"""Streamed reports: the same rows as the FamilyTree listings, in every format and page."""
+
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from familytree import reports  # noqa: E402
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.sample import sample_tree  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def tree():
+    store = PersonStore()
+    populate(store, 1000, seed=1)
+    return FamilyTree(store)
+
+
+def test_rows_match_the_tree_listings(tree):
+    store = tree.store
+    assert list(reports.children_counts(tree)) == [(store.name(person_id), len(store.children(person_id)))
+                                                   for person_id in store.ids()]
+    assert list(reports.birthdays(tree)) == [(store.name(person_id), store.birth_date(person_id))
+                                             for person_id in store.ids() if store.birth_date(person_id)]
+    assert list(reports.calendar(tree)) == tree.get_sorted_birthdays()
+    sample = sample_tree()  # no shared names, so the dict listings hold everyone
+    assert dict(reports.children_counts(sample)) == sample.number_of_children()
+    assert dict(reports.birthdays(sample)) == sample.get_birthdays()
+    most = [count for _, count in reports.children_counts(tree, 'most')]
+    assert most == sorted(most, reverse=True) and len(most) == len(tree.store)
+    by_day = [(birth_date.month, birth_date.day) for _, birth_date in reports.birthdays(tree, 'calendar')]
+    assert by_day == sorted(by_day)
+    with pytest.raises(ValueError):
+        list(reports.birthdays(tree, 'age'))
+
+
+def test_extended_family_rows(tree):
+    names = [tree.store.name(person_id) for person_id in (40, 500, 900)]
+    rows = list(reports.extended_family(tree, names + ["Nobody"]))
+    for name in names:
+        assert [relative for owner, relative in rows if owner == name] == \
+            tree.find_person(name).get_extended_family()
+
+
+def test_formats():
+    tree = sample_tree()
+    text = io.StringIO()
+    assert reports.write(tree, 'children', text) == 5
+    assert text.getvalue().splitlines()[0] == "Otto Emmersohn has 1 children."
+    table = io.StringIO()
+    reports.write(tree, 'calendar', table, 'csv')
+    rows = list(csv.reader(io.StringIO(table.getvalue())))
+    assert rows[0] == ['day', 'names'] and ['February 05', 'Laxmi Thakuri'] in rows
+    lines = io.StringIO()
+    reports.write(tree, 'birthdays', lines, 'jsonl', order='calendar')
+    first = json.loads(lines.getvalue().splitlines()[0])
+    assert first == {'name': "Laxmi Thakuri", 'birth_date': date(1938, 2, 5).isoformat()}
+    with pytest.raises(ValueError):
+        reports.write(tree, 'children', io.StringIO(), 'xml')
+
+
+def test_paging(tree):
+    everything = io.StringIO()
+    total = reports.write(tree, 'birthdays', everything)
+    lines = everything.getvalue().splitlines()
+    for start, limit in ((0, 20), (20, 20), (total - 5, 20), (total, 20)):
+        page = io.StringIO()
+        assert reports.write(tree, 'birthdays', page, start=start, limit=limit) == len(lines[start:start + limit])
+        assert page.getvalue().splitlines() == lines[start:start + limit]
+    paged = list(reports.pages(reports.birthdays(tree), 300))
+    assert [more for _, more in paged] == [True] * (len(paged) - 1) + [False]
+    assert sum((page for page, _ in paged), []) == list(reports.birthdays(tree))
+    assert list(reports.pages(iter(()), 10)) == []
+
+
+def test_command_line(tmp_path):
+    path = str(tmp_path / 'tree.snap')
+    sample_tree().save_snapshot(path)
+    script = os.path.join(ROOT, 'Feature 3.py')
+    result = subprocess.run([sys.executable, script, '--report', 'children', 'csv', path],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[:2] == ['name,children', 'Otto Emmersohn,1']
+    result = subprocess.run([sys.executable, script, '--report', 'ages'], capture_output=True, text=True)
+    assert result.returncode == 1 and 'children, birthdays, calendar, extended' in result.stderr
@@ -0,0 +1,108 @@
+"""The HTTP service: reads come from the published snapshot, writes are seen once answered."""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.sample import sample_tree  # noqa: E402
+from familytree.service import TreeService  # noqa: E402
+
+
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = b'' if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode('utf-8'))
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n"
+                 .encode('latin-1') + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()) not in (b'\r\n', b''):
+        pass
+    payload = json.loads(await reader.read())
+    writer.close()
+    return status, payload
+
+
+def serve(tree, test):
+    """Run ``test(service, port)`` against a service for ``tree`` on a free port."""
+    async def run():
+        service = TreeService(tree)
+        server = await service.start(port=0)
+        try:
+            return await test(service, server.sockets[0].getsockname()[1])
+        finally:
+            await service.stop()
+    return asyncio.run(run())
+
+
+def test_read_after_write():
+    async def test(service, port):
+        status, payload = await request(port, 'POST', '/people', {'name': "Nia Emmersohn", 'birth_date': '2012-01-05',
+                                                                  'death_date': '2090-01-05'})
+        assert (status, payload) == (200, {'id': 5})
+        status, payload = await request(port, 'POST', '/relationships', {'edges': [
+            ['child', "Anna Emmersohn", "Nia Emmersohn"], ['spouse', "Otto Emmersohn", "Cornelia Emmersohn"]]})
+        assert (status, payload) == (200, {'edges': 2})
+        status, person = await request(port, 'GET', '/person?name=Nia%20Emmersohn')
+        assert status == 200
+        assert person['parents'] == ["Anna Emmersohn"] and person['birth_date'] == '2012-01-05'
+        _, otto = await request(port, 'GET', '/person?name=Otto+Emmersohn')
+        assert otto['spouse'] == "Cornelia Emmersohn"
+        _, calendar = await request(port, 'GET', '/birthdays')
+        assert {'date': 'January 05', 'names': ["Nia Emmersohn"]} in calendar
+        _, statistics = await request(port, 'GET', '/statistics')
+        assert statistics['people'] == 6 and statistics['median_age_at_death'] == 72
+        _, health = await request(port, 'GET', '/health')
+        assert health == {'people': 6, 'version': 3}
+    serve(sample_tree(), test)
+
+
+def test_published_snapshot_has_its_indexes():
+    # Indexes are built in the executor, so the event loop never builds one on a read
+    async def test(service, port):
+        await request(port, 'POST', '/people', {'name': "Late Arrival"})
+        snapshot = service.snapshot
+        assert snapshot._names is not None
+        assert snapshot._birthdays is not None
+        assert snapshot._statistics is not None and snapshot._kinship is not None
+    serve(sample_tree(), test)
+
+
+def test_batch_and_errors():
+    async def test(service, port):
+        status, payload = await request(port, 'POST', '/batch', {'requests': [
+            {'query': 'cousins', 'name': "Anna Emmersohn"},
+            {'query': 'person', 'name': "Nobody"},
+            {'query': 'nonsense'},
+            "not an object"]})
+        assert status == 200
+        assert [result['status'] for result in payload['results']] == [200, 404, 404, 400]
+        assert (await request(port, 'GET', '/person'))[0] == 400
+        assert (await request(port, 'GET', '/nowhere'))[0] == 404
+        assert (await request(port, 'DELETE', '/people'))[0] == 405
+        assert (await request(port, 'POST', '/people', b'[1, 2]'))[0] == 400
+        assert (await request(port, 'POST', '/people', b'{not json'))[0] == 400
+        assert (await request(port, 'POST', '/relationships', {'edges': [['child', "Nobody", "Anna"]]}))[0] == 404
+        assert (await request(port, 'POST', '/relationships', {'edges': 'child'}))[0] == 400
+        _, health = await request(port, 'GET', '/health')
+        assert health['people'] == 5  # the failed writes added no one
+    serve(sample_tree(), test)
+
+
+def test_serves_a_snapshot_tree(tmp_path):
+    path = str(tmp_path / 'tree.snap')
+    sample_tree().save_snapshot(path)
+    tree = FamilyTree.open_snapshot(path)
+
+    async def test(service, port):
+        status, _ = await request(port, 'POST', '/people', {'name': "Late Arrival", 'birth_date': '2001-02-03'})
+        assert status == 200
+        _, person = await request(port, 'GET', '/person?name=Late+Arrival')
+        assert person['birth_date'] == date(2001, 2, 3).isoformat()
+    serve(tree, test)
+    assert len(tree.store) == 5  # the opened snapshot is left as it was
+    tree.close()
@@ -0,0 +1,71 @@
+"""Derived siblings against the children of each person's parents."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.model import FamilyTree  # noqa: E402
+from familytree.store import PersonStore, derive_siblings  # noqa: E402
+
+
+def expected(store, person_id):
+    siblings = {child_id for parent_id in store.parents(person_id) for child_id in store.children(parent_id)}
+    siblings.update(store.recorded_siblings(person_id))
+    siblings.discard(person_id)
+    return siblings
+
+
+@pytest.mark.parametrize('materialized', (False, True))
+def test_siblings_follow_parents_and_links(materialized):
+    store = PersonStore()
+    store.materialize_siblings(materialized)
+    rng = random.Random(6)
+    for index in range(200):
+        store.add(f"Person {index}")
+    for round_ in range(600):
+        a, b = rng.sample(range(len(store)), 2)
+        if round_ % 4:
+            store.add_child(a, b)
+        else:
+            store.add_sibling(a, b)
+        if round_ % 50 == 0:
+            for person_id in store.ids():
+                row = store.siblings(person_id)
+                assert len(row) == len(set(row)) and set(row) == expected(store, person_id)
+    for person_id in store.ids():
+        assert set(store.siblings(person_id)) == expected(store, person_id)
+
+
+def test_derive_siblings_order():
+    children = {10: [1, 2, 3], 11: [1, 2, 3], 12: [3, 4]}
+    assert list(derive_siblings(2, [10, 11], children.get, [])) == [1, 3]
+    assert list(derive_siblings(3, [10, 12], children.get, [7])) == [1, 2, 4, 7]
+    assert list(derive_siblings(5, [], children.get, [8, 9])) == [8, 9]
+
+
+def test_links_are_only_recorded_when_needed():
+    store = PersonStore()
+    mum, first, second, orphan = (store.add(name) for name in ("Mum", "First", "Second", "Orphan"))
+    store.add_relationships([('child', mum, first), ('child', mum, second), ('sibling', first, second),
+                             ('sibling', orphan, first)])
+    assert list(store.recorded_siblings(first)) == [orphan]  # the shared mother already makes the pair
+    assert not store.add_sibling(second, first)
+    assert sorted(store.siblings(first)) == [second, orphan]
+    assert list(store.siblings(orphan)) == [first]
+
+
+def test_full_and_half_siblings():
+    tree = FamilyTree()
+    for name in ("Mum", "Dad", "Step", "Kid", "Full", "Half", "Only"):
+        tree.add_person(name)
+    tree.add_relationships([('child', "Mum", "Kid"), ('child', "Dad", "Kid"), ('child', "Mum", "Full"),
+                            ('child', "Dad", "Full"), ('child', "Step", "Half"), ('child', "Mum", "Half")])
+    kid = tree.find_person("Kid")
+    assert sorted(tree.get_siblings("Kid")) == ["Full", "Half"]
+    assert [person.name for person in kid.get_full_siblings()] == ["Full"]
+    assert [person.name for person in kid.get_half_siblings()] == ["Half"]
+    assert tree.get_siblings("Only") == []
@@ -0,0 +1,76 @@
+"""Snapshots must read back exactly what was written."""
+
+import io
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.snapshot import HEADER, Snapshot, SnapshotError, dump_snapshot, write_snapshot  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+def rows(store):
+    return [(store.name(person_id), store.birth_date(person_id), store.death_date(person_id),
+             store.spouse(person_id), list(store.parents(person_id)), list(store.children(person_id)),
+             sorted(store.siblings(person_id)), list(store.recorded_siblings(person_id)))
+            for person_id in store.ids()]
+
+
+@pytest.fixture(scope='module')
+def store():
+    store = PersonStore()
+    populate(store, 3000, seed=2)
+    for person_id in range(0, 3000, 97):
+        store.add_sibling(person_id, (person_id * 7 + 1) % 3000)  # a few recorded links
+    store.add("Zoë Ünicode")
+    store.add("Zoë Ünicode")
+    store.set_spouse(3000, 3000)
+    return store
+
+
+def test_round_trip(store, tmp_path):
+    path = str(tmp_path / 'tree.snap')
+    write_snapshot(store, path)
+    assert os.listdir(str(tmp_path)) == ['tree.snap']  # the temporary file was renamed
+    with Snapshot.open(path) as snapshot:
+        assert len(snapshot) == len(store)
+        assert rows(snapshot) == rows(store)
+        assert snapshot.find("Zoë Ünicode") == 3000
+        assert snapshot.find_all("Zoë Ünicode") == [3000, 3001]
+        assert snapshot.find("Nobody") == store.find("Nobody")
+        for kind in ('parent', 'child', 'sibling'):
+            assert [list(column) for column in snapshot.adjacency(kind)] == \
+                [list(column) for column in store.adjacency(kind)]
+
+
+def test_snapshot_of_a_snapshot(store):
+    buffer = io.BytesIO()
+    dump_snapshot(store, buffer)
+    first = Snapshot(buffer.getvalue())
+    copy = io.BytesIO()
+    dump_snapshot(first, copy)  # copied through a PersonStore
+    second = Snapshot(copy.getvalue())
+    assert rows(second) == rows(first)
+    first.close()
+    second.close()
+
+
+def test_corrupt_files_are_rejected(store):
+    buffer = io.BytesIO()
+    dump_snapshot(store, buffer)
+    data = buffer.getvalue()
+    with pytest.raises(SnapshotError, match="too short"):
+        Snapshot(data[:10])
+    with pytest.raises(SnapshotError, match="not a family tree snapshot"):
+        Snapshot(b'X' + data[1:])
+    magic, version, byte_order, count = HEADER.unpack_from(data)
+    with pytest.raises(SnapshotError, match="version"):
+        Snapshot(HEADER.pack(magic, version + 1, byte_order, count) + data[HEADER.size:])
+    with pytest.raises(SnapshotError, match="byte order"):
+        Snapshot(HEADER.pack(magic, version, 3 - byte_order, count) + data[HEADER.size:])
+    assert struct.calcsize('<8sIIQ') == HEADER.size
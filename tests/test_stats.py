@@ -0,0 +1,66 @@
+"""Running statistics must always equal a recomputation from the store."""
+
+import os
+import random
+import statistics
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.kinship import KinshipIndex  # noqa: E402
+from familytree.stats import RunningStats, age_between  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+
+
+def test_age_between():
+    assert age_between(date(1950, 6, 15), date(2000, 6, 14)) == 49
+    assert age_between(date(1950, 6, 15), date(2000, 6, 15)) == 50
+    assert age_between(date(1952, 2, 29), date(2000, 2, 28)) == 47
+    assert age_between(None, date(2000, 1, 1)) is None
+
+
+def test_running_values_follow_every_change():
+    store = PersonStore()
+    populate(store, 1500, seed=8)
+    kinship = KinshipIndex(store)
+    stats = RunningStats(store, kinship)
+    rng = random.Random(3)
+    for index in range(400):
+        size = len(store)
+        choice = rng.random()
+        if choice < 0.3:
+            parent_id, child_id = sorted(rng.sample(range(size), 2))
+            store.add_child(parent_id, child_id)
+        elif choice < 0.5:
+            store.set_death_date(rng.randrange(size), date(1900 + index % 120, 1 + index % 12, 1))
+        elif choice < 0.6:
+            store.set_death_date(rng.randrange(size), None)
+        elif choice < 0.8:
+            store.set_birth_date(rng.randrange(size), date(1850 + index % 100, 3, 3))
+        else:
+            store.add_child(rng.randrange(size), store.add(f"New {index}", date(1990, 1, 1), date(2060, 1, 1)))
+    assert stats.check() == []
+
+    ages = [age_between(store.birth_date(person_id), store.death_date(person_id)) for person_id in store.ids()]
+    ages = [age for age in ages if age is not None]
+    assert stats.average_age_at_death() == sum(ages) / len(ages)
+    assert stats.median_age_at_death() == statistics.median(ages)
+    assert abs(stats.age_at_death_stddev() - statistics.pstdev(ages)) < 1e-6
+    children = [len(store.children(person_id)) for person_id in store.ids()]
+    assert stats.average_number_of_children() == sum(children) / len(store)
+    by_generation = {}
+    for person_id in store.ids():
+        by_generation.setdefault(kinship.generation[person_id], []).append(children[person_id])
+    assert stats.fertility_by_generation() == {generation: sum(counts) / len(counts)
+                                               for generation, counts in sorted(by_generation.items())}
+
+
+def test_empty_tree():
+    store = PersonStore()
+    stats = RunningStats(store, KinshipIndex(store))
+    assert stats.average_age_at_death() is None
+    assert stats.median_age_at_death() is None
+    assert stats.average_number_of_children() is None
+    assert stats.fertility_by_generation() == {}
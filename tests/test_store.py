@@ -0,0 +1,139 @@
+"""PersonStore and its CSR adjacency against plain lists."""
+
+import os
+import random
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.store import HASHED_DEGREE, NO_PERSON, Adjacency, PersonStore, copy_store  # noqa: E402
+
+
+def test_adjacency_matches_lists():
+    rng = random.Random(5)
+    adjacency, rows, nodes = Adjacency(), {}, 200
+    for round_ in range(40):
+        if round_ % 3:
+            for _ in range(rng.randrange(1, 400)):
+                node, target = rng.randrange(nodes), rng.randrange(nodes)
+                if not adjacency.contains(node, target):
+                    adjacency.append(node, target)
+                    rows.setdefault(node, []).append(target)
+        else:
+            sources = [rng.randrange(nodes) for _ in range(300)]
+            targets = [rng.randrange(nodes) for _ in range(300)]
+            added = adjacency.extend(sources, targets, nodes)
+            for node, fresh in added:
+                assert not set(fresh) & set(rows.get(node, ()))
+                rows.setdefault(node, []).extend(fresh)
+        if round_ % 7 == 0:
+            adjacency.compact(nodes)
+        for node in range(nodes):
+            assert list(adjacency.row(node)) == rows.get(node, [])
+            assert adjacency.degree(node) == len(rows.get(node, ()))
+    assert len(adjacency) == sum(map(len, rows.values()))
+    assert any(len(row) > HASHED_DEGREE for row in rows.values()) and adjacency.hashed
+
+
+def test_extend_keeps_first_seen_order():
+    adjacency = Adjacency()
+    adjacency.append(2, 9)
+    added = adjacency.extend([2, 0, 2, 2, 0], [5, 1, 9, 5, 3], 10)
+    assert added == [(0, [1, 3]), (2, [5])]
+    assert list(adjacency.row(2)) == [9, 5]
+    assert list(adjacency.row(0)) == [1, 3]
+    assert list(adjacency.row(9)) == []
+
+
+def test_bulk_insert_matches_single_inserts():
+    rng = random.Random(11)
+    single, bulk = PersonStore(), PersonStore()
+    for store in (single, bulk):
+        for index in range(300):
+            store.add(f"Person {index}")
+    edges = [(rng.choice(('child', 'parent', 'sibling')), rng.randrange(300), rng.randrange(300))
+             for _ in range(2000)]
+    events = {single: [], bulk: []}
+    for store in (single, bulk):
+        store.subscribe(lambda *event, store=store: events[store].append(event))
+    for kind, person_id, relative_id in edges:
+        if kind == 'child':
+            single.add_child(person_id, relative_id)
+        elif kind == 'parent':
+            single.add_child(relative_id, person_id)
+        else:
+            single.add_sibling(person_id, relative_id)
+    bulk.add_relationships(edges)
+    for person_id in single.ids():
+        assert list(bulk.parents(person_id)) == list(single.parents(person_id))
+        assert list(bulk.children(person_id)) == list(single.children(person_id))
+        assert sorted(bulk.siblings(person_id)) == sorted(single.siblings(person_id))
+    # Bulk siblings skip pairs that share a parent anywhere in the batch
+    assert set(events[bulk]) <= set(events[single])
+    assert [event for event in events[bulk] if event[0] == 'add_child'] == \
+        [event for event in events[single] if event[0] == 'add_child']
+
+
+def test_duplicate_edges_are_ignored():
+    store = PersonStore()
+    mum, kid, other = store.add("Mum"), store.add("Kid"), store.add("Other")
+    assert store.add_child(mum, kid)
+    assert not store.add_child(mum, kid)
+    store.add_relationships([('child', mum, kid), ('parent', kid, mum), ('sibling', other, other)])
+    assert list(store.parents(kid)) == [mum] and list(store.children(mum)) == [kid]
+    assert store.add_sibling(kid, other) and not store.add_sibling(other, kid)
+    assert list(store.siblings(other)) == [kid]
+
+
+def test_names_and_dates():
+    store = PersonStore()
+    ids = [store.add(name, date(1900 + index, 1, 1) if index % 2 else None)
+           for index, name in enumerate(["Åsa", "Bo", "Åsa", "Ciarán"] * 10)]
+    assert store.find("Åsa") == 0
+    assert store.find_all("Åsa") == ids[0::2]
+    assert store.find("Nobody") == NO_PERSON
+    assert store.name(3) == "Ciarán"
+    assert store.birth_date(1) == date(1901, 1, 1) and store.birth_date(0) is None
+    store.set_death_date(1, date(1950, 5, 5))
+    assert store.death_date(1) == date(1950, 5, 5)
+
+
+def test_spouses_unlink_the_previous_partner():
+    store = PersonStore()
+    a, b, c = (store.add(name) for name in "ABC")
+    events = []
+    store.subscribe(lambda *event: events.append(event))
+    store.set_spouse(a, b)
+    store.set_spouse(c, b)
+    assert (store.spouse(a), store.spouse(b), store.spouse(c)) == (NO_PERSON, c, b)
+    assert events[-2:] == [('set_spouse', a, NO_PERSON, b), ('set_spouse', c, b, NO_PERSON)]
+    store.set_spouse(c, NO_PERSON)
+    assert store.spouse(b) == NO_PERSON
+
+
+def test_materialized_siblings_follow_new_children():
+    store = PersonStore()
+    store.materialize_siblings()
+    mum, first, second = store.add("Mum"), store.add("First"), store.add("Second")
+    store.add_child(mum, first)
+    assert list(store.siblings(first)) == []
+    store.add_child(mum, second)
+    assert list(store.siblings(first)) == [second]
+    late = store.add("Late")
+    store.add_relationships([('child', mum, late)])
+    assert list(store.siblings(first)) == [second, late]
+
+
+def test_copy_store_keeps_parent_order():
+    source = PersonStore()
+    dad, mum, kid, loner, friend = (source.add(name) for name in ("Dad", "Mum", "Kid", "Loner", "Friend"))
+    source.add_child(mum, kid)
+    source.add_child(dad, kid)
+    source.add_sibling(loner, friend)
+    source.set_spouse(loner, loner)
+    target = PersonStore()
+    copy_store(source, target)
+    assert list(target.parents(kid)) == [mum, dad]
+    assert list(target.recorded_siblings(friend)) == [loner]
+    assert target.spouse(loner) == loner
@@ -0,0 +1,75 @@
+"""Integrity checks: a whole-store pass and the per-change Validator."""
+
+import io
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from familytree.sample import sample_tree  # noqa: E402
+from familytree.store import PersonStore  # noqa: E402
+from familytree.synthetic import populate  # noqa: E402
+from familytree.validate import Validator, report, validate  # noqa: E402
+
+
+def kinds(problems):
+    return sorted(kind for kind, _, _ in problems)
+
+
+def test_clean_trees_have_no_problems():
+    assert list(validate(sample_tree().store)) == []
+    store = PersonStore()
+    populate(store, 2000, seed=5)
+    assert list(validate(store)) == []
+
+
+def test_every_kind_is_found():
+    store = PersonStore()
+    people = [store.add(name, date(1950 + index, 1, 1)) for index, name in enumerate("ABCDEFGHIJKL")]
+    a, b, c, d, e, f, g, h, i, j, k, l = people
+    validator = Validator(store)
+    store.add_child(a, d)
+    store.add_child(b, d)
+    store.add_child(c, d)  # a third parent
+    store.add_child(e, e)  # own parent
+    store.add_child(g, f)  # born before the parent
+    store.set_death_date(h, date(1900, 1, 1))  # died before birth
+    store.add_child(i, j)
+    store.add_child(j, k)
+    store.add_child(k, i)  # i -> j -> k -> i
+    store.set_spouse(l, l)
+    store.add_child(a, b)
+    store.add_child(c, g)
+    store.add_sibling(b, g)  # both have parents, none shared
+    # One-way links can only be made by writing a single direction directly
+    store.parent_adjacency.append(l, h)
+    store.sibling_adjacency.append(h, c)
+    store.spouses[f] = h
+    expected = ['asymmetric_parent', 'asymmetric_sibling', 'asymmetric_spouse', 'born_before_parent',
+                'cycle', 'death_before_birth', 'self_link', 'self_link', 'siblings_without_common_parent',
+                'too_many_parents']
+    found = list(validate(store))
+    assert sorted(set(kinds(found))) == sorted(set(expected))
+    assert kinds(found).count('self_link') == 2
+    # The incremental checks see what went through the store's own methods
+    assert set(kinds(validator.problems)) == {'born_before_parent', 'cycle', 'death_before_birth', 'self_link',
+                                              'siblings_without_common_parent', 'too_many_parents'}
+    out = io.StringIO()
+    counts = report(found, out)
+    assert counts['self_link'] == 2 and out.getvalue().endswith(
+        "Found " + ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())) + "\n")
+
+
+def test_validator_callback_and_close():
+    store = PersonStore()
+    seen = []
+    validator = Validator(store, lambda *problem: seen.append(problem[0]))
+    old, young = store.add("Old", date(1900, 1, 1)), store.add("Young", date(1950, 1, 1))
+    store.add_child(young, old)
+    assert seen == ['born_before_parent']
+    validator.close()
+    store.set_birth_date(old, date(1960, 1, 1))
+    store.set_death_date(old, date(1959, 1, 1))
+    assert seen == ['born_before_parent']
+    assert report([], io.StringIO()) == {}